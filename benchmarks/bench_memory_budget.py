@@ -0,0 +1,71 @@
+"""
+Measure the peak memory of extracting a deck with large embedded videos, with and without spooling.
+
+Each run extracts the deck with `part1_v2.extract_slide_text_and_media` in a fresh process and reports
+its `memory_budget.deck_memory` peaks. With the default spool threshold, decks with media above it are
+read entry by entry and their media streamed to disk; raising the threshold past the largest video puts
+them back on the python-pptx path, which holds the whole package in memory.
+
+Usage:
+    python benchmarks/bench_memory_budget.py [--deck path.pptx] [--slides N] [--video-size BYTES]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from deck_generator import generate_deck
+
+RUN = """
+import sys, json, logging
+logging.disable(logging.INFO)
+from pictory.memory_budget import deck_memory
+from pictory.part1_v2 import extract_slide_text_and_media
+
+with deck_memory(sys.argv[1]) as memory:
+    result = extract_slide_text_and_media(sys.argv[1], sys.argv[2])
+print(json.dumps(dict(memory, slides=len(result))))
+"""
+
+
+def run(pptx_file, env):
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", RUN, pptx_file, output_dir], env=dict(os.environ, PYTHONPATH=ROOT, **env),
+                             check=True, capture_output=True, text=True).stdout
+        return json.loads(out.splitlines()[-1]), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--deck", default=None, help="deck to measure (default: a generated one)")
+    parser.add_argument("--slides", type=int, default=3)
+    parser.add_argument("--video-size", type=int, default=150 * 1024 * 1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pptx_file = args.deck
+        if pptx_file is None:
+            pptx_file = os.path.join(tmp, "deck.pptx")
+            generate_deck(pptx_file, slides=args.slides, shapes=3, images=1, video_size=args.video_size)
+        print(f"{pptx_file}: {os.path.getsize(pptx_file) / 2 ** 20:.0f} MiB")
+
+        runs = {
+            "python-pptx (no spooling)": {"MEMORY_SPOOL_THRESHOLD": "1T", "MEMORY_BUDGET": "1T"},
+            "spooled (defaults)": {},
+        }
+        print(f"{'run':<28} {'peak RSS MiB':>13} {'budget peak MiB':>16} {'wall':>8}")
+        for name, env in runs.items():
+            memory, seconds = run(pptx_file, env)
+            print(f"{name:<28} {memory['peak_rss'] / 2 ** 20:>13.0f} {memory['budget_peak'] / 2 ** 20:>16.0f} {seconds:>7.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare the memory held by slotted slide records against the nested-dict paired data.
+
+Synthetic slides are built in both forms and measured with tracemalloc.
+
+Usage:
+    python benchmarks/bench_records_memory.py [--slides N] [--texts N] [--media N]
+"""
+import os
+import sys
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pictory.records import Box, MediaRef, SlideRecord, TextBox
+
+
+def build_dicts(slides, texts, media):
+    paired_data = {}
+    for slide_num in range(1, slides + 1):
+        text = [f"Slide {slide_num} text box {i}" for i in range(texts)]
+        paired_data[slide_num] = {
+            "text": text,
+            "text_coordinates": {t: {"left": 838200 + i, "top": 365125 + i, "width": 10515600, "height": 1325563} for i, t in enumerate(text)},
+            "media_info": [
+                {"path": f"output_media/image{slide_num}_{i}.png", "position": {"left": 6172200 + i, "top": 2169517, "width": 5181600, "height": 3663553}}
+                for i in range(media)
+            ]
+        }
+    return paired_data
+
+
+def build_records(slides, texts, media):
+    records = []
+    for slide_num in range(1, slides + 1):
+        records.append(SlideRecord(
+            slide_num,
+            [TextBox(f"Slide {slide_num} text box {i}", Box(838200 + i, 365125 + i, 10515600, 1325563)) for i in range(texts)],
+            [
+                MediaRef(f"/ppt/media/image{slide_num}_{i}.png", "image", Box(6172200 + i, 2169517, 5181600, 3663553), f"output_media/image{slide_num}_{i}.png", None)
+                for i in range(media)
+            ]
+        ))
+    return records
+
+
+def measure(build, *args):
+    tracemalloc.start()
+    data = build(*args)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slides", type=int, default=10000)
+    parser.add_argument("--texts", type=int, default=4)
+    parser.add_argument("--media", type=int, default=2)
+    args = parser.parse_args()
+
+    dict_bytes = measure(build_dicts, args.slides, args.texts, args.media)
+    record_bytes = measure(build_records, args.slides, args.texts, args.media)
+    print(f"nested dicts  {dict_bytes / 1024 / 1024:8.1f} MiB")
+    print(f"slot records  {record_bytes / 1024 / 1024:8.1f} MiB  ({record_bytes / dict_bytes:.0%} of dicts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Measure upload throughput of S3Uploader against sequential uploads on a fresh client.
+
+By default a fake S3 client simulates per-request latency and bandwidth; --moto runs
+against moto's in-process S3 stand-in and --endpoint-url against a local S3 server.
+
+Usage:
+    python benchmarks/bench_s3_upload.py [--files N] [--size BYTES] [--workers N] [--moto | --endpoint-url URL]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pictory.s3_uploader import S3Uploader, make_s3_client
+
+
+class FakeS3Client:
+    """Stand-in for a boto3 S3 client that sleeps for a latency plus a bandwidth-bound transfer time."""
+
+    def __init__(self, latency=0.02, bandwidth=50 * 1024 * 1024):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.objects = {}
+
+    def upload_file(self, path, bucket_name, key, Config=None):
+        size = os.path.getsize(path)
+        time.sleep(self.latency + size / self.bandwidth)
+        self.objects[(bucket_name, key)] = size
+
+
+def make_files(directory, count, size):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"image{i + 1}.bin")
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+def report(name, seconds, count, size):
+    print(f"{name:<12} files={count:<5} wall={seconds:.2f} s  throughput={count * size / seconds / 1024 / 1024:.1f} MiB/s  files/s={count / seconds:.1f}")
+
+
+def run(s3, bucket_name, paths, size, workers):
+    start = time.perf_counter()
+    for path in paths:
+        s3.upload_file(path, bucket_name, f"sequential/{os.path.basename(path)}")
+    report("sequential", time.perf_counter() - start, len(paths), size)
+
+    with S3Uploader(bucket_name, s3=s3, max_workers=workers) as uploader:
+        start = time.perf_counter()
+        results = uploader.upload_many((path, f"pooled/{os.path.basename(path)}") for path in paths)
+        report(f"pooled x{workers}", time.perf_counter() - start, len(paths), size)
+    failed = [result for result in results if not result["ok"]]
+    if failed:
+        print(f"{len(failed)} uploads failed, first error: {failed[0]['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=64)
+    parser.add_argument("--size", type=int, default=256 * 1024)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--bucket", default="bench-bucket")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--moto", action="store_true", help="use moto's in-process S3 stand-in")
+    group.add_argument("--endpoint-url", help="use an S3-compatible server at this URL")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_files(directory, args.files, args.size)
+        if args.moto:
+            from moto import mock_aws
+            with mock_aws():
+                s3 = make_s3_client("testing", "testing", max_pool_connections=args.workers)
+                s3.create_bucket(Bucket=args.bucket)
+                run(s3, args.bucket, paths, args.size, args.workers)
+        elif args.endpoint_url:
+            s3 = make_s3_client(max_pool_connections=args.workers, endpoint_url=args.endpoint_url)
+            run(s3, args.bucket, paths, args.size, args.workers)
+        else:
+            run(FakeS3Client(), args.bucket, paths, args.size, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Measure the package I/O saved by selective extraction requests on a large deck.
+
+Every ZIP entry opened while extracting is recorded, so the table shows how many entries and how
+many compressed bytes of the package each request reads (python-pptx reads through zipfile too),
+along with the uncompressed media bytes written and the wall time. The baseline is the full
+python-pptx extraction `part1_v2.extract_slide_text_and_media` does without a request.
+
+Usage:
+    python benchmarks/bench_selective.py [--deck path.pptx] [--slides N] [--image-size PX] [--video-size BYTES] [--repeat N]
+"""
+import os
+import sys
+import time
+import zipfile
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pictory import extraction_engine
+from deck_generator import generate_deck
+from pictory.selective import ExtractionRequest, extract_selected
+
+OPENED = []
+_open = zipfile.ZipFile.open
+
+
+def _recording_open(self, name, *args, **kwargs):
+    info = name if isinstance(name, zipfile.ZipInfo) else self.getinfo(name)
+    OPENED.append(info.compress_size)
+    return _open(self, name, *args, **kwargs)
+
+
+def requests(slide_count):
+    return {
+        "full (python-pptx)": None,
+        "full request": ExtractionRequest(),
+        "slides 1-5": ExtractionRequest(slides=set(range(1, 6))),
+        "text only": ExtractionRequest(media=False),
+        "videos only": ExtractionRequest(text=False, media_types=("video/",)),
+        "media <= 200 KB": ExtractionRequest(max_media_size=200 * 1024),
+        "last slide text": ExtractionRequest(slides={slide_count}, media=False),
+    }
+
+
+def run(pptx_file, request, repeat):
+    times = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as output_dir:
+            OPENED.clear()
+            start = time.perf_counter()
+            if request is None:
+                extraction_engine.extract_records(pptx_file, output_dir)
+            else:
+                extract_selected(pptx_file, request, output_dir)
+            times.append(time.perf_counter() - start)
+            written = sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir))
+    return len(OPENED), sum(OPENED), written, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--deck", default=None, help="deck to measure (default: a generated one)")
+    parser.add_argument("--slides", type=int, default=200)
+    parser.add_argument("--image-size", type=int, default=256)
+    parser.add_argument("--video-size", type=int, default=256 * 1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    zipfile.ZipFile.open = _recording_open
+    with tempfile.TemporaryDirectory() as tmp:
+        pptx_file = args.deck
+        if pptx_file is None:
+            pptx_file = os.path.join(tmp, "deck.pptx")
+            generate_deck(pptx_file, slides=args.slides, shapes=5, images=2, image_size=args.image_size, video_size=args.video_size)
+        with zipfile.ZipFile(pptx_file) as zip_ref:
+            slide_count = sum(1 for name in zip_ref.namelist() if name.startswith("ppt/slides/slide"))
+            print(f"{pptx_file}: {os.path.getsize(pptx_file) / 1e6:.1f} MB, {len(zip_ref.infolist())} entries, {slide_count} slides")
+
+        print(f"{'request':<20} {'entries':>8} {'read MB':>9} {'written MB':>11} {'wall':>9}")
+        baseline = None
+        for name, request in requests(slide_count).items():
+            entries, read, written, seconds = run(pptx_file, request, args.repeat)
+            baseline = baseline or read
+            print(f"{name:<20} {entries:>8} {read / 1e6:>9.2f} {written / 1e6:>11.2f} {seconds * 1000:>7.0f}ms  ({read / baseline:.1%} of full)")
+
+
+if __name__ == "__main__":
+    main()
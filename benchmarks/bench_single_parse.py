@@ -0,0 +1,79 @@
+"""
+Compare parse count and wall time of the single-pass extraction engine against the
+previous strategy of parsing the presentation once per media file plus once for text.
+
+Usage:
+    python benchmarks/bench_single_parse.py path/to/deck.pptx [--repeat N]
+"""
+import os
+import re
+import sys
+import time
+import zipfile
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pptx
+from pictory import extraction_engine
+
+PARSE_COUNT = 0
+
+
+def _counting_presentation(*args, **kwargs):
+    global PARSE_COUNT
+    PARSE_COUNT += 1
+    return pptx.Presentation(*args, **kwargs)
+
+
+def legacy_extract(pptx_file, output_dir):
+    """Reproduce the per-media-file parsing loop used before the extraction engine."""
+    with zipfile.ZipFile(pptx_file, 'r') as zip_ref:
+        for zip_info in zip_ref.infolist():
+            if zip_info.filename.startswith("ppt/media/"):
+                data = zip_ref.read(zip_info.filename)
+                with open(os.path.join(output_dir, os.path.basename(zip_info.filename)), "wb") as f:
+                    f.write(data)
+                slide_num = int(re.search(r'\d+', zip_info.filename).group())
+                presentation = _counting_presentation(pptx_file)
+                if slide_num > len(presentation.slides):
+                    continue
+                for shape in presentation.slides[slide_num - 1].shapes:
+                    if hasattr(shape, "image") and shape.image.blob == zip_ref.read(zip_info.filename):
+                        break
+    presentation = _counting_presentation(pptx_file)
+    for slide in presentation.slides:
+        for shape in slide.shapes:
+            if hasattr(shape, "text") and shape.text.strip():
+                shape.text.strip()
+
+
+def engine_extract(pptx_file, output_dir):
+    extraction_engine.extract_deck(pptx_file, output_dir)
+
+
+def run(name, func, pptx_file, repeat):
+    global PARSE_COUNT
+    PARSE_COUNT = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as output_dir:
+            func(pptx_file, output_dir)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{name:<8} parses/run={PARSE_COUNT // repeat:<6} wall={elapsed * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pptx_file")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    extraction_engine.Presentation = _counting_presentation
+    run("legacy", legacy_extract, args.pptx_file, args.repeat)
+    run("engine", engine_extract, args.pptx_file, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
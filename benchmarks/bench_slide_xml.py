@@ -0,0 +1,118 @@
+"""
+Compare the wall time of the direct slide-XML text extractor with python-pptx.
+
+Without a deck argument, a large synthetic deck with text boxes, placeholders, nested groups and
+tables is generated. Both extractors are timed on top-level shapes only and with groups and tables
+included; tests/test_slide_xml.py checks that their results are identical on the same kind of deck.
+
+Usage:
+    python benchmarks/bench_slide_xml.py [path/to/deck.pptx] [--slides N] [--shapes N] [--repeat N]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pptx import Presentation
+from pptx.util import Inches
+
+from pictory.slide_xml import extract_text_boxes
+
+
+def build_deck(path, slides, shapes):
+    presentation = Presentation()
+    layouts = list(presentation.slide_layouts)
+    for slide_num in range(slides):
+        slide = presentation.slides.add_slide(layouts[slide_num % len(layouts)])
+        for placeholder in slide.placeholders:
+            if placeholder.has_text_frame:
+                placeholder.text_frame.text = f"Slide {slide_num} placeholder {placeholder.placeholder_format.idx}"
+        for i in range(shapes):
+            text_frame = slide.shapes.add_textbox(Inches(i % 8), Inches(i // 8), Inches(2), Inches(1)).text_frame
+            text_frame.text = f"Shape {i} of slide {slide_num}"
+            text_frame.add_paragraph().text = "second paragraph"
+        group = slide.shapes.add_group_shape()
+        group.shapes.add_textbox(Inches(1), Inches(1), Inches(2), Inches(1)).text_frame.text = f"Grouped {slide_num}"
+        group.shapes.add_group_shape().shapes.add_textbox(Inches(2), Inches(2), Inches(1), Inches(1)).text_frame.text = "Nested"
+        group.left = Inches(3)
+        table = slide.shapes.add_table(3, 3, Inches(0), Inches(5), Inches(6), Inches(1.5)).table
+        for row in range(3):
+            for col in range(3):
+                table.cell(row, col).text = f"r{row}c{col}"
+        table.cell(0, 0).merge(table.cell(0, 1))
+    presentation.save(path)
+
+
+def pptx_top_level(pptx_file):
+    slides = {}
+    for slide_num, slide in enumerate(Presentation(pptx_file).slides, start=1):
+        texts = []
+        for shape in slide.shapes:
+            if shape.has_text_frame and shape.text_frame.text.strip():
+                texts.append((shape.text_frame.text.strip(), shape.left, shape.top, shape.width, shape.height))
+        slides[slide_num] = texts
+    return slides
+
+
+def _walk_text(shapes):
+    for shape in shapes:
+        if shape.shape_type == 6:  # Group shape
+            yield from _walk_text(shape.shapes)
+        elif shape.has_text_frame:
+            if shape.text_frame.text.strip():
+                yield shape.text_frame.text.strip()
+        elif getattr(shape, "has_table", False) and shape.has_table:
+            for row in shape.table.rows:
+                for cell in row.cells:
+                    if not cell.is_spanned and cell.text_frame.text.strip():
+                        yield cell.text_frame.text.strip()
+
+
+def pptx_nested_text(pptx_file):
+    return {slide_num: list(_walk_text(slide.shapes)) for slide_num, slide in enumerate(Presentation(pptx_file).slides, start=1)}
+
+
+def xml_top_level(pptx_file):
+    return {
+        slide_num: [(t.text, t.box.left, t.box.top, t.box.width, t.box.height) for t in text_boxes]
+        for slide_num, text_boxes in extract_text_boxes(pptx_file, nested=False).items()
+    }
+
+
+def xml_nested_text(pptx_file):
+    return {slide_num: [t.text for t in text_boxes] for slide_num, text_boxes in extract_text_boxes(pptx_file).items()}
+
+
+def timed(func, pptx_file, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(pptx_file)
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pptx_file", nargs="?", help="deck to time (default: a generated deck)")
+    parser.add_argument("--slides", type=int, default=200)
+    parser.add_argument("--shapes", type=int, default=20, help="text boxes per generated slide")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pptx_file = args.pptx_file
+        if pptx_file is None:
+            pptx_file = os.path.join(tmp, "synthetic.pptx")
+            build_deck(pptx_file, args.slides, args.shapes)
+
+        for name, reference, fast in (("top-level", pptx_top_level, xml_top_level), ("nested", pptx_nested_text, xml_nested_text)):
+            _, pptx_seconds = timed(reference, pptx_file, args.repeat)
+            _, xml_seconds = timed(fast, pptx_file, args.repeat)
+            print(f"{name:<10} python-pptx={pptx_seconds * 1000:8.1f} ms  slide-xml={xml_seconds * 1000:8.1f} ms  "
+                  f"speedup={pptx_seconds / xml_seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
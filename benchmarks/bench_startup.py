@@ -0,0 +1,76 @@
+"""
+Measure CLI startup: `python -m pictory --help` and text-only extraction, against time targets.
+
+Each command runs in a fresh interpreter, so the timings include every import it triggers. The
+interpreter's own startup (`python -c pass`) is measured too, and targets apply to the time on top
+of it, so they hold across machines. A second run under `-X importtime` lists the heavy
+dependencies (python-pptx, boto3, NumPy, Pillow) each command loaded; the script exits 1 when a
+command loads one of them or misses its target.
+
+Usage:
+    python benchmarks/bench_startup.py [--deck path.pptx] [--repeat N] [--help-target SECONDS] [--text-target SECONDS]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = ["-m", "pictory"]
+
+# Top-level packages neither command may import
+HEAVY_MODULES = ("pptx", "boto3", "botocore", "numpy", "PIL")
+
+
+def run_seconds(argv, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True, cwd=ROOT)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def imported_modules(argv):
+    # -X importtime writes one "import time: self | cumulative | name" line per module to stderr
+    result = subprocess.run([sys.executable, "-X", "importtime"] + argv, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True, check=True, cwd=ROOT)
+    return {line.rsplit("|", 1)[1].strip().split(".")[0] for line in result.stderr.splitlines() if line.startswith("import time:") and "|" in line}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--deck", default=os.path.join(ROOT, "jpictory.pptx"))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--help-target", type=float, default=0.1, help="allowed seconds of `--help` on top of interpreter startup")
+    parser.add_argument("--text-target", type=float, default=0.2, help="allowed seconds of text-only extraction on top of interpreter startup")
+    args = parser.parse_args()
+
+    commands = {
+        "help": (CLI + ["--help"], args.help_target),
+        "extract_text": (CLI + ["extract", "--text-only", os.path.abspath(args.deck), "--output", os.devnull], args.text_target),
+    }
+    floor = run_seconds(["-c", "pass"], args.repeat)
+    print(f"{'command':<14} {'wall':>8} {'over python':>12} {'target':>8}  heavy imports")
+    print(f"{'python':<14} {floor * 1000:6.0f}ms")
+
+    failures = []
+    for name, (argv, target) in commands.items():
+        seconds = run_seconds(argv, args.repeat)
+        heavy = sorted(set(HEAVY_MODULES) & imported_modules(argv))
+        print(f"{name:<14} {seconds * 1000:6.0f}ms {(seconds - floor) * 1000:10.0f}ms {target * 1000:6.0f}ms  {', '.join(heavy) or '-'}")
+        if seconds - floor > target:
+            failures.append(f"{name} took {(seconds - floor) * 1000:.0f}ms over interpreter startup, target {target * 1000:.0f}ms")
+        if heavy:
+            failures.append(f"{name} imported {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
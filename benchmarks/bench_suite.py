@@ -0,0 +1,241 @@
+"""
+Run the extraction hot paths against synthetic decks and record wall time, peak RSS, parse count and bytes written.
+
+Every (scale, target) run happens in a fresh process so peak RSS belongs to that run alone. Uploads
+go to an in-memory fake S3 client, so no AWS access is needed. Results can be saved as JSON and
+compared against an earlier run; the script exits 1 when a metric regressed beyond the tolerance.
+
+Usage:
+    python benchmarks/bench_suite.py [--scales small medium shared] [--targets NAME ...] [--deck path.pptx ...]
+        [--repeat N] [--decks-dir DIR] [--output results.json] [--baseline old.json] [--tolerance 0.2]
+"""
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import importlib
+import resource
+import tempfile
+import statistics
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from deck_generator import generate_deck
+
+BUCKET = "benchmark-bucket"
+
+# Deck parameters passed to `deck_generator.generate_deck`
+SCALES = {
+    "small": {"slides": 10, "shapes": 5, "images": 1, "image_size": 128, "shared_media": False, "video_size": 0},
+    "medium": {"slides": 100, "shapes": 10, "images": 2, "image_size": 256, "shared_media": False, "video_size": 256 * 1024},
+    "shared": {"slides": 100, "shapes": 10, "images": 2, "image_size": 256, "shared_media": True, "video_size": 256 * 1024},
+    "large": {"slides": 300, "shapes": 20, "images": 2, "image_size": 256, "shared_media": False, "video_size": 512 * 1024},
+}
+DEFAULT_SCALES = ("small", "medium", "shared")
+
+# Benchmark targets and the (module, function) each one runs
+TARGETS = {
+    "extract_slide_text": ("part1_v2", "extract_slide_text"),
+    "extract_media_from_pptx": ("part1_v2", "extract_media_from_pptx"),
+    "extract_slide_text_and_media": ("part1_v2", "extract_slide_text_and_media"),
+    "extract_media_from_pptx_s3": ("full_1_2", "extract_media_from_pptx"),
+    "extract_slide_text_and_media_s3": ("full_1_2", "extract_slide_text_and_media"),
+    "convert_pptx_to_images": ("part2", "convert_pptx_to_images"),
+    "convert_pptx_to_images_pipelined": ("part2", "convert_pptx_to_images_pipelined"),
+}
+
+# Metrics compared against a baseline; wall time and RSS get the tolerance, counts must not grow
+TIMED_METRICS = ("wall_seconds", "peak_rss_mb")
+COUNTED_METRICS = ("parse_count", "bytes_written")
+
+
+class FakeS3Client:
+    """In-memory stand-in for the boto3 S3 client calls made by S3Uploader."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.objects = {}
+        self.bytes_uploaded = 0
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            from botocore.exceptions import ClientError
+
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        return {"ContentLength": self.objects[(Bucket, Key)]}
+
+    def upload_file(self, path, bucket_name, key, Config=None):
+        if self.latency:
+            time.sleep(self.latency)
+        size = os.path.getsize(path)
+        self.objects[(bucket_name, key)] = size
+        self.bytes_uploaded += size
+
+
+def _bytes_written():
+    # Bytes passed to write() by every thread of this process, as counted by Linux
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def run_target(target, deck, workdir, results):
+    """Run one target once in the current (fresh) process and put its metrics on the results queue."""
+    import pptx
+    from pictory import instrumentation, s3_uploader
+
+    parse_count = [0]
+    presentation = pptx.Presentation
+
+    def counting_presentation(*args, **kwargs):
+        parse_count[0] += 1
+        return presentation(*args, **kwargs)
+
+    # Patch before the target module binds `from pptx import Presentation`
+    pptx.Presentation = counting_presentation
+    fake_s3 = FakeS3Client()
+    s3_uploader.make_s3_client = lambda *args, **kwargs: fake_s3
+
+    # Load what the targets import lazily, so wall time covers the work and not the imports
+    from pictory import extraction_engine
+    import boto3.s3.transfer
+
+    module_name, function_name = TARGETS[target]
+    module = importlib.import_module(f"pictory.{module_name}")
+    func = getattr(module, function_name)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    os.chdir(workdir)
+    output_dir = os.path.join(workdir, "output")
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    written = _bytes_written()
+    start = time.perf_counter()
+    if module_name == "part1_v2":
+        result = func(deck) if function_name == "extract_slide_text" else func(deck, output_dir)
+    elif module_name == "full_1_2":
+        result = func(deck, output_dir, BUCKET, "", "")
+    else:
+        result = func(deck, BUCKET, "benchmark", "", "")
+    wall_seconds = time.perf_counter() - start
+    after = _bytes_written()
+
+    results.put({
+        "wall_seconds": wall_seconds,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "baseline_rss_mb": baseline_rss / 1024,
+        "parse_count": parse_count[0],
+        "bytes_written": after - written if written is not None and after is not None else None,
+        "bytes_uploaded": fake_s3.bytes_uploaded,
+        "ok": bool(result),
+        "stages": instrumentation.METRICS.snapshot()["spans"]
+    })
+
+
+def measure(target, deck, repeat):
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as workdir:
+            results = context.Queue()
+            process = context.Process(target=run_target, args=(target, os.path.abspath(deck), workdir, results))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                raise RuntimeError(f"{target} exited with code {process.exitcode}")
+            runs.append(results.get())
+    # Median wall time, worst case for everything else
+    return {
+        "wall_seconds": statistics.median(run["wall_seconds"] for run in runs),
+        "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+        "baseline_rss_mb": max(run["baseline_rss_mb"] for run in runs),
+        "parse_count": max(run["parse_count"] for run in runs),
+        "bytes_written": max((run["bytes_written"] for run in runs if run["bytes_written"] is not None), default=None),
+        "bytes_uploaded": max(run["bytes_uploaded"] for run in runs),
+        "ok": all(run["ok"] for run in runs),
+        "repeat": repeat,
+        "stages": runs[-1]["stages"]
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, metrics in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        for metric in TIMED_METRICS + COUNTED_METRICS:
+            if metrics.get(metric) is None or old.get(metric) is None:
+                continue
+            allowed = old[metric] * (1 + tolerance) if metric in TIMED_METRICS else old[metric]
+            if metrics[metric] > allowed:
+                regressions.append(f"{name} {metric}: {old[metric]:.6g} -> {metrics[metric]:.6g}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", nargs="+", choices=sorted(SCALES), default=list(DEFAULT_SCALES))
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=list(TARGETS))
+    parser.add_argument("--deck", nargs="*", default=[], help="existing decks to benchmark in addition to the generated ones")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--decks-dir", default=None, help="keep generated decks here and reuse them (default: a temporary directory)")
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    parser.add_argument("--baseline", default=None, help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative growth of wall time and peak RSS")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        decks_dir = args.decks_dir or tmp
+        os.makedirs(decks_dir, exist_ok=True)
+        decks = {}
+        for scale in args.scales:
+            params = SCALES[scale]
+            path = os.path.join(decks_dir, f"{scale}_" + "_".join(f"{key}{int(value)}" for key, value in params.items()) + ".pptx")
+            if not os.path.exists(path):
+                generate_deck(path, **params)
+            decks[scale] = path
+        for path in args.deck:
+            decks[os.path.splitext(os.path.basename(path))[0]] = path
+
+        results = {}
+        print(f"{'scale':<10} {'target':<34} {'wall':>9} {'peak RSS':>10} {'parses':>7} {'written':>10} {'uploaded':>10}  ok")
+        for scale, deck in decks.items():
+            for target in args.targets:
+                metrics = measure(target, deck, args.repeat)
+                metrics["deck_bytes"] = os.path.getsize(deck)
+                results[f"{scale}/{target}"] = metrics
+                written = f"{metrics['bytes_written'] / 1024 / 1024:.1f} MiB" if metrics["bytes_written"] is not None else "n/a"
+                print(f"{scale:<10} {target:<34} {metrics['wall_seconds'] * 1000:7.0f}ms {metrics['peak_rss_mb']:7.1f} MiB "
+                      f"{metrics['parse_count']:>7} {written:>10} {metrics['bytes_uploaded'] / 1024 / 1024:6.1f} MiB  {'yes' if metrics['ok'] else 'NO'}")
+
+    report = {
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "scales": {scale: SCALES[scale] for scale in args.scales},
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Generate synthetic PowerPoint decks at controlled scales for the benchmarks.
+
+Decks are reproducible: the same parameters and seed always give the same slide content and media
+bytes. Images are noise PNGs, so their size is close to 3 * size * size bytes whatever the
+compression, and shared media puts the same image and video on every slide.
+
+Usage:
+    python benchmarks/deck_generator.py out.pptx [--slides N] [--shapes N] [--images N] [--image-size PX]
+        [--shared-media] [--video-size BYTES] [--seed N]
+"""
+import io
+import os
+import zlib
+import struct
+import random
+import argparse
+import tempfile
+
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+WORDS = ("slide", "video", "media", "chart", "growth", "market", "science", "physics", "quarter", "result",
+         "summary", "design", "system", "upload", "render", "insight", "team", "goal", "plan", "review")
+
+
+def random_bytes(rng, n):
+    """n reproducible random bytes from `rng` (`random.Random.randbytes` needs Python 3.9)."""
+    return rng.getrandbits(8 * n).to_bytes(n, "little") if n else b""
+
+
+def noise_png(size, rng):
+    """Build a size x size RGB PNG of random pixels without an imaging library."""
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+    rows = b"".join(b"\x00" + random_bytes(rng, size * 3) for _ in range(size))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows, 1)) + chunk(b"IEND", b""))
+
+
+def generate_deck(path, slides=10, shapes=5, images=1, image_size=256, shared_media=False, video_size=0, seed=0):
+    """
+    Write a synthetic deck.
+
+    Args:
+        path (str): Where to save the deck.
+        slides (int): The number of slides.
+        shapes (int): The number of text boxes per slide, each with a few words over two paragraphs.
+        images (int): The number of pictures per slide.
+        image_size (int): The width and height of each picture in pixels.
+        shared_media (bool): Whether every slide reuses the same images (and video) instead of unique ones.
+        video_size (int): The size in bytes of a movie embedded on every slide, or 0 for none.
+        seed (int): The random seed.
+
+    Returns:
+        Dict[str, int]: The deck's 'slides', 'media_parts' (distinct media in the package) and 'bytes' (file size).
+    """
+    rng = random.Random(seed)
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]  # Blank
+    shared_images = [noise_png(image_size, rng) for _ in range(images)] if shared_media else None
+    shared_video = random_bytes(rng, video_size) if shared_media and video_size else None
+    poster = noise_png(16, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for slide_num in range(slides):
+            slide = presentation.slides.add_slide(layout)
+            for i in range(shapes):
+                text_frame = slide.shapes.add_textbox(Inches(0.2 + (i % 4) * 2.4), Inches(0.2 + (i // 4) * 0.8), Inches(2.2), Inches(0.7)).text_frame
+                text_frame.text = " ".join(rng.choice(WORDS) for _ in range(4))
+                text_frame.add_paragraph().text = f"slide {slide_num + 1} shape {i + 1}"
+                text_frame.paragraphs[0].runs[0].font.size = Pt(12)
+            for i in range(images):
+                blob = shared_images[i] if shared_media else noise_png(image_size, rng)
+                slide.shapes.add_picture(io.BytesIO(blob), Inches(1 + i * 0.5), Inches(3 + i * 0.3), Inches(3), Inches(3))
+            if video_size:
+                video_path = os.path.join(tmp, f"video{0 if shared_media else slide_num}.mp4")
+                if not os.path.exists(video_path):
+                    with open(video_path, "wb") as f:
+                        f.write(shared_video if shared_media else random_bytes(rng, video_size))
+                slide.shapes.add_movie(video_path, Inches(6), Inches(3), Inches(3), Inches(2), poster_frame_image=io.BytesIO(poster), mime_type="video/mp4")
+        presentation.save(path)
+
+    media_parts = {part.partname for part in presentation.part.package.iter_parts() if part.partname.startswith("/ppt/media/")}
+    return {"slides": slides, "media_parts": len(media_parts), "bytes": os.path.getsize(path)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--slides", type=int, default=10)
+    parser.add_argument("--shapes", type=int, default=5)
+    parser.add_argument("--images", type=int, default=1)
+    parser.add_argument("--image-size", type=int, default=256)
+    parser.add_argument("--shared-media", action="store_true")
+    parser.add_argument("--video-size", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    info = generate_deck(args.path, args.slides, args.shapes, args.images, args.image_size, args.shared_media, args.video_size, args.seed)
+    print(f"{args.path}: {info['slides']} slides, {info['media_parts']} media parts, {info['bytes'] / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import os
+import asyncio
+import logging
+import functools
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Union
+
+from .instrumentation import count
+from .media_store import MediaStore
+from .s3_uploader import DEFAULT_WORKERS, S3Uploader
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Media files written to the local store at once
+DEFAULT_MAX_WRITES = 4
+
+# Each function below runs blocking work off the event loop and keeps the semaphores' worth of writes and
+# uploads in flight. Cancelling the calling task stops it at the next await: parsing stops between slides,
+# queued writes and uploads are dropped, and the ones already running are allowed to finish before it returns.
+
+
+async def _make_uploader(bucket_name: str, max_uploads: int, access_key_id: str, secret_access_key: str,
+                         executor: Optional[Executor] = None) -> S3Uploader:
+    # Creating the client imports boto3 and loads the S3 service model, which would stall the loop
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(
+        S3Uploader, bucket_name, max_workers=max_uploads, aws_access_key_id=access_key_id, aws_secret_access_key=secret_access_key))
+
+
+async def _cancel_all(tasks: Iterable[asyncio.Future]):
+    tasks = list(tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _close_uploader(uploader_future: Optional[asyncio.Future]):
+    if uploader_future is None:
+        return
+    if not uploader_future.done():
+        # The client is still being created; close it once it is
+        await asyncio.gather(uploader_future, return_exceptions=True)
+    if uploader_future.cancelled() or uploader_future.exception() is not None:
+        return
+    # Waits for the uploads already running, off the loop
+    await asyncio.get_running_loop().run_in_executor(None, uploader_future.result().close)
+
+
+def _next_slide(slides, lock: threading.Lock):
+    with lock:
+        return next(slides, None)
+
+
+def _close_slides(slides, lock: threading.Lock):
+    # Waits for a step still running after a cancellation; closing releases the deck's memory budget
+    # reservation and its package at once instead of whenever the generator is collected
+    with lock:
+        slides.close()
+
+
+def _store_media(store: MediaStore, media) -> Dict[str, Union[str, int, bool]]:
+    # Runs in a write thread; each call opens the package afresh, so writes do not share a file position
+    with media.open() as stream:
+        entry, _ = store.add_stream(stream, os.path.splitext(media.name)[1])
+    count("bytes_read", entry["size"])
+    return entry
+
+
+async def extract_slide_text_and_media_async(pptx_file: str, output_dir: str, bucket_name: str, access_key_id: str, secret_access_key: str,
+                                             media_store: Optional[MediaStore] = None, executor: Optional[Executor] = None,
+                                             max_writes: int = DEFAULT_MAX_WRITES,
+                                             max_uploads: int = DEFAULT_WORKERS) -> Dict[int, Dict[str, Union[str, List[Dict]]]]:
+    """
+    Async counterpart of `full_1_2.extract_slide_text_and_media`, returning the same paired data.
+
+    The presentation is parsed one slide at a time on `executor`, so the event loop stays free while
+    python-pptx works. As soon as a slide is parsed, its media is written to the store and uploaded
+    while the next slides are parsed; at most `max_writes` writes and `max_uploads` uploads run at once.
+    Each unique media file is written and uploaded once, however many shapes or slides use it.
+    The deck manifest is not supported; use the blocking function for incremental re-processing.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        output_dir (str): The directory of the media store, when `media_store` is not given.
+        bucket_name (str): The name of the S3 bucket.
+        access_key_id (str): The AWS access key id.
+        secret_access_key (str): The AWS secret access key.
+        media_store (Optional[MediaStore]): A store shared across decks, or None for one in `output_dir`.
+        executor (Optional[Executor]): The thread pool parsing runs on, or None for the loop's default executor.
+            The slide iterator lives in this process, so a process pool cannot be used.
+        max_writes (int): The maximum number of media files written at once.
+        max_uploads (int): The maximum number of media files uploaded at once.
+
+    Returns:
+        Dict[int, Dict[str, Union[str, List[Dict]]]]: A dictionary mapping slide numbers to dictionaries with
+            'text' and 'media_info' ('path', 'key', 'position' and 'upload' of each media shape).
+
+    Raises:
+        asyncio.CancelledError: If the calling task is cancelled; the media already written stays in the store.
+    """
+    # python-pptx is only imported when slides have to be parsed
+    from .extraction_engine import iter_deck
+
+    loop = asyncio.get_running_loop()
+    store = media_store if media_store is not None else MediaStore(output_dir)
+    write_slots = asyncio.Semaphore(max_writes)
+    upload_slots = asyncio.Semaphore(max_uploads)
+    write_executor = ThreadPoolExecutor(max_workers=max_writes, thread_name_prefix="media-write")
+    uploader_future = asyncio.ensure_future(_make_uploader(bucket_name, max_uploads, access_key_id, secret_access_key, executor))
+    media_tasks = {}
+    slides = None
+    slides_lock = threading.Lock()
+
+    async def store_and_upload(media):
+        async with write_slots:
+            entry = await loop.run_in_executor(write_executor, _store_media, store, media)
+        # Shielded: cancelling one task must not cancel the client every task shares
+        uploader = await asyncio.shield(uploader_future)
+        async with upload_slots:
+            # None means the media was already uploaded
+            future = store.upload(uploader, entry)
+            result = await asyncio.wrap_future(future) if future is not None else None
+        return entry, result
+
+    try:
+        slides = iter_deck(pptx_file)
+        records = []
+        while True:
+            record = await loop.run_in_executor(executor, _next_slide, slides, slides_lock)
+            if record is None:
+                break
+            records.append(record)
+            for media in record.media:
+                if media.name not in media_tasks:
+                    media_tasks[media.name] = asyncio.ensure_future(store_and_upload(media))
+        results = dict(zip(media_tasks, await asyncio.gather(*media_tasks.values())))
+    except FileNotFoundError:
+        logger.error(f"Error: File '{pptx_file}' not found.")
+        return {}
+    except Exception as e:
+        logger.error(f"An error occurred during PPTX extraction: {e}")
+        return {}
+    finally:
+        # On success every task is done already; on failure or cancellation pending work is dropped
+        await _cancel_all(task for task in media_tasks.values() if not task.done())
+        if slides is not None:
+            await loop.run_in_executor(executor, _close_slides, slides, slides_lock)
+        # The write semaphore keeps the pool's queue empty, so only running writes remain
+        write_executor.shutdown(wait=False)
+        await _close_uploader(uploader_future)
+
+    paired_data = {}
+    for record in records:
+        media_info = []
+        for media in record.media:
+            entry, result = results[media.name]
+            media_info.append({"path": entry["path"], "key": entry["key"], "position": media.position, "upload": result})
+        paired_data[record.slide_num] = {"text": "\n".join(record.text), "media_info": media_info}
+
+    await loop.run_in_executor(None, store.save)
+    logger.info(f"Media store: {store.stats}")
+    return paired_data
+
+
+async def upload_images_to_s3_async(image_paths: Iterable[str], bucket_name: str, folder_name: str, aws_access_key_id: str, aws_secret_access_key: str,
+                                    max_uploads: int = DEFAULT_WORKERS) -> List[Dict[str, Union[str, bool, int, float, None]]]:
+    """
+    Async counterpart of `part2.upload_images_to_s3`: upload files to '<folder_name>/<file name>' concurrently.
+
+    Args:
+        image_paths (Iterable[str]): The local paths of the files.
+        bucket_name (str): The name of the S3 bucket.
+        folder_name (str): The S3 folder.
+        aws_access_key_id (str): The AWS access key id.
+        aws_secret_access_key (str): The AWS secret access key.
+        max_uploads (int): The maximum number of files uploaded at once.
+
+    Returns:
+        List[Dict[str, Union[str, bool, int, float, None]]]: The `S3Uploader` upload results, in input order.
+
+    Raises:
+        asyncio.CancelledError: If the calling task is cancelled; files not yet started are not uploaded.
+    """
+    upload_slots = asyncio.Semaphore(max_uploads)
+    uploader_future = asyncio.ensure_future(_make_uploader(bucket_name, max_uploads, aws_access_key_id, aws_secret_access_key))
+
+    async def upload(path):
+        # Shielded: cancelling one task must not cancel the client every task shares
+        uploader = await asyncio.shield(uploader_future)
+        async with upload_slots:
+            return await asyncio.wrap_future(uploader.submit(path, f"{folder_name}/{os.path.basename(path)}"))
+
+    tasks = [asyncio.ensure_future(upload(path)) for path in image_paths]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        await _cancel_all(task for task in tasks if not task.done())
+        await _close_uploader(uploader_future)
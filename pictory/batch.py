@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import logging
+import argparse
+import importlib
+import traceback
+from typing import Dict, List, Optional, Union
+
+from . import instrumentation
+from . import memory_budget
+from .instrumentation import METRICS, merge_snapshots
+from .records import FRAME_SIZE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Batch modes and the (module, function) each one runs per deck
+MODES = {
+    "extract": ("part1_v2", "extract_slide_text_and_media"),
+    "extract_upload": ("full_1_2", "extract_slide_text_and_media"),
+    "convert": ("part2", "convert_pptx_to_images"),
+}
+
+
+def load_decks(source: str) -> List[str]:
+    """
+    List the decks to process from a directory or a manifest file.
+
+    Args:
+        source (str): A directory searched recursively for .pptx files, or a manifest that is either
+            a JSON list of paths or a text file with one path per line. Relative manifest paths are
+            resolved against the manifest's directory.
+
+    Returns:
+        List[str]: The absolute deck paths, sorted for directories and in manifest order otherwise.
+    """
+    if os.path.isdir(source):
+        decks = []
+        for root, _, files in os.walk(os.path.abspath(source)):
+            decks.extend(os.path.join(root, name) for name in files if name.lower().endswith(".pptx") and not name.startswith("~$"))
+        return sorted(decks)
+
+    with open(source) as f:
+        content = f.read()
+    try:
+        entries = json.loads(content)
+    except json.JSONDecodeError:
+        entries = [line.strip() for line in content.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+    base = os.path.dirname(os.path.abspath(source))
+    return [entry if os.path.isabs(entry) else os.path.join(base, entry) for entry in entries]
+
+
+def deck_output_dirs(decks: List[str], output_root: str) -> List[str]:
+    """
+    Give every deck its own output directory under the output root, suffixing repeated deck names.
+
+    Args:
+        decks (List[str]): The deck paths.
+        output_root (str): The directory holding the per-deck output directories.
+
+    Returns:
+        List[str]: The output directory of each deck, in deck order.
+    """
+    seen = {}
+    output_dirs = []
+    for deck in decks:
+        name = os.path.splitext(os.path.basename(deck))[0]
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            name = f"{name}_{seen[name]}"
+        output_dirs.append(os.path.abspath(os.path.join(output_root, name)))
+    return output_dirs
+
+
+def process_deck(pptx_file: str, output_dir: str, mode: str, options: Dict[str, str]) -> Dict[str, Union[str, bool, float, None, dict, list]]:
+    """
+    Run one deck through the extraction logic inside a worker process.
+
+    Everything the deck writes goes under its own output directory, including the 'temp' directory of
+    `convert_pptx_to_images`, so decks never collide. The worker's working directory is left alone:
+    workers are reused, and relative paths and lazy imports must resolve the same for every deck.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        output_dir (str): The deck's own output directory.
+        mode (str): One of the keys of `MODES`.
+        options (Dict[str, str]): 'bucket_name', 'folder_name', 'aws_access_key_id' and 'aws_secret_access_key'.
+
+    Returns:
+        Dict[str, Union[str, bool, float, None, dict, list]]: The deck result with 'deck', 'output_dir', 'ok',
+            'seconds', 'result', 'error', 'metrics' and 'memory' keys. 'ok' is False when the deck raised or produced an
+            empty result, which is how the extraction functions report errors they catch themselves.
+            'metrics' is the deck's `instrumentation` snapshot: time per stage and byte, dedup and retry counters.
+            'memory' is the deck's `memory_budget.deck_memory` report: peak RSS and peak budget use.
+    """
+    start = time.perf_counter()
+    # A worker runs one deck at a time, so its metrics since the reset belong to this deck
+    METRICS.reset()
+    module_name, function_name = MODES[mode]
+    func = getattr(importlib.import_module(f".{module_name}", __package__), function_name)
+
+    pptx_file = os.path.abspath(pptx_file)
+    os.makedirs(output_dir, exist_ok=True)
+    with memory_budget.deck_memory(pptx_file) as memory:
+        try:
+            if mode == "extract":
+                result = func(pptx_file, output_dir)
+            elif mode == "extract_upload":
+                result = func(pptx_file, output_dir, options["bucket_name"], options["aws_access_key_id"], options["aws_secret_access_key"])
+            else:
+                # Batch and service jobs upload video renditions; direct callers get the original images unless they ask
+                result = func(pptx_file, options["bucket_name"], options["folder_name"], options["aws_access_key_id"], options["aws_secret_access_key"],
+                              frame_size=FRAME_SIZE, temp_dir=os.path.join(output_dir, "temp"))
+            error = None
+        except Exception:
+            result = None
+            error = traceback.format_exc()
+
+    return {
+        "deck": pptx_file,
+        "output_dir": output_dir,
+        "ok": error is None and bool(result),
+        "seconds": time.perf_counter() - start,
+        "result": result,
+        "error": error,
+        "metrics": METRICS.snapshot(),
+        "memory": memory
+    }
+
+
+def _init_worker(memory_limit: Optional[int] = None):
+    # Exporters are set up per worker from the environment; a forked worker drops the parent's sinks
+    # first so events are not sent twice, and never binds the parent's scrape port
+    METRICS.sinks = []
+    instrumentation.configure_from_env(serve=False)
+    memory_budget.configure_from_env()
+    if memory_limit is not None:
+        memory_budget.BUDGET.configure(memory_limit)
+
+
+def run_batch(decks: List[str], output_root: str, mode: str = "extract", max_workers: Optional[int] = None,
+              bucket_name: str = "", folder_name: str = "", aws_access_key_id: str = "", aws_secret_access_key: str = "",
+              writer=None) -> Dict[str, Union[list, dict]]:
+    """
+    Fan decks out over a process pool and aggregate their results.
+
+    python-pptx/lxml parsing is CPU-bound, so every deck runs in its own worker process with its own
+    output directory; at most `max_workers` decks are processed at once. The memory budget is shared
+    out: each worker gets `memory_budget.BUDGET.limit` divided by the number of workers.
+
+    Args:
+        decks (List[str]): The deck paths.
+        output_root (str): The directory holding the per-deck output directories.
+        mode (str): One of the keys of `MODES`.
+        max_workers (Optional[int]): The number of worker processes, or None for one per CPU.
+        bucket_name (str): The S3 bucket for the uploading modes.
+        folder_name (str): The S3 folder for the 'convert' mode.
+        aws_access_key_id (str): The AWS access key id; empty to use the default credential chain.
+        aws_secret_access_key (str): The AWS secret access key; empty to use the default credential chain.
+        writer (Optional[record_writer.RecordWriter]): Receives each deck result as soon as the deck finishes.
+
+    Returns:
+        Dict[str, Union[list, dict]]: 'decks' with one result per deck in input order, and 'summary' with
+            the deck counts, total wall time, summed per-deck time and the metrics of all decks combined.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown batch mode '{mode}', expected one of {sorted(MODES)}")
+    options = {
+        "bucket_name": bucket_name,
+        "folder_name": folder_name,
+        "aws_access_key_id": aws_access_key_id,
+        "aws_secret_access_key": aws_secret_access_key
+    }
+
+    # Imported here so that building the CLI parser does not load multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    start = time.perf_counter()
+    results = [None] * len(decks)
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(memory_budget.worker_share(max_workers),)) as executor:
+        futures = {
+            # Relative paths are resolved here, against the caller's working directory, not in the workers
+            executor.submit(process_deck, os.path.abspath(deck), output_dir, mode, options): i
+            for i, (deck, output_dir) in enumerate(zip(decks, deck_output_dirs(decks, output_root)))
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = {"deck": decks[i], "output_dir": None, "ok": False, "seconds": 0.0, "result": None, "error": str(e), "metrics": None, "memory": None}
+            if writer is not None:
+                writer.write(results[i])
+            status = "done" if results[i]["ok"] else "FAILED"
+            logger.info(f"[{sum(r is not None for r in results)}/{len(decks)}] {status} {decks[i]} in {results[i]['seconds']:.2f}s")
+
+    succeeded = sum(result["ok"] for result in results)
+    return {
+        "decks": results,
+        "summary": {
+            "total": len(decks),
+            "succeeded": succeeded,
+            "failed": len(decks) - succeeded,
+            "wall_seconds": time.perf_counter() - start,
+            "deck_seconds": sum(result["seconds"] for result in results),
+            "metrics": merge_snapshots(result["metrics"] for result in results if result["metrics"] is not None),
+            "peak_rss": max((result["memory"]["peak_rss"] or 0 for result in results if result["memory"] is not None), default=None)
+        }
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add the batch options to a parser; shared with the `batch` subcommand of `cli`."""
+    parser.add_argument("source", help="directory of .pptx files, or a manifest (JSON list or one path per line)")
+    parser.add_argument("--output-dir", default="batch_output", help="root of the per-deck output directories")
+    parser.add_argument("--mode", choices=sorted(MODES), default="extract")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--bucket", default="", help="S3 bucket for the extract_upload and convert modes")
+    parser.add_argument("--folder", default="", help="S3 folder for the convert mode")
+    parser.add_argument("--results", default=None, help="write the aggregated JSON here (default: <output-dir>/results.json)")
+    parser.add_argument("--results-stream", default=None, metavar="PATH",
+                        help="also append each deck result here as it finishes (.ndjson, or .msgpack with msgpack installed)")
+    parser.add_argument("--json-logs", action="store_true", help="log structured JSON lines, including per-stage span events")
+    parser.add_argument("--statsd", default=None, metavar="HOST:PORT", help="send span timers and counters to a StatsD collector")
+    parser.add_argument("--metrics-file", default=None, help="write the combined metrics in Prometheus text format here")
+    add_memory_arguments(parser)
+
+
+def add_memory_arguments(parser: argparse.ArgumentParser):
+    """Add the memory budget options; shared with the `extract`, `upload` and `serve` subcommands of `cli`."""
+    parser.add_argument("--memory-budget", type=_size, default=None, metavar="SIZE",
+                        help="in-flight buffer bytes, e.g. 512M (default: 1G), shared by the worker processes; reading waits while it is spent")
+    parser.add_argument("--spool-threshold", type=_size, default=None, metavar="SIZE",
+                        help="media entries larger than this are spooled to disk in chunks instead of held in memory (default: 64M)")
+
+
+def _size(value: str) -> str:
+    try:
+        memory_budget.parse_size(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a size such as 512M or 2G, got '{value}'")
+    return value
+
+
+def configure_memory(args: argparse.Namespace):
+    """Apply the `add_memory_arguments` options through the environment, so worker processes inherit them."""
+    if args.memory_budget:
+        os.environ["MEMORY_BUDGET"] = args.memory_budget
+    if args.spool_threshold:
+        os.environ["MEMORY_SPOOL_THRESHOLD"] = args.spool_threshold
+    memory_budget.configure_from_env()
+
+
+def run(args: argparse.Namespace) -> int:
+    """
+    Run a batch from parsed `add_arguments` options.
+
+    Returns:
+        int: The process exit code, 1 if any deck failed.
+    """
+    if args.json_logs:
+        os.environ["METRICS_JSON_LOGS"] = "1"
+    if args.statsd:
+        os.environ["METRICS_STATSD"] = args.statsd
+    instrumentation.configure_from_env()
+    configure_memory(args)
+
+    decks = load_decks(args.source)
+    writer = None
+    if args.results_stream:
+        from .record_writer import open_writer
+
+        writer = open_writer(args.results_stream)
+    try:
+        report = run_batch(
+            decks, args.output_dir, args.mode, args.workers, args.bucket, args.folder,
+            os.environ.get("AWS_ACCESS_KEY_ID", ""), os.environ.get("AWS_SECRET_ACCESS_KEY", ""), writer
+        )
+    finally:
+        if writer is not None:
+            writer.close()
+
+    results_path = args.results or os.path.join(args.output_dir, "results.json")
+    os.makedirs(os.path.dirname(os.path.abspath(results_path)), exist_ok=True)
+    with open(results_path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    if args.metrics_file:
+        instrumentation.write_prometheus(args.metrics_file, report["summary"]["metrics"])
+    logger.info(f"Processed {report['summary']['succeeded']}/{report['summary']['total']} decks in {report['summary']['wall_seconds']:.2f}s; results in {results_path}")
+    return 1 if report["summary"]["failed"] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process a directory or manifest of PowerPoint decks over a process pool.")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from typing import List, Optional, Tuple
+
+from . import batch
+from . import instrumentation
+from .records import FRAME_SIZE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Only the standard library and the light `batch` and `records` modules are imported up front. Each subcommand imports
+# what it needs when it runs, so `--help` and `extract --text-only` never load python-pptx, boto3, NumPy or Pillow.
+
+
+def _frame_size(value: str) -> Tuple[int, int]:
+    width, _, height = value.lower().partition("x")
+    try:
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, e.g. 1920x1080, got '{value}'")
+
+
+def _slide_numbers(value: str):
+    from .selective import slide_numbers
+
+    try:
+        return slide_numbers(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected slide numbers and ranges, e.g. 1-5,8, got '{value}'")
+
+
+def _request(args: argparse.Namespace):
+    # None keeps the full extraction path when no selection option is given
+    if args.slides is None and not args.media_only and not args.media_type and args.max_media_size is None:
+        return None
+    from .selective import ExtractionRequest
+
+    return ExtractionRequest(slides=args.slides, text=not args.media_only, media_types=tuple(args.media_type),
+                             max_media_size=args.max_media_size, nested=getattr(args, "nested", False))
+
+
+def _add_selection_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--slides", type=_slide_numbers, default=None, metavar="RANGES", help="only these slides, e.g. 1-5,8")
+    parser.add_argument("--media-only", action="store_true", help="skip the slide text")
+    parser.add_argument("--media-type", action="append", default=[], metavar="PREFIX",
+                        help="only media whose content type starts with this, e.g. video/ (repeatable)")
+    parser.add_argument("--max-media-size", type=int, default=None, metavar="BYTES", help="skip media files larger than this")
+
+
+def _write_json(data, output: Optional[str]):
+    if output is None:
+        json.dump(data, sys.stdout, indent=2, default=str)
+        sys.stdout.write("\n")
+    else:
+        with open(output, "w") as f:
+            json.dump(data, f, indent=2, default=str)
+
+
+def _aws_credentials() -> Tuple[str, str]:
+    # Empty credentials fall back to the default boto3 credential chain
+    return os.environ.get("AWS_ACCESS_KEY_ID", ""), os.environ.get("AWS_SECRET_ACCESS_KEY", "")
+
+
+def run_extract(args: argparse.Namespace) -> int:
+    if args.text_only and (args.media_only or args.media_type or args.max_media_size is not None):
+        logger.error("--text-only extracts no media; drop the media options")
+        return 2
+    if args.format != "json":
+        return _stream_extract(args)
+    if args.text_only:
+        from .slide_xml import extract_text_boxes
+
+        try:
+            text_boxes = extract_text_boxes(args.deck, slide_nums=args.slides, nested=args.nested)
+        except Exception as e:
+            logger.error(f"An error occurred during text extraction: {e}")
+            return 1
+        result = {slide_num: [{"text": text_box.text, "position": text_box.box.to_dict()} for text_box in boxes]
+                  for slide_num, boxes in text_boxes.items()}
+    else:
+        from .part1_v2 import extract_slide_text_and_media
+
+        result = extract_slide_text_and_media(args.deck, args.output_dir, frame_size=args.frame_size, request=_request(args))
+    _write_json(result, args.output)
+    return 0 if result else 1
+
+
+def _stream_extract(args: argparse.Namespace) -> int:
+    # One record per slide, appended as each slide is extracted
+    from .record_writer import open_writer, write_deck
+
+    if args.frame_size is not None:
+        logger.error("--frame-size lays out the whole deck at once and needs --format json")
+        return 2
+    try:
+        with open_writer(args.output or "-", args.format) as writer:
+            written = write_deck(args.deck, writer, None if args.text_only else args.output_dir, slide_nums=args.slides, text_only=args.text_only,
+                                 nested=args.nested, request=None if args.text_only else _request(args))
+    except Exception as e:
+        logger.error(f"An error occurred during PPTX extraction: {e}")
+        return 1
+    return 0 if written else 1
+
+
+def run_upload(args: argparse.Namespace) -> int:
+    aws_access_key_id, aws_secret_access_key = _aws_credentials()
+    if args.images and _request(args) is not None:
+        logger.error("the selection options apply to the deck's media; --images selects slides with its own filter")
+        return 2
+    if args.images:
+        from .part2 import convert_pptx_to_images
+
+        result = convert_pptx_to_images(args.deck, args.bucket, args.folder, aws_access_key_id, aws_secret_access_key,
+                                        pipelined=args.pipelined, frame_size=None if args.originals else args.frame_size)
+    else:
+        from .full_1_2 import extract_slide_text_and_media
+
+        request = _request(args)
+        if request is not None and args.manifest is not None:
+            logger.error("--manifest caches whole slides and cannot be combined with the selection options")
+            return 2
+        result = extract_slide_text_and_media(args.deck, args.output_dir, args.bucket, aws_access_key_id, aws_secret_access_key,
+                                              manifest_path=args.manifest, request=request)
+    _write_json(result, args.output)
+    return 0 if result else 1
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    return batch.run(args)
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    if args.spool is None and args.http_port is None:
+        logger.error("serve needs a job source: --spool and/or --http-port")
+        return 2
+    from .worker_service import WorkerService
+
+    instrumentation.configure_from_env()
+    service = WorkerService(args.workers, args.job_timeout, args.spool, args.results_dir, args.output_dir, args.max_queued)
+    if args.http_port is not None:
+        service.serve_http(args.http_port, args.host)
+    service.run_forever()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="pictory", description="Extract text, media and layout from PowerPoint decks and upload media to S3.")
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    subparsers.required = True
+
+    extract = subparsers.add_parser("extract", help="extract slide text, or text, media and layout, to JSON")
+    extract.add_argument("deck", help="the .pptx file")
+    extract.add_argument("--text-only", action="store_true", help="read only the slide XML, without python-pptx or media")
+    extract.add_argument("--nested", action="store_true", help="with --text-only, include group shapes and table cells")
+    extract.add_argument("--output-dir", default="output_media", help="directory to save the extracted media files")
+    extract.add_argument("--frame-size", type=_frame_size, default=None, metavar="WxH", help="also lay the slides out for this video frame")
+    _add_selection_arguments(extract)
+    extract.add_argument("--format", choices=("json", "ndjson", "msgpack"), default="json",
+                         help="one JSON document, or one record per slide streamed as NDJSON or MessagePack (needs msgpack)")
+    extract.add_argument("--output", default=None, help="write the output here instead of stdout")
+    batch.add_memory_arguments(extract)
+    extract.set_defaults(func=run_extract)
+
+    upload = subparsers.add_parser("upload", help="extract a deck's media and upload it to S3 (credentials from the AWS environment)")
+    upload.add_argument("deck", help="the .pptx file")
+    upload.add_argument("--bucket", required=True, help="the S3 bucket")
+    upload.add_argument("--output-dir", default="output_media", help="directory to save the extracted media files")
+    upload.add_argument("--manifest", default=None, help="deck manifest for incremental re-processing")
+    _add_selection_arguments(upload)
+    upload.add_argument("--images", action="store_true", help="upload the picture images of the slides instead, as video renditions")
+    upload.add_argument("--folder", default="", help="with --images, the S3 folder")
+    upload.add_argument("--pipelined", action="store_true", help="with --images, overlap reading, conversion and uploading")
+    upload.add_argument("--frame-size", type=_frame_size, default=FRAME_SIZE, metavar="WxH", help="with --images, the video frame renditions are sized for")
+    upload.add_argument("--originals", action="store_true", help="with --images, upload the original images instead of renditions")
+    upload.add_argument("--output", default=None, help="write the JSON here instead of stdout")
+    batch.add_memory_arguments(upload)
+    upload.set_defaults(func=run_upload)
+
+    batch_parser = subparsers.add_parser("batch", help="process a directory or manifest of decks over a process pool")
+    batch.add_arguments(batch_parser)
+    batch_parser.set_defaults(func=run_batch)
+
+    serve = subparsers.add_parser("serve", help="run warm workers taking jobs from a spool directory and/or a local HTTP endpoint")
+    serve.add_argument("--spool", default=None, help="spool directory; jobs are JSON files dropped into <spool>/incoming")
+    serve.add_argument("--http-port", type=int, default=None, help="accept jobs with POST /jobs on this port")
+    serve.add_argument("--host", default="127.0.0.1", help="interface of the HTTP endpoint")
+    serve.add_argument("--workers", type=int, default=None, help="worker processes, i.e. concurrent jobs (default: one per CPU)")
+    serve.add_argument("--job-timeout", type=float, default=600.0, help="seconds before a job's worker is replaced")
+    serve.add_argument("--max-queued", type=int, default=100, help="jobs allowed to wait for a worker")
+    serve.add_argument("--results-dir", default=None, help="where job records are written (default: <spool>/results or service_results)")
+    serve.add_argument("--output-dir", default="service_output", help="root of the per-job output directories")
+    batch.add_memory_arguments(serve)
+    serve.set_defaults(func=run_serve)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    batch.configure_memory(args)
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
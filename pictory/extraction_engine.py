@@ -0,0 +1,229 @@
+import os
+import logging
+import zipfile
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple, Union
+from pptx import Presentation
+
+from .instrumentation import count, span
+from .media_index import MEDIA_PREFIX
+from .media_stream import copy_stream, open_package
+from .memory_budget import BUDGET
+from .records import Box, MediaRef, SlideRecord, TextBox, deck_from_records
+from .selective import ExtractionRequest, iter_selected
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Shape-level XPaths for the parts a picture/movie shape points at. The blip is the
+# picture itself (or the poster frame of a movie); videoFile/audioFile link the media.
+_BLIP_XPATH = "./p:blipFill/a:blip/@r:embed"
+_VIDEO_XPATH = "./p:nvPicPr/p:nvPr/a:videoFile/@r:link"
+_AUDIO_XPATH = "./p:nvPicPr/p:nvPr/a:audioFile/@r:link"
+
+
+def _emu(value) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+def _shape_box(shape) -> Box:
+    return Box(_emu(shape.left), _emu(shape.top), _emu(shape.width), _emu(shape.height))
+
+
+def _shape_media(slide, shape) -> List[Tuple[str, object]]:
+    """
+    Resolve the media parts referenced by a single shape.
+
+    Args:
+        slide: The python-pptx slide owning the shape.
+        shape: The shape to inspect.
+
+    Returns:
+        List[Tuple[str, object]]: One (kind, part) tuple per referenced media part.
+    """
+    media = []
+    for kind, xpath in (("video", _VIDEO_XPATH), ("audio", _AUDIO_XPATH), ("image", _BLIP_XPATH)):
+        for r_id in shape._element.xpath(xpath):
+            rel = slide.part.rels.get(r_id)
+            if rel is None or rel.is_external:
+                continue
+            media.append((kind, rel.target_part))
+    return media
+
+
+class LazyMedia(MediaRef):
+    """
+    A media part referenced by a slide shape, read from the package only when accessed.
+
+    Each access opens the package afresh, so a record stays usable after the slide iterator
+    that produced it has moved on or been closed.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        partname (str): The media part name, e.g. '/ppt/media/image1.png'.
+        kind (str): 'image', 'video' or 'audio'.
+        box (Box): The position and size of the shape.
+    """
+    __slots__ = ("pptx_file",)
+
+    def __init__(self, pptx_file: str, partname: str, kind: str, box: Box):
+        super().__init__(partname, kind, box, None, None)
+        self.pptx_file = pptx_file
+
+    @property
+    def name(self) -> str:
+        """The ZIP member name of the media part."""
+        return self.partname.lstrip("/")
+
+    def open(self) -> BinaryIO:
+        """Open a decompressing stream over the media part."""
+        with zipfile.ZipFile(self.pptx_file) as zip_ref:
+            return zip_ref.open(self.name)
+
+    @property
+    def blob(self) -> bytes:
+        with self.open() as stream:
+            return stream.read()
+
+    def save(self, output_dir: str) -> str:
+        """
+        Stream the media part in chunks to a file named after it in the output directory.
+
+        Args:
+            output_dir (str): The directory to save the media file.
+
+        Returns:
+            str: The path of the written file, also recorded as the record's 'path'.
+        """
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        path = os.path.join(output_dir, os.path.basename(self.partname))
+        with span("media.write", part=self.name) as fields, self.open() as stream, open(path, "wb") as f:
+            fields["bytes"] = copy_stream(stream, f)
+        count("bytes_read", fields["bytes"])
+        count("bytes_written", fields["bytes"])
+        self.path = path
+        return path
+
+    def __repr__(self):
+        return f"LazyMedia({self.partname!r}, kind={self.kind!r})"
+
+
+def _package_sizes(pptx_file: str) -> Tuple[int, int]:
+    # The uncompressed size of the whole package and of its largest media entry, from the ZIP directory
+    with zipfile.ZipFile(pptx_file) as zip_ref:
+        infos = zip_ref.infolist()
+    return sum(info.file_size for info in infos), max((info.file_size for info in infos if info.filename.startswith(MEDIA_PREFIX)), default=0)
+
+
+def iter_deck(pptx_file: str, slide_nums: Optional[Set[int]] = None) -> Iterator[SlideRecord]:
+    """
+    Yield one paired slide record at a time from a single parse of a PowerPoint presentation.
+
+    A slide's shapes are only walked when its record is requested, so a caller that stops after the
+    first few slides never pays for the rest, and no media is read until a record's media is accessed.
+
+    python-pptx reads every part of the package into memory, media included, so the package's
+    uncompressed size is reserved from `memory_budget.BUDGET` while it is parsed, and a deck whose
+    largest media entry is above the spool threshold, or which would not fit in the budget at all, is
+    read entry by entry by `selective.iter_selected` instead; its media is then only ever streamed.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        slide_nums (Optional[Set[int]]): The slide numbers to yield, or None for every slide.
+
+    Yields:
+        SlideRecord: The slide's text boxes and `LazyMedia` references, in slide order.
+    """
+    package_size, largest_media = _package_sizes(pptx_file)
+    if BUDGET.should_spool(largest_media) or package_size > BUDGET.limit:
+        logger.info(f"Reading {pptx_file} entry by entry: {package_size / 2 ** 20:.0f} MiB uncompressed, "
+                    f"largest media {largest_media / 2 ** 20:.0f} MiB")
+        count("decks_streamed")
+        with open_package(pptx_file) as zip_ref:
+            for record in iter_selected(zip_ref, ExtractionRequest(slides=slide_nums)):
+                record.media = [LazyMedia(pptx_file, media.partname, media.kind, media.box) for media in record.media]
+                yield record
+        return
+
+    BUDGET.acquire(package_size, "presentation")
+    try:
+        with span("presentation.parse", deck=pptx_file):
+            presentation = Presentation(pptx_file)
+        for i, slide in enumerate(presentation.slides):
+            if slide_nums is not None and i + 1 not in slide_nums:
+                continue
+            texts = []
+            media = []
+            with span("slide.extract", slide_num=i + 1):
+                for shape in slide.shapes:
+                    if shape.has_text_frame:
+                        text = shape.text_frame.text.strip()
+                        if text:
+                            texts.append(TextBox(text, _shape_box(shape)))
+                    for kind, part in _shape_media(slide, shape):
+                        media.append(LazyMedia(pptx_file, str(part.partname), kind, _shape_box(shape)))
+            yield SlideRecord(i + 1, texts, media)
+    finally:
+        BUDGET.release(package_size)
+
+
+def iter_records(pptx_file: str, output_dir: Optional[str] = None, slide_nums: Optional[Set[int]] = None) -> Iterator[SlideRecord]:
+    """
+    Yield the slide records of `iter_deck`, writing their media first when an output directory is given.
+
+    Every referenced media part is streamed to the output directory once, even if several shapes or
+    slides share it, and each record's 'path' is set before the record is yielded. Only the paths of
+    the media written so far are kept, so the deck is never held in memory.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        output_dir (Optional[str]): The directory to save the referenced media files, or None to skip writing.
+        slide_nums (Optional[Set[int]]): The slide numbers to walk, or None for every slide.
+
+    Yields:
+        SlideRecord: The slide records, in slide order.
+    """
+    written = {}
+    for record in iter_deck(pptx_file, slide_nums):
+        if output_dir is not None:
+            for media in record.media:
+                if media.partname not in written:
+                    written[media.partname] = media.save(output_dir)
+                media.path = written[media.partname]
+        yield record
+
+
+def extract_records(pptx_file: str, output_dir: Optional[str] = None, slide_nums: Optional[Set[int]] = None) -> List[SlideRecord]:
+    """
+    Extract the slide records of a PowerPoint presentation in a single pass.
+
+    This materializes `iter_records`.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        output_dir (Optional[str]): The directory to save the referenced media files, or None to skip writing.
+        slide_nums (Optional[Set[int]]): The slide numbers to walk, or None for every slide.
+
+    Returns:
+        List[SlideRecord]: The slide records, in slide order.
+    """
+    return list(iter_records(pptx_file, output_dir, slide_nums))
+
+
+def extract_deck(pptx_file: str, output_dir: Optional[str] = None, slide_nums: Optional[Set[int]] = None) -> Dict[int, Dict[str, Union[List[str], Dict[str, Dict[str, int]], List[Dict[str, Union[str, Dict[str, int]]]]]]]:
+    """
+    Extract text, text coordinates and media positions from a PowerPoint presentation in a single pass.
+
+    This is the nested-dict view of `iter_records`, built by `records.deck_from_records`.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        output_dir (Optional[str]): The directory to save the referenced media files, or None to skip writing.
+        slide_nums (Optional[Set[int]]): The slide numbers to walk, or None for every slide.
+
+    Returns:
+        Dict[int, Dict[str, Union[List[str], Dict[str, Dict[str, int]], List[Dict[str, Union[str, Dict[str, int]]]]]]]:
+            A dictionary mapping slide numbers to dictionaries with 'text', 'text_coordinates' and 'media' keys.
+            Each media entry has 'partname', 'kind' and 'position' keys, plus 'path' when media was written.
+    """
+    return deck_from_records(iter_records(pptx_file, output_dir, slide_nums))
@@ -0,0 +1,181 @@
+import os
+import logging
+from .instrumentation import timed
+from .manifest import DeckManifest, media_fingerprint, slide_fingerprints
+from .media_index import build_media_index
+from .media_store import MediaStore
+from .media_stream import open_package, stream_media
+from .records import deck_from_records
+from .s3_uploader import S3Uploader
+from .selective import iter_selected
+from .slide_xml import extract_text_boxes
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@timed("full_1_2.extract_media_from_pptx")
+def extract_media_from_pptx(pptx_file, output_dir, bucket_name, access_key_id, secret_access_key, use_mmap=False, media_store=None):
+    try:
+        # Extract media files from the "ppt/media" folder, reading the PPTX file in place
+        media_paths = {}
+        media_positions = {}
+        store = media_store if media_store is not None else MediaStore(output_dir)
+        with S3Uploader(bucket_name, aws_access_key_id=access_key_id, aws_secret_access_key=secret_access_key) as uploader, \
+                open_package(pptx_file, use_mmap) as zip_ref:
+            # Media without a position, e.g. a slide background, is left out like in part1_v2
+            media_index = build_media_index(zip_ref, positioned=True)
+            entries = stream_media(zip_ref, store.sink, media_index.keys())
+            uploads = []
+            for name, entry in entries.items():
+                # Queue each unique media file for upload to S3 once, under its content-addressed key
+                uploads.append(store.upload(uploader, entry))
+                for reference in media_index[name]:
+                    slide_num = reference["slide_num"]
+                    if slide_num not in media_paths:
+                        media_paths[slide_num] = []
+                        media_positions[slide_num] = []
+                    media_paths[slide_num].append(entry["path"])
+                    media_positions[slide_num].append(reference["position"])
+
+            # None means the media was already uploaded
+            failed = [result for result in (future.result() for future in uploads if future is not None) if not result["ok"]]
+            if failed:
+                logger.error(f"{len(failed)} media uploads to S3 failed: {[result['path'] for result in failed]}")
+
+        store.save()
+        logger.info(f"Media store: {store.stats}")
+
+        return media_paths, media_positions
+
+    except FileNotFoundError:
+        logger.error(f"Error: File '{pptx_file}' not found.")
+        return {}, {}
+    except Exception as e:
+        logger.error(f"An error occurred during PPTX to media conversion: {e}")
+        return {}, {}
+
+@timed("full_1_2.extract_slide_text")
+def extract_slide_text(pptx_file, output_dir, nested=False):
+    try:
+        # Stream each slide's XML for its text runs instead of building python-pptx shape proxies
+        text_content = {}
+        for slide_num, text_boxes in extract_text_boxes(pptx_file, nested=nested).items():
+            text_content[slide_num] = "\n".join(text_box.text for text_box in text_boxes)
+
+        return text_content
+
+    except FileNotFoundError:
+        logger.error(f"Error: File '{pptx_file}' not found.")
+        return {}
+    except Exception as e:
+        logger.error(f"An error occurred during text extraction: {e}")
+        return {}
+
+@timed("full_1_2.extract_slide_text_and_media")
+def extract_slide_text_and_media(pptx_file, output_dir, bucket_name, access_key_id, secret_access_key, media_store=None, manifest_path=None, request=None):
+    # A request (selective.ExtractionRequest) limits the slides, text and media read from the package.
+    # The manifest caches whole slides, so it cannot be combined with a request.
+    if request is not None and manifest_path is not None:
+        raise ValueError("manifest_path and request cannot be combined")
+
+    try:
+        # Reuse slides whose content hash is already in the deck manifest
+        manifest = DeckManifest(manifest_path) if manifest_path is not None else None
+        with open_package(pptx_file) as zip_ref:
+            fingerprints = slide_fingerprints(zip_ref) if manifest is not None else {}
+            media_fingerprints = {info.filename: media_fingerprint(info) for info in zip_ref.infolist()}
+            cached_slides = {}
+            for slide_num, digest in fingerprints.items():
+                paired = manifest.cached_slide(digest)
+                if paired is not None:
+                    cached_slides[slide_num] = paired
+
+            # Parse the presentation once for text, coordinates and media positions of the other slides
+            deck = {}
+            if request is not None:
+                deck = deck_from_records(iter_selected(zip_ref, request))
+            elif manifest is None or len(cached_slides) < len(fingerprints):
+                # python-pptx is only imported when slides have to be parsed
+                from .extraction_engine import extract_deck
+
+                deck = extract_deck(pptx_file, slide_nums=set(fingerprints) - set(cached_slides) if manifest is not None else None)
+
+            # Extract media the manifest does not already hold at the same fingerprint
+            store = media_store if media_store is not None else MediaStore(output_dir)
+            names = {media["partname"].lstrip("/") for slide in deck.values() for media in slide["media"]}
+            entries = {}
+            if manifest is not None:
+                for name in names:
+                    entry = manifest.cached_media(name, media_fingerprints[name])
+                    if entry is not None:
+                        entries[name] = entry
+            streamed = stream_media(zip_ref, store.sink, names - set(entries))
+            entries.update(streamed)
+    except FileNotFoundError:
+        logger.error(f"Error: File '{pptx_file}' not found.")
+        return {}
+    except Exception as e:
+        logger.error(f"An error occurred during PPTX extraction: {e}")
+        return {}
+
+    # Uploading and recording the manifest fail the same way as extraction: logged, with an empty result
+    try:
+        # Upload each new unique media file once and pair slide text with the shared media keys and positions
+        paired_data = dict(cached_slides)
+        uploads = {}
+        if streamed:
+            with S3Uploader(bucket_name, aws_access_key_id=access_key_id, aws_secret_access_key=secret_access_key) as uploader:
+                uploads = {name: store.upload(uploader, entry) for name, entry in streamed.items()}
+        # A None result means the media was already uploaded
+        results = {name: uploads[name].result() if uploads.get(name) is not None else None for name in entries}
+
+        for slide_num, slide in deck.items():
+            media_info = []
+            for media in slide["media"]:
+                name = media["partname"].lstrip("/")
+                entry = entries[name]
+                media_info.append({"path": entry["path"], "key": entry["key"], "position": media["position"], "upload": results[name]})
+            paired_data[slide_num] = {"text": "\n".join(slide["text"]), "media_info": media_info}
+        paired_data = dict(sorted(paired_data.items()))
+
+        store.save()
+        logger.info(f"Media store: {store.stats}")
+
+        if manifest is not None:
+            # A slide whose media failed to upload is extracted again next time, so its media is retried
+            for slide_num, slide in deck.items():
+                if all(info["upload"] is None or info["upload"]["ok"] for info in paired_data[slide_num]["media_info"]):
+                    manifest.record_slide(fingerprints[slide_num], paired_data[slide_num])
+            for name, entry in entries.items():
+                if results[name] is None or results[name]["ok"]:
+                    manifest.record_media(name, media_fingerprints[name], {key: entry[key] for key in ("key", "path", "size")})
+            manifest.prune(fingerprints.values(), media_fingerprints)
+            manifest.save()
+            logger.info(f"Manifest: reused {len(cached_slides)} slides, extracted {len(deck)} slides and {len(streamed)} media files")
+    except Exception as e:
+        logger.error(f"An error occurred during media upload: {e}")
+        return {}
+
+    return paired_data
+
+# Example usage
+if __name__ == "__main__":
+    pptx_file = "jpictory.pptx"
+    bucket_name = "ppt2video"
+    access_key_id = ""
+    secret_access_key = ""
+    session_token = ""
+
+    output_dir = "output_media"
+    paired_data = extract_slide_text_and_media(pptx_file, output_dir, bucket_name, access_key_id, secret_access_key)
+
+    # Print paired data (slide number, slide text, media paths)
+    for slide_num, data in paired_data.items():
+        print(f"Slide {slide_num}:")
+        print(f"Text:\n{data['text']}")
+        print("Media Info:")
+        for media_info in data["media_info"]:
+            print(f"- Path: {media_info['path']}")
+            print(f"  Position: Left={media_info['position']['left']}, Top={media_info['position']['top']}, Width={media_info['position']['width']}, Height={media_info['position']['height']}")
+        print()
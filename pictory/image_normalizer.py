@@ -0,0 +1,307 @@
+import io
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .instrumentation import count, span
+from .media_stream import CHUNK_SIZE
+from .memory_budget import BUDGET
+from .records import FRAME_SIZE, Box
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+DEFAULT_JPEG_QUALITY = 90
+# Enough leading bytes to recognise every format below, including the EMF signature at offset 40
+HEADER_SIZE = 64
+
+# Format name -> file extension
+IMAGE_FORMATS = {
+    "png": ".png",
+    "jpeg": ".jpg",
+    "gif": ".gif",
+    "bmp": ".bmp",
+    "tiff": ".tiff",
+    "webp": ".webp",
+    "emf": ".emf",
+    "wmf": ".wmf",
+    "svg": ".svg",
+}
+# Formats the video renderer takes as they are; every other raster format becomes a PNG rendition
+_KEPT_FORMATS = {"png", "jpeg"}
+# Vector formats Pillow cannot rasterise outside Windows; they are passed through unchanged
+_VECTOR_FORMATS = {"emf", "wmf", "svg"}
+
+
+def detect_image_format(header: bytes) -> Optional[str]:
+    """
+    Recognise an image format from its leading bytes, whatever the part's name claims.
+
+    Args:
+        header (bytes): At least the first `HEADER_SIZE` bytes of the image.
+
+    Returns:
+        Optional[str]: A key of `IMAGE_FORMATS`, or None if the format is not recognised.
+    """
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if header.startswith(b"BM"):
+        return "bmp"
+    if header.startswith((b"II*\x00", b"MM\x00*")):
+        return "tiff"
+    if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+        return "webp"
+    if header.startswith(b"\x01\x00\x00\x00") and header[40:44] == b" EMF":
+        return "emf"
+    if header.startswith((b"\xd7\xcd\xc6\x9a", b"\x01\x00\x09\x00", b"\x02\x00\x09\x00")):
+        return "wmf"
+    text = header.lstrip().lower()
+    if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in text):
+        return "svg"
+    return None
+
+
+def image_extension(header: bytes, default: str = ".bin") -> str:
+    """
+    Pick the file extension of an image from its leading bytes.
+
+    Args:
+        header (bytes): At least the first `HEADER_SIZE` bytes of the image.
+        default (str): The extension used when the format is not recognised, e.g. the part's own.
+
+    Returns:
+        str: The extension including the dot.
+    """
+    image_format = detect_image_format(header)
+    return IMAGE_FORMATS[image_format] if image_format is not None else default
+
+
+def target_size(box: Box, slide_size: Tuple[int, int], frame_size: Tuple[int, int] = FRAME_SIZE) -> Optional[Tuple[int, int]]:
+    """
+    Size in pixels a shape covers once its slide is fitted into a video frame.
+
+    Args:
+        box (Box): The shape's position and size in EMU.
+        slide_size (Tuple[int, int]): The slide width and height in EMU.
+        frame_size (Tuple[int, int]): The video frame width and height in pixels.
+
+    Returns:
+        Optional[Tuple[int, int]]: The width and height in pixels, or None if the shape has no extents.
+    """
+    if not box.width or not box.height:
+        return None
+    scale = min(frame_size[0] / slide_size[0], frame_size[1] / slide_size[1])
+    return max(1, round(box.width * scale)), max(1, round(box.height * scale))
+
+
+def _digest(source: Union[str, bytes]) -> str:
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    sha = hashlib.sha256()
+    with open(source, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _header(source: Union[str, bytes]) -> bytes:
+    if isinstance(source, bytes):
+        return source[:HEADER_SIZE]
+    with open(source, "rb") as f:
+        return f.read(HEADER_SIZE)
+
+
+def _decodable(path: str) -> bool:
+    # Whether Pillow recognises the file; reads and checks the header and structure, not the pixels
+    try:
+        with Image.open(path) as image:
+            image.verify()
+        return True
+    except (UnidentifiedImageError, OSError, ValueError, SyntaxError):
+        return False
+
+
+class ImageNormalizer:
+    """
+    Turn slide images into renditions ready for the video renderer.
+
+    Each image's real format is detected from its content. Raster images are decoded once, rotated
+    upright from their EXIF orientation and shrunk to fit the pixel size their shape covers in the
+    video frame (never enlarged); JPEGs stay JPEGs and every other raster format becomes a PNG.
+    Vector images (EMF, WMF, SVG) and images Pillow cannot decode are kept as they are, under the
+    extension of their real format.
+
+    Renditions are cached in `cache_dir` as '<sha256>_<width>x<height><ext>', keyed by the source
+    content hash and the target size, so an image used at the same size on many slides or decks is
+    converted once. Conversions run in a thread pool; Pillow releases the GIL while decoding,
+    resampling and encoding, so the workers run in parallel without copying images between processes.
+
+    Args:
+        cache_dir (str): The directory holding the renditions.
+        frame_size (Tuple[int, int]): The video frame width and height in pixels.
+        max_workers (int): The number of concurrent conversions.
+        jpeg_quality (int): The quality of JPEG renditions.
+    """
+
+    def __init__(self, cache_dir: str, frame_size: Tuple[int, int] = FRAME_SIZE, max_workers: int = DEFAULT_WORKERS,
+                 jpeg_quality: int = DEFAULT_JPEG_QUALITY):
+        self.cache_dir = cache_dir
+        self.frame_size = frame_size
+        self.max_workers = max_workers
+        self.jpeg_quality = jpeg_quality
+        self._executor = None
+        self._lock = threading.Lock()
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def target_size(self, box: Box, slide_size: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        return target_size(box, slide_size, self.frame_size)
+
+    def rendition_name(self, digest: str, image_format: Optional[str], target: Optional[Tuple[int, int]]) -> str:
+        if image_format is None or image_format in _VECTOR_FORMATS:
+            # Kept as they are, so every target size shares one copy
+            return digest + (IMAGE_FORMATS[image_format] if image_format is not None else ".bin")
+        ext = IMAGE_FORMATS[image_format] if image_format in _KEPT_FORMATS else IMAGE_FORMATS["png"]
+        return f"{digest}_{target[0]}x{target[1]}{ext}" if target is not None else f"{digest}{ext}"
+
+    def _render(self, source: Union[str, bytes], image_format: str, target: Optional[Tuple[int, int]], f) -> Tuple[Optional[int], Optional[int], bool]:
+        # Write a rendition to `f`; returns its size and whether the image was converted
+        with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+            if target is not None and image_format == "jpeg":
+                # Let the JPEG decoder skip detail the rendition will not keep
+                image.draft("RGB", (max(target), max(target)))
+            # The decoded pixels and a resized copy are tracked in the memory budget while the image is converted;
+            # conversion never waits on the budget, so the stages feeding it can always drain
+            decoded = image.width * image.height * len(image.getbands())
+            with BUDGET.reserve(2 * decoded, "image.decode", block=False):
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ("L", "LA", "RGB", "RGBA"):
+                    # Palette and bilevel images would otherwise be resampled with nearest-neighbour
+                    has_alpha = "A" in image.getbands() or "transparency" in image.info
+                    image = image.convert("RGBA" if has_alpha and image_format != "jpeg" else "RGB")
+                width, height = image.size
+                if target is not None:
+                    ratio = min(target[0] / width, target[1] / height)
+                    if ratio < 1:
+                        width, height = max(1, round(width * ratio)), max(1, round(height * ratio))
+                        image = image.resize((width, height), Image.LANCZOS)
+                if image_format == "jpeg":
+                    image.convert("RGB").save(f, "JPEG", quality=self.jpeg_quality, optimize=True)
+                else:
+                    image.save(f, "PNG")
+                return width, height, True
+
+    def normalize(self, source: Union[str, bytes], target: Optional[Tuple[int, int]] = None, digest: Optional[str] = None) -> Dict[str, Union[str, int, bool, None, List[int]]]:
+        """
+        Produce, or reuse from the cache, the rendition of one image.
+
+        Args:
+            source (Union[str, bytes]): The path or the bytes of the source image.
+            target (Optional[Tuple[int, int]]): The box the image must fit in, in pixels, or None to keep its size.
+            digest (Optional[str]): The SHA-256 of the source, if already known.
+
+        Returns:
+            Dict[str, Union[str, int, bool, None, List[int]]]: The rendition's 'hash' (of the source), 'format'
+                (of the source, None if unknown), 'name', 'path', 'width' and 'height' (None when not decoded),
+                'target', 'cached' and 'converted'.
+        """
+        digest = digest or _digest(source)
+        image_format = detect_image_format(_header(source))
+        name = self.rendition_name(digest, image_format, target)
+        path = os.path.join(self.cache_dir, name)
+        rendition = {"hash": digest, "format": image_format, "name": name, "path": path, "width": None, "height": None,
+                     "target": list(target) if target is not None else None, "cached": False, "converted": False}
+
+        with span("image.normalize", format=image_format, target=rendition["target"]) as fields:
+            if not os.path.exists(path) and image_format is not None and image_format not in _VECTOR_FORMATS:
+                # An image that could not be decoded before was kept under '<sha256><ext>' whatever its target
+                kept = os.path.join(self.cache_dir, digest + IMAGE_FORMATS[image_format])
+                if kept != path and os.path.exists(kept) and not _decodable(kept):
+                    rendition["name"], rendition["path"] = name, path = os.path.basename(kept), kept
+            if os.path.exists(path):
+                rendition["cached"] = fields["cached"] = True
+                if image_format is not None and image_format not in _VECTOR_FORMATS:
+                    try:
+                        # Reads the header only
+                        with Image.open(path) as image:
+                            rendition["width"], rendition["height"] = image.size
+                            rendition["converted"] = True
+                    except (UnidentifiedImageError, OSError, ValueError):
+                        pass  # kept unconverted
+                count("rendition_cache_hits", hash=digest)
+                return rendition
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    converted = False
+                    if image_format is not None and image_format not in _VECTOR_FORMATS:
+                        try:
+                            rendition["width"], rendition["height"], converted = self._render(source, image_format, target, f)
+                        except (UnidentifiedImageError, OSError, ValueError) as e:
+                            logger.warning(f"Keeping {digest} unconverted, it could not be decoded: {e}")
+                            f.seek(0)
+                            f.truncate()
+                    if not converted:
+                        if isinstance(source, bytes):
+                            f.write(source)
+                        else:
+                            with open(source, "rb") as src:
+                                for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                                    f.write(chunk)
+                if not converted and image_format is not None and image_format not in _VECTOR_FORMATS:
+                    # An undecodable raster image is kept under the extension of its real format
+                    rendition["name"] = name = digest + IMAGE_FORMATS[image_format]
+                    rendition["path"] = path = os.path.join(self.cache_dir, name)
+                # Several workers may produce the same rendition; the last complete file wins
+                os.replace(tmp_path, path)
+            except Exception:
+                os.remove(tmp_path)
+                raise
+            rendition["converted"] = fields["converted"] = converted
+            fields["bytes"] = os.path.getsize(path)
+            count("renditions" if converted else "renditions_passthrough", hash=digest)
+            count("bytes_written", fields["bytes"])
+            return rendition
+
+    def submit(self, source: Union[str, bytes], target: Optional[Tuple[int, int]] = None, digest: Optional[str] = None) -> Future:
+        """Queue `normalize` on the worker pool; the future resolves to the rendition."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="image-normalizer")
+        return self._executor.submit(self.normalize, source, target, digest)
+
+    def normalize_many(self, items: Iterable[Tuple[Union[str, bytes], Optional[Tuple[int, int]], Optional[str]]]) -> List[Dict[str, Union[str, int, bool, None, List[int]]]]:
+        """
+        Normalize images in parallel.
+
+        Args:
+            items (Iterable[Tuple[Union[str, bytes], Optional[Tuple[int, int]], Optional[str]]]): (source, target, digest) triples.
+
+        Returns:
+            List[Dict[str, Union[str, int, bool, None, List[int]]]]: The renditions, in input order.
+        """
+        futures = [self.submit(source, target, digest) for source, target, digest in items]
+        return [future.result() for future in futures]
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
@@ -0,0 +1,328 @@
+import os
+import re
+import json
+import time
+import socket
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, Optional, Union
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "pictory"
+DEFAULT_STATSD_PORT = 8125
+
+
+class Metrics:
+    """
+    Process-wide timing spans and counters, fanned out to pluggable sinks.
+
+    Spans are aggregated per name into a count, a total and a maximum duration, and counters are
+    summed per name. Event fields (slide number, S3 key, ...) are handed to the sinks but never become
+    part of an aggregate, so per-slide spans do not multiply the exported series.
+
+    A sink is any object with `span(name, seconds, fields)` and `count(name, value, fields)` methods,
+    e.g. `JsonLogSink` or `StatsdSink`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.spans = {}
+        self.sinks = []
+
+    def count(self, name: str, value: Union[int, float] = 1, **fields):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        for sink in self.sinks:
+            sink.count(name, value, fields)
+
+    def observe(self, name: str, seconds: float, **fields):
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                self.spans[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+        for sink in self.sinks:
+            sink.span(name, seconds, fields)
+
+    @contextmanager
+    def span(self, name: str, **fields) -> Iterator[Dict]:
+        """
+        Time a block of work.
+
+        Args:
+            name (str): The stage name, e.g. 's3.upload'.
+            **fields: Event fields passed to the sinks. The yielded dictionary can be updated inside the
+                block, e.g. with the number of bytes handled; an 'error' field is added if the block raises.
+
+        Yields:
+            Dict: The event fields.
+        """
+        start = time.perf_counter()
+        try:
+            yield fields
+        except Exception as e:
+            fields["error"] = type(e).__name__
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **fields)
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Copy the aggregates.
+
+        Returns:
+            Dict[str, Dict]: 'counters' mapping names to totals, and 'spans' mapping names to dictionaries
+                with 'count', 'seconds' (total) and 'max_seconds' keys.
+        """
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "spans": {name: {"count": stats[0], "seconds": stats[1], "max_seconds": stats[2]} for name, stats in self.spans.items()}
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.spans = {}
+
+
+METRICS = Metrics()
+span = METRICS.span
+count = METRICS.count
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorator recording every call of a function as a span of the process-wide metrics."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with METRICS.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class JsonLogSink:
+    """
+    Sink logging every span and counter event as one JSON object.
+
+    Args:
+        logger_name (str): The logger the events are written to.
+    """
+
+    def __init__(self, logger_name: str = "instrumentation.events"):
+        self.logger = logging.getLogger(logger_name)
+
+    def span(self, name: str, seconds: float, fields: Dict):
+        self.logger.info(json.dumps({"event": "span", "name": name, "seconds": round(seconds, 6), **fields}, default=str))
+
+    def count(self, name: str, value: Union[int, float], fields: Dict):
+        self.logger.info(json.dumps({"event": "count", "name": name, "value": value, **fields}, default=str))
+
+
+class StatsdSink:
+    """
+    Sink sending spans as StatsD timers and counters as StatsD counters over UDP.
+
+    Sending never blocks or raises, so an absent collector only loses metrics.
+
+    Args:
+        host (str): The StatsD collector host.
+        port (int): The StatsD collector UDP port.
+        prefix (str): Prepended to every metric name.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_STATSD_PORT, prefix: str = METRIC_PREFIX):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def _send(self, line: str):
+        try:
+            self._socket.sendto(line.encode(), self.address)
+        except OSError:
+            pass
+
+    def span(self, name: str, seconds: float, fields: Dict):
+        self._send(f"{self.prefix}.{name}:{seconds * 1000:.3f}|ms")
+
+    def count(self, name: str, value: Union[int, float], fields: Dict):
+        self._send(f"{self.prefix}.{name}:{value}|c")
+
+    def close(self):
+        self._socket.close()
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if record.name == "instrumentation.events":
+            # Already a JSON event; nest it instead of quoting it
+            return json.dumps({"time": record.created, "level": record.levelname, "logger": record.name, **json.loads(message)})
+        entry = {"time": record.created, "level": record.levelname, "logger": record.name, "message": message}
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def enable_json_logs(metrics: Metrics = METRICS) -> JsonLogSink:
+    """
+    Switch to structured logging: every log line, including the existing `logger.info`/`logger.error`
+    output, becomes a JSON object, and span and counter events are logged alongside.
+
+    Args:
+        metrics (Metrics): The metrics to log the events of.
+
+    Returns:
+        JsonLogSink: The sink added to the metrics.
+    """
+    root = logging.getLogger()
+    if not root.handlers:
+        root.addHandler(logging.StreamHandler())
+    for handler in root.handlers:
+        handler.setFormatter(_JsonFormatter())
+    sink = JsonLogSink()
+    metrics.add_sink(sink)
+    return sink
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def prometheus_text(snapshot: Optional[Dict[str, Dict]] = None, prefix: str = METRIC_PREFIX) -> str:
+    """
+    Render aggregates in the Prometheus text exposition format.
+
+    Counters become '<prefix>_<name>_total'; spans become the '<prefix>_span_seconds' summary
+    ('_count' and '_sum') and the '<prefix>_span_seconds_max' gauge, labelled by span name.
+
+    Args:
+        snapshot (Optional[Dict[str, Dict]]): A `Metrics.snapshot()`, or None for the process-wide metrics.
+        prefix (str): Prepended to every metric name.
+
+    Returns:
+        str: The exposition text.
+    """
+    snapshot = snapshot if snapshot is not None else METRICS.snapshot()
+    lines = []
+    for name, value in sorted(snapshot["counters"].items()):
+        metric = f"{prefix}_{_metric_name(name)}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    if snapshot["spans"]:
+        lines.append(f"# TYPE {prefix}_span_seconds summary")
+        for name, stats in sorted(snapshot["spans"].items()):
+            lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {stats["count"]}')
+            lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {stats["seconds"]:.6f}')
+        lines.append(f"# TYPE {prefix}_span_seconds_max gauge")
+        for name, stats in sorted(snapshot["spans"].items()):
+            lines.append(f'{prefix}_span_seconds_max{{span="{name}"}} {stats["max_seconds"]:.6f}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str, snapshot: Optional[Dict[str, Dict]] = None):
+    """
+    Atomically write aggregates to a file, e.g. for the node_exporter textfile collector.
+
+    Args:
+        path (str): The .prom file to write.
+        snapshot (Optional[Dict[str, Dict]]): A `Metrics.snapshot()`, or None for the process-wide metrics.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(prometheus_text(snapshot))
+    os.replace(tmp_path, path)
+
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """
+    Combine snapshots taken in several processes, e.g. one per deck of a batch.
+
+    Args:
+        snapshots (Iterable[Dict[str, Dict]]): The `Metrics.snapshot()` results.
+
+    Returns:
+        Dict[str, Dict]: A snapshot with summed counters and span counts and totals, and the largest maximums.
+    """
+    merged = {"counters": {}, "spans": {}}
+    for snapshot in snapshots:
+        for name, value in snapshot["counters"].items():
+            merged["counters"][name] = merged["counters"].get(name, 0) + value
+        for name, stats in snapshot["spans"].items():
+            total = merged["spans"].setdefault(name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            total["count"] += stats["count"]
+            total["seconds"] += stats["seconds"]
+            total["max_seconds"] = max(total["max_seconds"], stats["max_seconds"])
+    return merged
+
+
+def serve_prometheus(port: int, host: str = "127.0.0.1", metrics: Metrics = METRICS) -> "ThreadingHTTPServer":
+    """
+    Serve the aggregates for scraping at 'http://<host>:<port>/metrics' from a background thread.
+
+    Args:
+        port (int): The port to listen on; 0 picks a free one.
+        host (str): The interface to listen on.
+        metrics (Metrics): The metrics to serve.
+
+    Returns:
+        ThreadingHTTPServer: The running server; call `shutdown()` to stop it.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = prometheus_text(metrics.snapshot()).encode()
+            self.send_response(200 if self.path.split("?")[0] in ("/", "/metrics") else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="prometheus-exporter", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def configure_from_env(metrics: Metrics = METRICS, serve: bool = True):
+    """
+    Enable exporters from the environment: METRICS_JSON_LOGS=1 for structured logs,
+    METRICS_STATSD=host:port for a StatsD collector and METRICS_PROMETHEUS_PORT for a scrape endpoint.
+
+    Args:
+        metrics (Metrics): The metrics to export.
+        serve (bool): Whether to start the scrape endpoint; worker processes sharing one port should not.
+    """
+    if os.environ.get("METRICS_JSON_LOGS", "") not in ("", "0"):
+        enable_json_logs(metrics)
+    statsd = os.environ.get("METRICS_STATSD")
+    if statsd:
+        host, _, port = statsd.partition(":")
+        metrics.add_sink(StatsdSink(host or "127.0.0.1", int(port or DEFAULT_STATSD_PORT)))
+    prometheus_port = os.environ.get("METRICS_PROMETHEUS_PORT")
+    if prometheus_port and serve:
+        serve_prometheus(int(prometheus_port), metrics=metrics)
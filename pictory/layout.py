@@ -0,0 +1,231 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+
+from .records import FRAME_SIZE, Box, SlideRecord
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Shape kinds in `DeckLayout.kinds`
+TEXT = 0
+MEDIA = 1
+# Shapes whose tops are within this fraction of the slide height of each other are read as one line
+DEFAULT_LINE_TOLERANCE = 0.02
+
+
+def _box_values(box: Box) -> Tuple[float, float, float, float]:
+    return tuple(np.nan if value is None else value for value in (box.left, box.top, box.width, box.height))
+
+
+def _pixel_dict(values: List[float]) -> Optional[Dict[str, int]]:
+    if any(value != value for value in values):
+        return None
+    return dict(zip(("left", "top", "width", "height"), map(int, values)))
+
+
+class DeckLayout:
+    """
+    The geometry of every text box and media shape of a deck, held in NumPy arrays so that pixel
+    coordinates, reading order, overlaps and bounding boxes are computed for the whole deck at once.
+
+    Row i describes one shape: `slide_nums[i]`, `kinds[i]` (TEXT or MEDIA), `indices[i]` (its position
+    in the slide record's `texts` or `media`) and `boxes[i]` (left, top, width and height in EMU, NaN
+    where the shape does not define them). Rows are grouped by slide, and `slides` / `starts` give each
+    slide number and its first row.
+
+    Args:
+        slide_nums (np.ndarray): The slide number of each shape.
+        kinds (np.ndarray): TEXT or MEDIA for each shape.
+        indices (np.ndarray): The position of each shape in its record's texts or media.
+        boxes (np.ndarray): An (n, 4) array of left, top, width and height in EMU.
+        slide_size (Tuple[int, int]): The slide width and height in EMU.
+    """
+
+    def __init__(self, slide_nums: np.ndarray, kinds: np.ndarray, indices: np.ndarray, boxes: np.ndarray, slide_size: Tuple[int, int]):
+        order = np.argsort(slide_nums, kind="stable")
+        self.slide_nums = np.asarray(slide_nums, dtype=np.int64)[order]
+        self.kinds = np.asarray(kinds, dtype=np.int8)[order]
+        self.indices = np.asarray(indices, dtype=np.int64)[order]
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)[order]
+        self.slide_size = slide_size
+        self.slides, self.starts = np.unique(self.slide_nums, return_index=True)
+        # Index into `slides` of every row
+        self._slide_rows = np.searchsorted(self.slides, self.slide_nums)
+
+    @classmethod
+    def from_records(cls, records: Iterable[SlideRecord], slide_size: Tuple[int, int]) -> "DeckLayout":
+        """
+        Gather the geometry of slide records.
+
+        Args:
+            records (Iterable[SlideRecord]): The slide records, e.g. from `extraction_engine.extract_records`.
+            slide_size (Tuple[int, int]): The slide width and height in EMU, e.g. from `media_index.read_slide_size`.
+
+        Returns:
+            DeckLayout: The deck's layout.
+        """
+        slide_nums, kinds, indices, boxes = [], [], [], []
+        for record in records:
+            for kind, shapes in ((TEXT, record.texts), (MEDIA, record.media)):
+                for i, shape in enumerate(shapes):
+                    slide_nums.append(record.slide_num)
+                    kinds.append(kind)
+                    indices.append(i)
+                    boxes.append(_box_values(shape.box))
+        return cls(np.array(slide_nums, dtype=np.int64), np.array(kinds, dtype=np.int8),
+                   np.array(indices, dtype=np.int64), np.array(boxes, dtype=np.float64), slide_size)
+
+    def __len__(self) -> int:
+        return len(self.slide_nums)
+
+    def pixel_boxes(self, frame_size: Tuple[int, int] = FRAME_SIZE) -> np.ndarray:
+        """
+        Map every shape into a video frame the slide is fitted into, centred with letterboxing if the aspect ratios differ.
+
+        Args:
+            frame_size (Tuple[int, int]): The frame width and height in pixels.
+
+        Returns:
+            np.ndarray: An (n, 4) array of left, top, width and height in pixels, rounded, NaN where undefined.
+        """
+        return self._to_pixels(self.boxes, frame_size)
+
+    def _to_pixels(self, boxes: np.ndarray, frame_size: Tuple[int, int]) -> np.ndarray:
+        scale = min(frame_size[0] / self.slide_size[0], frame_size[1] / self.slide_size[1])
+        offset = np.array([(frame_size[0] - self.slide_size[0] * scale) / 2, (frame_size[1] - self.slide_size[1] * scale) / 2, 0, 0])
+        return np.rint(boxes * scale + offset)
+
+    def reading_order(self, line_tolerance: float = DEFAULT_LINE_TOLERANCE) -> np.ndarray:
+        """
+        Rank the shapes of each slide top to bottom, then left to right within a line.
+
+        Tops are bucketed into lines `line_tolerance` of the slide height apart, so shapes that are
+        almost level are read left to right. Shapes without a position come last, in record order.
+
+        Args:
+            line_tolerance (float): The line height as a fraction of the slide height.
+
+        Returns:
+            np.ndarray: The 0-based rank of every shape within its slide.
+        """
+        lines = np.floor(self.boxes[:, 1] / (line_tolerance * self.slide_size[1]))
+        lines = np.where(np.isnan(lines), np.inf, lines)
+        lefts = np.where(np.isnan(self.boxes[:, 0]), np.inf, self.boxes[:, 0])
+        # The last key sorts first; rows are already grouped by slide in record order
+        order = np.lexsort((np.arange(len(self)), lefts, lines, self.slide_nums))
+        ranks = np.empty(len(self), dtype=np.int64)
+        ranks[order] = np.arange(len(self)) - self.starts[self._slide_rows[order]]
+        return ranks
+
+    def bounds(self) -> np.ndarray:
+        """
+        Compute the box enclosing the positioned shapes of each slide.
+
+        Returns:
+            np.ndarray: A (len(slides), 4) array of left, top, width and height in EMU; NaN for slides
+                without positioned shapes.
+        """
+        if not len(self):
+            return np.empty((0, 4))
+        lefts, tops = self.boxes[:, 0], self.boxes[:, 1]
+        rights, bottoms = lefts + self.boxes[:, 2], tops + self.boxes[:, 3]
+        # fmin/fmax skip NaN, so shapes without a position do not blank their slide's bounds
+        left = np.fmin.reduceat(lefts, self.starts)
+        top = np.fmin.reduceat(tops, self.starts)
+        right = np.fmax.reduceat(rights, self.starts)
+        bottom = np.fmax.reduceat(bottoms, self.starts)
+        return np.stack([left, top, right - left, bottom - top], axis=1)
+
+    def overlaps(self) -> Dict[str, np.ndarray]:
+        """
+        Find every text box that overlaps a media shape on the same slide.
+
+        All (text, media) pairs of all slides are built and tested in one pass. The records carry no
+        z-order, so occlusion is reported as the share of each shape's area the other covers.
+
+        Returns:
+            Dict[str, np.ndarray]: Parallel arrays, one entry per overlapping pair: 'slide_num', 'text'
+                and 'media' (indices into the record's texts and media), 'area' (EMU squared),
+                'text_covered' and 'media_covered' (fractions of each shape's area).
+        """
+        text_rows = np.flatnonzero(self.kinds == TEXT)
+        media_rows = np.flatnonzero(self.kinds == MEDIA)
+        # Media rows of each slide are contiguous in `media_rows`
+        media_counts = np.bincount(self._slide_rows[media_rows], minlength=len(self.slides))
+        media_starts = np.cumsum(media_counts) - media_counts
+
+        pairs_per_text = media_counts[self._slide_rows[text_rows]]
+        pair_count = int(pairs_per_text.sum())
+        pair_text = np.repeat(text_rows, pairs_per_text)
+        within = np.arange(pair_count) - np.repeat(np.cumsum(pairs_per_text) - pairs_per_text, pairs_per_text)
+        pair_media = media_rows[np.repeat(media_starts[self._slide_rows[text_rows]], pairs_per_text) + within]
+
+        a, b = self.boxes[pair_text], self.boxes[pair_media]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            widths = np.minimum(a[:, 0] + a[:, 2], b[:, 0] + b[:, 2]) - np.maximum(a[:, 0], b[:, 0])
+            heights = np.minimum(a[:, 1] + a[:, 3], b[:, 1] + b[:, 3]) - np.maximum(a[:, 1], b[:, 1])
+            areas = np.clip(widths, 0, None) * np.clip(heights, 0, None)
+            hit = areas > 0
+            areas = areas[hit]
+            text_covered = areas / (a[hit, 2] * a[hit, 3])
+            media_covered = areas / (b[hit, 2] * b[hit, 3])
+        return {
+            "slide_num": self.slide_nums[pair_text[hit]],
+            "text": self.indices[pair_text[hit]],
+            "media": self.indices[pair_media[hit]],
+            "area": areas,
+            "text_covered": text_covered,
+            "media_covered": media_covered
+        }
+
+    def to_slides(self, frame_size: Tuple[int, int] = FRAME_SIZE, line_tolerance: float = DEFAULT_LINE_TOLERANCE) -> Dict[int, Dict]:
+        """
+        Convert the layout to JSON-ready per-slide dictionaries.
+
+        Args:
+            frame_size (Tuple[int, int]): The frame width and height in pixels.
+            line_tolerance (float): The line height of the reading order, as a fraction of the slide height.
+
+        Returns:
+            Dict[int, Dict]: A dictionary mapping slide numbers to dictionaries with 'frame_size', 'bounds'
+                (in pixels), 'texts' and 'media' (each in record order with 'position' in pixels and reading
+                'order') and 'overlaps' (with 'text', 'media', 'text_covered' and 'media_covered').
+        """
+        pixels = self.pixel_boxes(frame_size).tolist()
+        ranks = self.reading_order(line_tolerance).tolist()
+        bounds = self._to_pixels(self.bounds(), frame_size).tolist()
+
+        slides = {}
+        for slide_num, slide_bounds in zip(self.slides.tolist(), bounds):
+            slides[slide_num] = {"frame_size": list(frame_size), "bounds": _pixel_dict(slide_bounds), "texts": [], "media": [], "overlaps": []}
+        for slide_num, kind, position, rank in zip(self.slide_nums.tolist(), self.kinds.tolist(), pixels, ranks):
+            slides[slide_num]["texts" if kind == TEXT else "media"].append({"position": _pixel_dict(position), "order": rank})
+
+        overlaps = self.overlaps()
+        for slide_num, text, media, text_covered, media_covered in zip(
+                overlaps["slide_num"].tolist(), overlaps["text"].tolist(), overlaps["media"].tolist(),
+                overlaps["text_covered"].tolist(), overlaps["media_covered"].tolist()):
+            slides[slide_num]["overlaps"].append({"text": text, "media": media, "text_covered": round(text_covered, 4), "media_covered": round(media_covered, 4)})
+        return slides
+
+
+def slide_layouts(records: Iterable[SlideRecord], slide_size: Tuple[int, int], frame_size: Tuple[int, int] = FRAME_SIZE,
+                  line_tolerance: float = DEFAULT_LINE_TOLERANCE) -> Dict[int, Dict[str, Union[List, Dict, None]]]:
+    """
+    Compute the per-slide layout of slide records for a video frame.
+
+    Args:
+        records (Iterable[SlideRecord]): The slide records.
+        slide_size (Tuple[int, int]): The slide width and height in EMU.
+        frame_size (Tuple[int, int]): The frame width and height in pixels.
+        line_tolerance (float): The line height of the reading order, as a fraction of the slide height.
+
+    Returns:
+        Dict[int, Dict[str, Union[List, Dict, None]]]: `DeckLayout.to_slides` output, with an empty layout
+            for slides that have neither text nor media.
+    """
+    records = list(records)
+    slides = DeckLayout.from_records(records, slide_size).to_slides(frame_size, line_tolerance)
+    return {record.slide_num: slides.get(record.slide_num) or {"frame_size": list(frame_size), "bounds": None, "texts": [], "media": [], "overlaps": []}
+            for record in records}
@@ -0,0 +1,111 @@
+import os
+import json
+import hashlib
+import logging
+import zipfile
+from typing import Dict, Iterable, Optional, Union
+
+from .media_index import MEDIA_PREFIX, rels_name, read_relationships, slide_part_names
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def media_fingerprint(zip_info: zipfile.ZipInfo) -> str:
+    """
+    Fingerprint a media entry from the ZIP central directory, without decompressing it.
+
+    Args:
+        zip_info (zipfile.ZipInfo): The media entry.
+
+    Returns:
+        str: The entry's CRC-32 and uncompressed size.
+    """
+    return f"{zip_info.CRC:08x}-{zip_info.file_size}"
+
+
+def slide_fingerprints(zip_ref: zipfile.ZipFile) -> Dict[int, str]:
+    """
+    Hash every slide from its XML, its relationships and the fingerprints of the media it references.
+
+    A slide's hash changes when its shapes or text change, when it points at a different layout or
+    media part, or when a referenced media part is replaced in place.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+
+    Returns:
+        Dict[int, str]: A dictionary mapping slide numbers to SHA-256 hex digests.
+    """
+    fingerprints = {}
+    for slide_num, slide_part in enumerate(slide_part_names(zip_ref), start=1):
+        sha = hashlib.sha256(zip_ref.read(slide_part))
+        try:
+            sha.update(zip_ref.read(rels_name(slide_part)))
+        except KeyError:
+            pass
+        for rel in read_relationships(zip_ref, slide_part).values():
+            if not rel["external"] and rel["target"].startswith(MEDIA_PREFIX):
+                try:
+                    sha.update(media_fingerprint(zip_ref.getinfo(rel["target"])).encode())
+                except KeyError:
+                    pass
+        fingerprints[slide_num] = sha.hexdigest()
+    return fingerprints
+
+
+class DeckManifest:
+    """
+    Persisted per-deck record of slide hashes, media fingerprints and the results they produced.
+
+    Slides are cached by content hash rather than slide number, so a slide that only moved is
+    still reused. Media is cached by ZIP member name and fingerprint.
+
+    Args:
+        path (str): The JSON file holding the manifest; it is created on the first `save`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data = {"version": MANIFEST_VERSION, "slides": {}, "media": {}}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.data = data
+                else:
+                    logger.warning(f"Ignoring manifest {path} with unsupported version {data.get('version')}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+
+    def cached_slide(self, digest: str) -> Optional[dict]:
+        return self.data["slides"].get(digest)
+
+    def record_slide(self, digest: str, paired: dict):
+        self.data["slides"][digest] = paired
+
+    def cached_media(self, name: str, fingerprint: str) -> Optional[Dict[str, Union[str, int, bool]]]:
+        media = self.data["media"].get(name)
+        if media is None or media["fingerprint"] != fingerprint:
+            return None
+        return media["entry"]
+
+    def record_media(self, name: str, fingerprint: str, entry: Dict[str, Union[str, int, bool]]):
+        self.data["media"][name] = {"fingerprint": fingerprint, "entry": entry}
+
+    def prune(self, slide_digests: Iterable[str], media_names: Iterable[str]):
+        """Drop slides and media that are no longer part of the deck."""
+        slide_digests = set(slide_digests)
+        media_names = set(media_names)
+        self.data["slides"] = {digest: paired for digest, paired in self.data["slides"].items() if digest in slide_digests}
+        self.data["media"] = {name: media for name, media in self.data["media"].items() if name in media_names}
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.path, "w") as f:
+            json.dump(self.data, f, indent=2)
@@ -0,0 +1,225 @@
+import posixpath
+import logging
+import zipfile
+from typing import Dict, List, Optional, Tuple, Union
+from lxml import etree
+
+from .instrumentation import timed
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NSMAP = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "pr": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_R = "{%s}" % NSMAP["r"]
+_SHAPE_TAGS = {"{%s}%s" % (NSMAP["p"], tag) for tag in ("pic", "sp", "graphicFrame", "cxnSp")}
+_SLIDE_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+_CONTENT_TYPES_NS = {"ct": "http://schemas.openxmlformats.org/package/2006/content-types"}
+MEDIA_PREFIX = "ppt/media/"
+# 10in x 7.5in, what PowerPoint assumes when presentation.xml has no p:sldSz
+DEFAULT_SLIDE_SIZE = (9144000, 6858000)
+
+
+def rels_name(part_name: str) -> str:
+    directory, filename = posixpath.split(part_name)
+    return posixpath.join(directory, "_rels", filename + ".rels")
+
+
+def read_relationships(zip_ref: zipfile.ZipFile, part_name: str) -> Dict[str, Dict[str, Union[str, bool]]]:
+    """
+    Read the relationships of a package part.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+        part_name (str): The ZIP member name of the source part, e.g. 'ppt/slides/slide1.xml'.
+
+    Returns:
+        Dict[str, Dict[str, Union[str, bool]]]: A dictionary mapping relationship ids to dictionaries with 'type', 'target' and 'external' keys.
+            Internal targets are resolved to ZIP member names; external targets are left untouched.
+    """
+    try:
+        root = etree.fromstring(zip_ref.read(rels_name(part_name)))
+    except KeyError:
+        return {}
+
+    relationships = {}
+    base = posixpath.dirname(part_name)
+    for rel in root.iterfind("pr:Relationship", NSMAP):
+        target = rel.get("Target")
+        external = rel.get("TargetMode") == "External"
+        if not external:
+            target = posixpath.normpath(posixpath.join(base, target)) if not target.startswith("/") else target[1:]
+        relationships[rel.get("Id")] = {"type": rel.get("Type"), "target": target, "external": external}
+    return relationships
+
+
+def read_content_types(zip_ref: zipfile.ZipFile) -> Dict[str, str]:
+    """
+    Resolve the content type of every member of a PowerPoint package from '[Content_Types].xml'.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+
+    Returns:
+        Dict[str, str]: A dictionary mapping ZIP member names to content types, e.g. 'image/png'.
+            Members matching neither an override nor a default extension are left out.
+    """
+    try:
+        root = etree.fromstring(zip_ref.read("[Content_Types].xml"))
+    except KeyError:
+        return {}
+
+    defaults = {default.get("Extension").lower(): default.get("ContentType") for default in root.iterfind("ct:Default", _CONTENT_TYPES_NS)}
+    overrides = {override.get("PartName").lstrip("/"): override.get("ContentType") for override in root.iterfind("ct:Override", _CONTENT_TYPES_NS)}
+    content_types = {}
+    for name in zip_ref.namelist():
+        content_type = overrides.get(name, defaults.get(posixpath.splitext(name)[1][1:].lower()))
+        if content_type is not None:
+            content_types[name] = content_type
+    return content_types
+
+
+def slide_part_names(zip_ref: zipfile.ZipFile) -> List[str]:
+    """
+    List the slide parts of a PowerPoint package in presentation order.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+
+    Returns:
+        List[str]: The ZIP member names of the slides, the first entry being slide 1.
+    """
+    relationships = read_relationships(zip_ref, "ppt/presentation.xml")
+    root = etree.fromstring(zip_ref.read("ppt/presentation.xml"))
+    slides = []
+    for sld_id in root.iterfind("p:sldIdLst/p:sldId", NSMAP):
+        rel = relationships.get(sld_id.get(_R + "id"))
+        if rel is not None and rel["type"] == _SLIDE_REL_TYPE:
+            slides.append(rel["target"])
+    return slides
+
+
+def read_slide_size(zip_ref: zipfile.ZipFile) -> Tuple[int, int]:
+    """
+    Read the slide size of a PowerPoint package.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+
+    Returns:
+        Tuple[int, int]: The slide width and height in EMU; the 4:3 default if the presentation does not define them.
+    """
+    root = etree.fromstring(zip_ref.read("ppt/presentation.xml"))
+    size = root.find("p:sldSz", NSMAP)
+    if size is None:
+        return DEFAULT_SLIDE_SIZE
+    return int(size.get("cx")), int(size.get("cy"))
+
+
+def _owning_shape(element) -> Optional[etree._Element]:
+    for ancestor in element.iterancestors():
+        if ancestor.tag in _SHAPE_TAGS:
+            return ancestor
+    return None
+
+
+def shape_position(shape) -> Optional[Dict[str, int]]:
+    """
+    Read a shape's position from its own transform, without resolving placeholder inheritance.
+
+    Args:
+        shape: The lxml element of a p:pic, p:sp, p:graphicFrame or p:cxnSp shape.
+
+    Returns:
+        Optional[Dict[str, int]]: The 'left', 'top', 'width' and 'height' in EMU, or None if the shape has no transform.
+    """
+    off = shape.find("p:spPr/a:xfrm/a:off", NSMAP)
+    ext = shape.find("p:spPr/a:xfrm/a:ext", NSMAP)
+    if off is None:
+        off = shape.find("p:xfrm/a:off", NSMAP)
+        ext = shape.find("p:xfrm/a:ext", NSMAP)
+    if off is None or ext is None:
+        return None
+    return {
+        "left": int(off.get("x")),
+        "top": int(off.get("y")),
+        "width": int(ext.get("cx")),
+        "height": int(ext.get("cy"))
+    }
+
+
+@timed("media.index")
+def slide_media_references(root, media_rels: Dict[str, str], slide_num: int) -> List[Tuple[str, Dict[str, Union[int, str, None, Dict[str, int]]]]]:
+    """
+    Find the shapes of one slide that reference media.
+
+    Args:
+        root: The parsed slide XML (p:sld).
+        media_rels (Dict[str, str]): The slide's media relationship ids mapped to media ZIP member names.
+        slide_num (int): The slide number recorded in each reference.
+
+    Returns:
+        List[Tuple[str, Dict[str, Union[int, str, None, Dict[str, int]]]]]: (media name, reference) pairs in
+            document order, one per (media, shape) pair, with the reference keys of `build_media_index`.
+    """
+    references = []
+    seen = set()
+    for element in root.iter(etree.Element):
+        for attribute, r_id in element.attrib.items():
+            if not attribute.startswith(_R) or r_id not in media_rels:
+                continue
+            target = media_rels[r_id]
+            shape = _owning_shape(element)
+            key = (target, shape)
+            if key in seen:
+                continue
+            seen.add(key)
+            c_nv_pr = shape.find("*/p:cNvPr", NSMAP) if shape is not None else None
+            references.append((target, {
+                "slide_num": slide_num,
+                "shape_id": int(c_nv_pr.get("id")) if c_nv_pr is not None else None,
+                "shape_name": c_nv_pr.get("name") if c_nv_pr is not None else None,
+                "position": shape_position(shape) if shape is not None else None
+            }))
+    return references
+
+
+def build_media_index(zip_ref: zipfile.ZipFile, positioned: bool = False) -> Dict[str, List[Dict[str, Union[int, str, None, Dict[str, int]]]]]:
+    """
+    Map every media part to the slides and shapes that reference it.
+
+    The index is built from the slide relationship parts ('ppt/slides/_rels/slideN.xml.rels') and
+    the slide XML, so no media payload is read. Media shared by several slides or shapes gets one
+    reference per (slide, shape) pair.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+        positioned (bool): Whether to keep only references with a position, leaving out media that is not
+            placed by a shape with its own transform.
+
+    Returns:
+        Dict[str, List[Dict[str, Union[int, str, None, Dict[str, int]]]]]:
+            A dictionary mapping media ZIP member names (e.g. 'ppt/media/image1.png') to lists of references.
+            Each reference has 'slide_num', 'shape_id', 'shape_name' and 'position' keys; the shape keys and
+            the position are None when the media is referenced without a shape (e.g. a slide background).
+    """
+    index = {}
+    for slide_num, slide_part in enumerate(slide_part_names(zip_ref), start=1):
+        media_rels = {
+            r_id: rel["target"] for r_id, rel in read_relationships(zip_ref, slide_part).items()
+            if not rel["external"] and rel["target"].startswith(MEDIA_PREFIX)
+        }
+        if not media_rels:
+            continue
+
+        root = etree.fromstring(zip_ref.read(slide_part))
+        for target, reference in slide_media_references(root, media_rels, slide_num):
+            if positioned and reference["position"] is None:
+                continue
+            index.setdefault(target, []).append(reference)
+
+    return index
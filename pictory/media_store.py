@@ -0,0 +1,181 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import Future
+from typing import BinaryIO, Dict, Optional, Tuple, Union
+
+from .instrumentation import count, span
+from .media_stream import CHUNK_SIZE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFIX = "media"
+
+
+class MediaStore:
+    """
+    Content-addressed media store shared across slides and decks.
+
+    Every blob is keyed by the SHA-256 of its content, so a logo used on every slide of
+    hundreds of decks is written locally once and uploaded once to '<prefix>/<sha256><ext>'.
+    The index can be persisted as JSON to carry dedup across runs, and uploads are skipped
+    when the index or a HEAD request shows the object is already in the bucket.
+
+    Counters in `stats`: 'media_seen', 'unique', 'dedup_hits', 'bytes_written', 'bytes_saved'
+    (local writes avoided), 'uploads', 'uploads_skipped' and 'upload_bytes_saved'.
+
+    Args:
+        local_dir (str): The directory holding the blobs, named '<sha256><ext>'.
+        index_path (Optional[str]): The JSON file persisting the index, or None to keep it in memory.
+        prefix (str): The S3 key prefix for the blobs.
+    """
+
+    def __init__(self, local_dir: str, index_path: Optional[str] = None, prefix: str = DEFAULT_PREFIX):
+        self.local_dir = local_dir
+        self.index_path = index_path
+        self.prefix = prefix
+        self.stats = dict.fromkeys(("media_seen", "unique", "dedup_hits", "bytes_written", "bytes_saved",
+                                    "uploads", "uploads_skipped", "upload_bytes_saved"), 0)
+        self._lock = threading.Lock()
+        self._uploading = set()
+        self.index = {}
+        if index_path is not None and os.path.exists(index_path):
+            with open(index_path) as f:
+                self.index = json.load(f)
+        if not os.path.exists(local_dir):
+            os.makedirs(local_dir)
+
+    def key_for(self, digest: str, ext: str) -> str:
+        return f"{self.prefix}/{digest}{ext}"
+
+    def _known(self, digest: str) -> bool:
+        # A blob needs no new write once it is on disk, or once it is uploaded and the local copy was dropped
+        entry = self.index.get(digest)
+        return entry is not None and (entry["uploaded"] or os.path.exists(entry["path"]))
+
+    def _record(self, digest: str, ext: str, size: int, tmp_path: Optional[str]) -> Tuple[Dict[str, Union[str, int, bool]], bool]:
+        with self._lock:
+            self.stats["media_seen"] += 1
+            entry = self.index.get(digest)
+            if self._known(digest):
+                self.stats["dedup_hits"] += 1
+                self.stats["bytes_saved"] += size
+                count("media_dedup_hits", hash=digest)
+                if tmp_path is not None:
+                    os.remove(tmp_path)
+                return dict(entry, hash=digest), False
+
+            path = os.path.join(self.local_dir, digest + ext)
+            if tmp_path is not None:
+                os.replace(tmp_path, path)
+            if entry is None:
+                entry = {"key": self.key_for(digest, ext), "size": size, "uploaded": False}
+                self.stats["unique"] += 1
+            entry["path"] = path
+            self.index[digest] = entry
+            self.stats["bytes_written"] += size
+            return dict(entry, hash=digest), True
+
+    def add_bytes(self, data: bytes, ext: str) -> Tuple[Dict[str, Union[str, int, bool]], bool]:
+        """
+        Add an in-memory blob to the store, writing it only if its content is new.
+
+        Args:
+            data (bytes): The blob.
+            ext (str): The file extension including the dot, e.g. '.png'.
+
+        Returns:
+            Tuple[Dict[str, Union[str, int, bool]], bool]: The entry ('hash', 'key', 'path', 'size', 'uploaded')
+                and whether the blob was new.
+        """
+        with span("media.store", bytes=len(data)):
+            digest = hashlib.sha256(data).hexdigest()
+            with self._lock:
+                known = self._known(digest)
+            if not known:
+                path = os.path.join(self.local_dir, digest + ext)
+                with open(path, "wb") as f:
+                    f.write(data)
+                count("bytes_written", len(data))
+            return self._record(digest, ext, len(data), None)
+
+    def add_stream(self, stream: BinaryIO, ext: str, chunk_size: int = CHUNK_SIZE) -> Tuple[Dict[str, Union[str, int, bool]], bool]:
+        """
+        Add a streamed blob to the store, hashing it while it is spooled in chunks to a temporary file.
+
+        Args:
+            stream (BinaryIO): The blob stream.
+            ext (str): The file extension including the dot, e.g. '.png'.
+            chunk_size (int): The maximum number of bytes held in memory at once.
+
+        Returns:
+            Tuple[Dict[str, Union[str, int, bool]], bool]: The entry and whether the blob was new.
+        """
+        with span("media.store") as fields:
+            sha = hashlib.sha256()
+            size = 0
+            fd, tmp_path = tempfile.mkstemp(dir=self.local_dir, suffix=".part")
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    sha.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            fields["bytes"] = size
+            count("bytes_written", size)
+            return self._record(sha.hexdigest(), ext, size, tmp_path)
+
+    def sink(self, zip_info: zipfile.ZipInfo, stream: BinaryIO) -> Dict[str, Union[str, int, bool]]:
+        """Sink for `media_stream.stream_media` adding each entry to the store."""
+        return self.add_stream(stream, os.path.splitext(zip_info.filename)[1])[0]
+
+    def upload(self, uploader, entry: Dict[str, Union[str, int, bool]]) -> Optional[Future]:
+        """
+        Upload a blob once, unless the index or a HEAD request shows it is already in the bucket.
+
+        Args:
+            uploader (S3Uploader): The uploader to queue the blob on.
+            entry (Dict[str, Union[str, int, bool]]): The entry returned when the blob was added.
+
+        Returns:
+            Optional[Future]: A future resolving to the upload result, or None if no upload was needed.
+        """
+        digest = entry["hash"]
+        with self._lock:
+            if self.index[digest]["uploaded"] or digest in self._uploading:
+                self.stats["uploads_skipped"] += 1
+                self.stats["upload_bytes_saved"] += entry["size"]
+                count("upload_dedup_hits", hash=digest)
+                return None
+            self._uploading.add(digest)
+
+        def done(future):
+            # A cancelled upload never started, so the blob stays pending for the next attempt
+            result = future.result() if not future.cancelled() else None
+            with self._lock:
+                self._uploading.discard(digest)
+                if result is not None and result["ok"]:
+                    self.index[digest]["uploaded"] = True
+                    self.stats["uploads_skipped" if result["skipped"] else "uploads"] += 1
+                    if result["skipped"]:
+                        self.stats["upload_bytes_saved"] += entry["size"]
+
+        future = uploader.submit(entry["path"], entry["key"], skip_existing=True)
+        future.add_done_callback(done)
+        return future
+
+    def save(self):
+        """Persist the index, if the store has an index path."""
+        if self.index_path is None:
+            return
+        with self._lock:
+            data = json.dumps(self.index, indent=2)
+        with open(self.index_path, "w") as f:
+            f.write(data)
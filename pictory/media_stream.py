@@ -0,0 +1,186 @@
+import os
+import mmap
+import hashlib
+import logging
+import zipfile
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+
+from .instrumentation import count, span
+from .media_index import MEDIA_PREFIX
+from .memory_budget import BUDGET
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+# boto3's default TransferConfig buffers up to ten 8 MiB parts of a stream it cannot seek
+S3_STREAM_BUFFER = 10 * 8 * 1024 * 1024
+
+T = TypeVar("T")
+
+
+@contextmanager
+def open_package(pptx_file: str, use_mmap: bool = False) -> Iterator[zipfile.ZipFile]:
+    """
+    Open a PowerPoint package read-only in place, without copying or renaming it.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        use_mmap (bool): Whether to memory-map the file instead of reading it through a file object.
+
+    Yields:
+        zipfile.ZipFile: The open package.
+    """
+    with open(pptx_file, "rb") as f:
+        if not use_mmap:
+            with span("package.open", deck=pptx_file):
+                zip_ref = zipfile.ZipFile(f, "r")
+            with zip_ref:
+                yield zip_ref
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with span("package.open", deck=pptx_file, mmap=True):
+                zip_ref = zipfile.ZipFile(mapped, "r")
+            with zip_ref:
+                yield zip_ref
+
+
+def copy_stream(source: BinaryIO, sink: BinaryIO, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Copy a stream to a sink in fixed-size chunks.
+
+    Args:
+        source (BinaryIO): The stream to read from.
+        sink (BinaryIO): The stream to write to.
+        chunk_size (int): The maximum number of bytes held in memory at once.
+
+    Returns:
+        int: The number of bytes copied.
+    """
+    copied = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return copied
+        sink.write(chunk)
+        copied += len(chunk)
+
+
+def spool_stream(source: BinaryIO, directory: str, chunk_size: int = CHUNK_SIZE) -> Tuple[str, str, int]:
+    """
+    Spool a stream in chunks to a temporary file, hashing it on the way, instead of reading it into memory.
+
+    Args:
+        source (BinaryIO): The stream to read from.
+        directory (str): The directory of the temporary file; the caller removes the file.
+        chunk_size (int): The maximum number of bytes held in memory at once.
+
+    Returns:
+        Tuple[str, str, int]: The temporary file's path, the SHA-256 of the content and its size.
+    """
+    sha = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".spool")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in iter(lambda: source.read(chunk_size), b""):
+                sha.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    count("bytes_spooled", size)
+    return path, sha.hexdigest(), size
+
+
+def file_sink(output_dir: str, chunk_size: int = CHUNK_SIZE) -> Callable[[zipfile.ZipInfo, BinaryIO], str]:
+    """
+    Build a sink that writes each media entry to a file in the output directory.
+
+    Args:
+        output_dir (str): The directory to save the media files.
+        chunk_size (int): The maximum number of bytes held in memory at once.
+
+    Returns:
+        Callable[[zipfile.ZipInfo, BinaryIO], str]: A sink returning the path of the written file.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    def sink(zip_info: zipfile.ZipInfo, stream: BinaryIO) -> str:
+        media_path = os.path.join(output_dir, os.path.basename(zip_info.filename))
+        with open(media_path, "wb") as f:
+            count("bytes_written", copy_stream(stream, f, chunk_size))
+        return media_path
+
+    return sink
+
+
+def s3_sink(s3, bucket_name: str, key_for: Callable[[zipfile.ZipInfo], str]) -> Callable[[zipfile.ZipInfo, BinaryIO], str]:
+    """
+    Build a sink that uploads each media entry to S3 straight from the package.
+
+    The entry stream is handed to `upload_fileobj`, which reads it in parts, so the media
+    never touches the local disk. The parts it buffers are reserved from `memory_budget.BUDGET`
+    first, so concurrent uploads wait instead of buffering past the budget.
+
+    Args:
+        s3: A boto3 S3 client.
+        bucket_name (str): The name of the S3 bucket.
+        key_for (Callable[[zipfile.ZipInfo], str]): Maps a media entry to its S3 key.
+
+    Returns:
+        Callable[[zipfile.ZipInfo, BinaryIO], str]: A sink returning the S3 key of the uploaded object.
+    """
+    def sink(zip_info: zipfile.ZipInfo, stream: BinaryIO) -> str:
+        s3_key = key_for(zip_info)
+        with BUDGET.reserve(min(zip_info.file_size, S3_STREAM_BUFFER), "s3.stream"):
+            s3.upload_fileobj(stream, bucket_name, s3_key)
+        return s3_key
+
+    return sink
+
+
+def stream_entry(zip_ref: zipfile.ZipFile, zip_info: zipfile.ZipInfo, sink: Callable[[zipfile.ZipInfo, BinaryIO], T]) -> T:
+    """
+    Pipe one entry of an open package to a sink as a decompressed stream.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+        zip_info (zipfile.ZipInfo): The entry, e.g. from `zip_ref.getinfo`.
+        sink (Callable[[zipfile.ZipInfo, BinaryIO], T]): Consumes the entry's stream and returns a result for it.
+
+    Returns:
+        T: The sink result.
+    """
+    with span("media.stream", part=zip_info.filename, bytes=zip_info.file_size), zip_ref.open(zip_info) as stream:
+        result = sink(zip_info, stream)
+    count("bytes_read", zip_info.file_size)
+    return result
+
+
+def stream_media(zip_ref: zipfile.ZipFile, sink: Callable[[zipfile.ZipInfo, BinaryIO], T], names: Optional[Iterable[str]] = None) -> Dict[str, T]:
+    """
+    Pipe media entries of an open package to a sink, one decompressed stream at a time.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+        sink (Callable[[zipfile.ZipInfo, BinaryIO], T]): Consumes an entry's stream and returns a result for it.
+        names (Optional[Iterable[str]]): The ZIP member names to stream, or None for every entry under 'ppt/media/'.
+
+    Returns:
+        Dict[str, T]: A dictionary mapping ZIP member names to the sink results.
+    """
+    wanted = set(names) if names is not None else None
+    results = {}
+    for zip_info in zip_ref.infolist():
+        if wanted is not None:
+            if zip_info.filename not in wanted:
+                continue
+        elif not zip_info.filename.startswith(MEDIA_PREFIX):
+            continue
+        results[zip_info.filename] = stream_entry(zip_ref, zip_info, sink)
+    return results
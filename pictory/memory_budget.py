@@ -0,0 +1,257 @@
+import os
+import re
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Union
+
+from .instrumentation import METRICS, count
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# In-flight buffer bytes allowed at once in a process, and the entry size above which media is
+# spooled to disk in chunks instead of being held in memory
+DEFAULT_MEMORY_BUDGET = 1024 * 1024 * 1024
+DEFAULT_SPOOL_THRESHOLD = 64 * 1024 * 1024
+
+_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a byte size such as '512M', '2G', '1.5g' or '1048576'.
+
+    Args:
+        value (str): A number of bytes with an optional binary unit suffix (K, M, G, T, optionally followed by 'B' or 'iB').
+
+    Returns:
+        int: The number of bytes.
+
+    Raises:
+        ValueError: If the value is not a size.
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?\s*", value.lower())
+    if match is None:
+        raise ValueError(f"Not a size: '{value}'")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+class MemoryBudget:
+    """
+    A per-process cap on the bytes held in memory by in-flight buffers: packages parsed by
+    python-pptx, image payloads waiting to be converted, decoded images and upload parts.
+
+    Producers (stages that read more data in) `acquire` before reading and block while the budget is
+    spent, until consumers further down the pipeline `release` what they hold. Consumers `track`
+    their working buffers without ever blocking, so a pipeline whose producers are waiting can always
+    drain, and a producer that asks for more than the whole budget still runs once nothing else is in
+    flight. Sizes are estimates from the ZIP directory and image headers, not measured allocations.
+
+    Args:
+        limit (int): The bytes allowed in flight at once.
+        spool_threshold (int): Entries larger than this are spooled to disk in chunks instead of read into memory.
+    """
+
+    def __init__(self, limit: int = DEFAULT_MEMORY_BUDGET, spool_threshold: int = DEFAULT_SPOOL_THRESHOLD):
+        self.limit = limit
+        self.spool_threshold = spool_threshold
+        self._condition = threading.Condition()
+        self.in_flight = 0
+        self.peak = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _add(self, size: int):
+        self.in_flight += size
+        self.peak = max(self.peak, self.in_flight)
+
+    def acquire(self, size: int, label: str = "") -> int:
+        """
+        Reserve bytes for a producer, blocking while they do not fit in the budget.
+
+        Args:
+            size (int): The bytes about to be held.
+            label (str): What the bytes are for, passed to the metrics sinks.
+
+        Returns:
+            int: The bytes reserved, to hand to `release`.
+        """
+        waited = None
+        with self._condition:
+            if self.in_flight and self.in_flight + size > self.limit:
+                start = time.perf_counter()
+                while self.in_flight and self.in_flight + size > self.limit:
+                    self._condition.wait()
+                waited = time.perf_counter() - start
+                self.waits += 1
+                self.wait_seconds += waited
+            self._add(size)
+        if waited is not None:
+            METRICS.observe("memory.wait", waited, label=label, bytes=size)
+            count("memory_waits")
+        return size
+
+    def track(self, size: int) -> int:
+        """Account bytes held by a consumer without blocking; returns them to hand to `release`."""
+        with self._condition:
+            self._add(size)
+        return size
+
+    def release(self, size: int):
+        """Return bytes reserved by `acquire` or `track` and wake the waiting producers."""
+        if not size:
+            return
+        with self._condition:
+            self.in_flight -= size
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, size: int, label: str = "", block: bool = True) -> Iterator[int]:
+        """Hold `size` bytes for the duration of the block; `block=False` tracks them like a consumer."""
+        reserved = self.acquire(size, label) if block else self.track(size)
+        try:
+            yield reserved
+        finally:
+            self.release(reserved)
+
+    def should_spool(self, size: int) -> bool:
+        """Whether an entry of this uncompressed size is spooled to disk rather than held in memory."""
+        return size > self.spool_threshold
+
+    def configure(self, limit: Optional[int] = None, spool_threshold: Optional[int] = None):
+        """Change the limit or spool threshold; waiting producers re-check against the new limit."""
+        with self._condition:
+            if limit is not None:
+                self.limit = limit
+            if spool_threshold is not None:
+                self.spool_threshold = spool_threshold
+            self._condition.notify_all()
+
+    def reset_peak(self):
+        """Start a new peak and wait count from what is in flight now, e.g. at the start of a deck."""
+        with self._condition:
+            self.peak = self.in_flight
+            self.waits = 0
+            self.wait_seconds = 0.0
+
+    @property
+    def stats(self) -> Dict[str, Union[int, float]]:
+        with self._condition:
+            return {"limit": self.limit, "spool_threshold": self.spool_threshold, "in_flight": self.in_flight,
+                    "peak": self.peak, "waits": self.waits, "wait_seconds": self.wait_seconds}
+
+
+def configure_from_env(budget: Optional[MemoryBudget] = None):
+    """
+    Set the budget from MEMORY_BUDGET and MEMORY_SPOOL_THRESHOLD, sizes as accepted by `parse_size`.
+    The CLI sets them from --memory-budget and --spool-threshold so worker processes inherit them.
+    A malformed value is logged and the current setting kept, since this runs when the module is imported.
+
+    Args:
+        budget (Optional[MemoryBudget]): The budget to configure, by default `BUDGET`.
+    """
+    sizes = {}
+    for name in ("MEMORY_BUDGET", "MEMORY_SPOOL_THRESHOLD"):
+        value = os.environ.get(name)
+        if not value:
+            continue
+        try:
+            sizes[name] = parse_size(value)
+        except ValueError:
+            logger.warning(f"Ignoring {name}={value!r}: expected a size such as 512M or 2G")
+    (budget or BUDGET).configure(sizes.get("MEMORY_BUDGET"), sizes.get("MEMORY_SPOOL_THRESHOLD"))
+
+
+def worker_share(workers: int, budget: Optional[MemoryBudget] = None) -> int:
+    """
+    The limit each of `workers` processes gets so that together they stay within the budget.
+
+    The budget is per process: every worker process has its own `BUDGET`, so a pool of N workers each
+    given the configured limit could hold N times as much.
+
+    Args:
+        workers (int): The number of worker processes.
+        budget (Optional[MemoryBudget]): The budget to share, by default `BUDGET`.
+
+    Returns:
+        int: The per-process limit in bytes.
+    """
+    return max(1, (budget or BUDGET).limit // max(1, workers))
+
+
+# The budget shared by extraction, image conversion and upload in this process
+BUDGET = MemoryBudget()
+configure_from_env(BUDGET)
+
+
+def peak_rss() -> Optional[int]:
+    """
+    The peak resident set size of this process in bytes, since the last `reset_peak_rss` where supported.
+
+    Returns:
+        Optional[int]: The high-water mark, or None if the platform reports none.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak resident set size to the current one (Linux only).
+
+    Returns:
+        bool: Whether it was reset; if not, `peak_rss` is the peak since the process started.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def deck_memory(deck: str, budget: Optional[MemoryBudget] = None) -> Iterator[Dict[str, Union[int, float, bool, None]]]:
+    """
+    Measure the peak memory of the deck processed inside the block.
+
+    Both peaks are process-wide, so they describe one deck when the process works on one deck at a
+    time, as batch and service workers do.
+
+    Args:
+        deck (str): The deck, for the log line.
+        budget (Optional[MemoryBudget]): The budget whose peak is reported, by default `BUDGET`.
+
+    Yields:
+        Dict[str, Union[int, float, bool, None]]: Filled when the block exits with 'peak_rss' (bytes, None if
+            unknown), 'peak_rss_since_start' (True when the peak could not be reset for the deck), 'budget_limit',
+            'budget_peak', 'budget_waits' and 'budget_wait_seconds'.
+    """
+    budget = budget or BUDGET
+    budget.reset_peak()
+    reset = reset_peak_rss()
+    report = {}
+    try:
+        yield report
+    finally:
+        stats = budget.stats
+        report.update({"peak_rss": peak_rss(), "peak_rss_since_start": not reset, "budget_limit": stats["limit"],
+                       "budget_peak": stats["peak"], "budget_waits": stats["waits"], "budget_wait_seconds": stats["wait_seconds"]})
+        rss = f"{report['peak_rss'] / 2 ** 20:.0f} MiB" if report["peak_rss"] is not None else "unknown"
+        logger.info(f"Peak memory for {deck}: RSS {rss}, budget {stats['peak'] / 2 ** 20:.0f} of {stats['limit'] / 2 ** 20:.0f} MiB"
+                    f" ({stats['waits']} waits, {stats['wait_seconds']:.2f}s)")
@@ -140,19 +140,20 @@ def extract_slide_text_and_media(pptx_file: str, output_dir: str) -> Dict[int, D
     return paired_data
 
 # Example usage
-pptx_file = "jpictory.pptx"
-output_dir = "output_media"
-paired_data = extract_slide_text_and_media(pptx_file, output_dir)
-
-for slide_num, data in paired_data.items():
-    print(f"Slide {slide_num}:")
-    print(f"Text:\n{', '.join(data['text'])}")
-    print("Media Info:")
-    for media_info in data["media_info"]:
-        print(f"- Path: {media_info['path']}")
-        print(f"  Position: Left={media_info['position']['left']}, Top={media_info['position']['top']}, Width={media_info['position']['width']}, Height={media_info['position']['height']}")
-    print("Text Coordinates:")
-    for text, coordinates in data["text_coordinates"].items():
-        print(f"- Text: {text}")
-        print(f"  Position: Left={coordinates['left']}, Top={coordinates['top']}, Width={coordinates['width']}, Height={coordinates['height']}")
-    print()
\ No newline at end of file
+if __name__ == "__main__":
+    pptx_file = "jpictory.pptx"
+    output_dir = "output_media"
+    paired_data = extract_slide_text_and_media(pptx_file, output_dir)
+
+    for slide_num, data in paired_data.items():
+        print(f"Slide {slide_num}:")
+        print(f"Text:\n{', '.join(data['text'])}")
+        print("Media Info:")
+        for media_info in data["media_info"]:
+            print(f"- Path: {media_info['path']}")
+            print(f"  Position: Left={media_info['position']['left']}, Top={media_info['position']['top']}, Width={media_info['position']['width']}, Height={media_info['position']['height']}")
+        print("Text Coordinates:")
+        for text, coordinates in data["text_coordinates"].items():
+            print(f"- Text: {text}")
+            print(f"  Position: Left={coordinates['left']}, Top={coordinates['top']}, Width={coordinates['width']}, Height={coordinates['height']}")
+        print()
\ No newline at end of file
@@ -0,0 +1,152 @@
+import os
+from typing import Dict, Tuple, List, Optional, Union
+import logging
+from .instrumentation import timed
+from .media_index import build_media_index, read_slide_size
+from .media_stream import open_package, file_sink, stream_media
+from .records import paired_data_from_records
+from .selective import ExtractionRequest, extract_selected
+from .slide_xml import extract_text_boxes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@timed("part1_v2.extract_slide_text")
+def extract_slide_text(pptx_file: str, nested: bool = False) -> Dict[int, Tuple[List[str], Dict[str, Dict[str, float]]]]:
+    """
+    Extract the text content and coordinates from each slide in a PowerPoint presentation.
+
+    The slide XML is streamed directly instead of building python-pptx shape proxies.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        nested (bool): Whether to also extract the text of shapes inside group shapes and table cells.
+
+    Returns:
+        Dict[int, Tuple[List[str], Dict[str, Dict[str, float]]]]: A dictionary mapping slide numbers to tuples containing a list of text content and a dictionary of text coordinates.
+    """
+    try:
+        text_content = {}
+        for slide_num, text_boxes in extract_text_boxes(pptx_file, nested=nested).items():
+            slide_text = [text_box.text for text_box in text_boxes]
+            text_coordinates = {text_box.text: text_box.box.to_dict() for text_box in text_boxes}
+            text_content[slide_num] = (slide_text, text_coordinates)
+
+        return text_content
+    except Exception as e:
+        logger.error(f"An error occurred during text extraction: {e}")
+        return {}
+
+
+@timed("part1_v2.extract_media_from_pptx")
+def extract_media_from_pptx(pptx_file: str, output_dir: str, use_mmap: bool = False) -> Tuple[Dict[int, List[str]], Dict[int, List[Dict[str, float]]]]:
+    """
+    Extract media files (images, videos, etc.) from a PowerPoint presentation and their positions.
+
+    The presentation is read in place and each media entry is streamed to disk in chunks,
+    so neither the deck nor a whole media file is ever copied into memory. Only media placed by a
+    shape with a position is extracted; e.g. a slide background image is left out.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        output_dir (str): The directory to save the extracted media files.
+        use_mmap (bool): Whether to memory-map the presentation file while reading it.
+
+    Returns:
+        Tuple[Dict[int, List[str]], Dict[int, List[Dict[str, float]]]]:
+            - A dictionary mapping slide numbers to lists of media file paths.
+            - A dictionary mapping slide numbers to lists of media position information (left, top, width, height).
+    """
+    try:
+        # Open the original PPTX file in place as a ZIP package
+        with open_package(pptx_file, use_mmap) as zip_ref:
+            media_paths = {}
+            media_positions = {}
+            media_index = build_media_index(zip_ref, positioned=True)
+            written = stream_media(zip_ref, file_sink(output_dir), media_index.keys())
+            for name, media_path in written.items():
+                for reference in media_index[name]:
+                    slide_num = reference["slide_num"]
+                    if slide_num not in media_paths:
+                        media_paths[slide_num] = []
+                        media_positions[slide_num] = []
+                    media_paths[slide_num].append(media_path)
+                    media_positions[slide_num].append(reference["position"])
+
+        return media_paths, media_positions
+    except Exception as e:
+        logger.error(f"An error occurred during PPTX to media conversion: {e}")
+        return {}, {}
+
+
+@timed("part1_v2.extract_slide_text_and_media")
+def extract_slide_text_and_media(pptx_file: str, output_dir: str, frame_size: Optional[Tuple[int, int]] = None,
+                                 request: Optional[ExtractionRequest] = None) -> Dict[int, Dict[str, Union[Tuple[List[str], Dict[str, Dict[str, float]]], List[Dict[str, float]]]]]:
+    """
+    Extract the text content, text coordinates, and media files (with their positions) from a PowerPoint presentation.
+
+    The presentation is parsed once by the extraction engine, so text, coordinates and media
+    positions all come from the same pass over the slides. This materializes the whole deck;
+    use `extraction_engine.iter_deck` to receive one slide record at a time instead, or
+    `extraction_engine.extract_records` to keep the compact `records.SlideRecord` form.
+
+    Given a frame size, each slide also gets a 'layout' key with the pixel positions, reading order,
+    text/media overlaps and bounding box computed for the whole deck at once by `layout.slide_layouts`.
+
+    Given a request, only the requested slides, text and media are extracted by `selective.extract_selected`,
+    which reads just the package entries they need and does not load python-pptx.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        output_dir (str): The directory to save the extracted media files.
+        frame_size (Optional[Tuple[int, int]]): The video frame width and height in pixels to lay the slides out for, or None to skip the layout.
+        request (Optional[ExtractionRequest]): The slides, text and media to extract, or None for everything.
+
+    Returns:
+        Dict[int, Dict[str, Union[Tuple[List[str], Dict[str, Dict[str, float]]], List[Dict[str, float]]]]]:
+            A dictionary mapping slide numbers to dictionaries containing the slide text, text coordinates, and media information.
+            The text information is a tuple of a list of text content and a dictionary of text coordinates.
+            The media information is a list of dictionaries, each with 'path' and 'position' keys.
+    """
+    try:
+        if request is not None:
+            records = extract_selected(pptx_file, request, output_dir)
+        else:
+            # python-pptx and NumPy are only imported by the functions that use them, so the text-only path starts fast
+            from .extraction_engine import extract_records
+
+            records = extract_records(pptx_file, output_dir)
+        if frame_size is not None:
+            from .layout import slide_layouts
+
+            with open_package(pptx_file) as zip_ref:
+                slide_size = read_slide_size(zip_ref)
+            layouts = slide_layouts(records, slide_size, frame_size)
+    except Exception as e:
+        logger.error(f"An error occurred during PPTX extraction: {e}")
+        return {}
+
+    paired_data = paired_data_from_records(records)
+    if frame_size is not None:
+        for slide_num, layout in layouts.items():
+            paired_data[slide_num]["layout"] = layout
+    return paired_data
+
+# Example usage
+if __name__ == "__main__":
+    pptx_file = "pictory.pptx"  # Path to your PowerPoint presentation file
+    output_dir = "output_media"  # Directory to save extracted media files
+    paired_data = extract_slide_text_and_media(pptx_file, output_dir)
+
+    for slide_num, data in paired_data.items():
+        print(f"Slide {slide_num}:")
+        print(f"Text:\n{', '.join(data['text'])}")
+        print("Media Info:")
+        for media_info in data["media_info"]:
+            print(f"- Path: {media_info['path']}")
+            print(f"  Position: Left={media_info['position']['left']}, Top={media_info['position']['top']}, Width={media_info['position']['width']}, Height={media_info['position']['height']}")
+        print("Text Coordinates:")
+        for text, coordinates in data["text_coordinates"].items():
+            print(f"- Text: {text}")
+            print(f"  Position: Left={coordinates['left']}, Top={coordinates['top']}, Width={coordinates['width']}, Height={coordinates['height']}")
+        print()
@@ -0,0 +1,257 @@
+import os
+import re
+import hashlib
+import shutil
+import string
+import logging
+import threading
+from .instrumentation import timed
+from .image_normalizer import HEADER_SIZE, ImageNormalizer, detect_image_format, image_extension
+from .media_index import read_slide_size
+from .media_store import MediaStore
+from .media_stream import open_package, spool_stream
+from .memory_budget import BUDGET
+from .pipeline import DEFAULT_QUEUE_DEPTH, run_pipeline
+from .s3_uploader import DEFAULT_WORKERS, S3Uploader
+from .slide_filter import SlideFilter, iter_slide_infos, min_words
+from .slide_xml import element_text_boxes
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Slides with fewer than two words are not converted
+DEFAULT_SLIDE_PREDICATES = (min_words(2),)
+
+def clean_text(text):
+    return re.sub(r'\W+', ' ', text).strip()
+
+def extract_text_from_slide(slide):
+    # Read the text runs from the slide's already parsed XML rather than through shape proxies
+    for text_box in element_text_boxes(slide._element, nested=False):
+        yield clean_text(text_box.text)
+
+def upload_images_to_s3(image_paths, bucket_name, folder_name, aws_access_key_id, aws_secret_access_key, max_workers=DEFAULT_WORKERS):
+    # Upload concurrently over one pooled client; each file gets a result instead of a log line
+    with S3Uploader(bucket_name, max_workers=max_workers, aws_access_key_id=aws_access_key_id, aws_secret_access_key=aws_secret_access_key) as uploader:
+        return uploader.upload_many((path, f"{folder_name}/{os.path.basename(path)}") for path in image_paths)
+
+def report_uploads(results):
+    # Log every failed upload with its error; a None result means the image was already uploaded
+    results = [result for result in results if result is not None]
+    failed = [result for result in results if not result["ok"]]
+    for result in failed:
+        logger.error(f"Failed to upload image {result['path']} to S3 as {result['key']}: {result['error']}")
+    logger.info(f"Image uploads: {len(results) - len(failed)} succeeded, {len(failed)} failed")
+
+@timed("part2.convert_pptx_to_images")
+def convert_pptx_to_images(pptx_file, bucket_name, folder_name, aws_access_key_id, aws_secret_access_key, pipelined=False, media_store=None, predicates=None,
+                           frame_size=None, temp_dir=None):
+    if pipelined:
+        return convert_pptx_to_images_pipelined(pptx_file, bucket_name, folder_name, aws_access_key_id, aws_secret_access_key, media_store=media_store, predicates=predicates,
+                                                frame_size=frame_size, temp_dir=temp_dir)
+
+    try:
+        # Use a deck-local media store in a temporary directory (./temp by default) unless a shared one is given
+        output_dir = temp_dir or os.path.join(os.getcwd(), "temp")
+        store = media_store if media_store is not None else MediaStore(output_dir, prefix=folder_name)
+        slide_filter = SlideFilter(predicates if predicates is not None else DEFAULT_SLIDE_PREDICATES)
+
+        # Initialize lists to store image entries, their target sizes and text content
+        image_entries = []
+        targets = []
+        text_content = []
+        added = {}
+
+        with open_package(pptx_file) as zip_ref:
+            slide_size = read_slide_size(zip_ref)
+            # Keep or skip each slide from its XML, relationships and ZIP directory entries alone,
+            # so the images of skipped slides are never decompressed, written or uploaded
+            for info in slide_filter.filter(iter_slide_infos(zip_ref)):
+                # Append text content of valid slide
+                text_content.extend(clean_text(text) for text in info.texts)
+
+                # Extract images from slide, reading each image part once and naming it after its real format
+                for name, box in zip(info.pictures, info.picture_boxes):
+                    if name not in added:
+                        with zip_ref.open(name) as stream:
+                            ext = image_extension(stream.peek(HEADER_SIZE), os.path.splitext(name)[1])
+                            added[name], _ = store.add_stream(stream, ext)
+                    image_entries.append(added[name])
+                    targets.append(box)
+        logger.info(f"Slide filter: {slide_filter.stats}")
+
+        with S3Uploader(bucket_name, aws_access_key_id=aws_access_key_id, aws_secret_access_key=aws_secret_access_key) as uploader:
+            if frame_size is None:
+                # Upload each unique image to S3 bucket once
+                uploads = [store.upload(uploader, entry) for entry in image_entries]
+            else:
+                # Convert each image once per size it is shown at, in parallel, and upload the renditions
+                with ImageNormalizer(os.path.join(store.local_dir, "renditions"), frame_size) as normalizer:
+                    items = {(entry["hash"], normalizer.target_size(box, slide_size)): entry["path"]
+                             for entry, box in zip(image_entries, targets)}
+                    # Images kept as they are share one rendition whatever their size
+                    renditions = list({rendition["name"]: rendition for rendition in normalizer.normalize_many(
+                        (path, target, digest) for (digest, target), path in items.items())}.values())
+                uploads = [uploader.submit(rendition["path"], f"{store.prefix}/{rendition['name']}", skip_existing=True)
+                           for rendition in renditions]
+                logger.info(f"Image renditions: {len(renditions)} for {len(added)} images")
+            report_uploads(future.result() for future in uploads if future is not None)
+        store.save()
+        logger.info(f"Media store: {store.stats}")
+
+        # Clean up temporary directory
+        if media_store is None:
+            if frame_size is not None:
+                # Also removes anything a failed conversion left behind
+                shutil.rmtree(os.path.join(output_dir, "renditions"), ignore_errors=True)
+            for entry in store.index.values():
+                os.remove(entry["path"])
+            os.rmdir(output_dir)
+
+        return text_content
+
+    except Exception as e:
+        logger.error(f"An error occurred during pptx to images conversion: {e}")
+        return []
+
+@timed("part2.convert_pptx_to_images_pipelined")
+def convert_pptx_to_images_pipelined(pptx_file, bucket_name, folder_name, aws_access_key_id, aws_secret_access_key,
+                                     queue_depth=DEFAULT_QUEUE_DEPTH, max_workers=DEFAULT_WORKERS, media_store=None, predicates=None,
+                                     frame_size=None, temp_dir=None):
+    try:
+        # Use a deck-local media store in a temporary directory (./temp by default) unless a shared one is given
+        output_dir = temp_dir or os.path.join(os.getcwd(), "temp")
+        store = media_store if media_store is not None else MediaStore(output_dir, prefix=folder_name)
+        slide_filter = SlideFilter(predicates if predicates is not None else DEFAULT_SLIDE_PREDICATES)
+        normalizer = ImageNormalizer(os.path.join(store.local_dir, "renditions"), frame_size) if frame_size is not None else None
+        text_content = []
+
+        # Stage 1: filter slides from their metadata and hand over the image parts of kept slides,
+        # once per size each image is shown at
+        def parse_slides():
+            seen = set()
+            slide_size = read_slide_size(zip_ref)
+            for info in slide_filter.filter(iter_slide_infos(zip_ref)):
+                text_content.extend(clean_text(text) for text in info.texts)
+                for name, box in zip(info.pictures, info.picture_boxes):
+                    item = (name, normalizer.target_size(box, slide_size) if normalizer is not None else None)
+                    if item not in seen:
+                        seen.add(item)
+                        yield item
+
+        # Stage 2: stream each image part into the media store, dropping duplicate content
+        def write_image(item):
+            name, _ = item
+            with media_zip.open(name) as stream:
+                entry, new = store.add_stream(stream, image_extension(stream.peek(HEADER_SIZE), os.path.splitext(name)[1]))
+            return entry if new else None
+
+        # Stage 2 when normalizing: read each image into memory and drop the ones whose rendition is already on its way;
+        # originals are not written, only their renditions. The bytes held until an image is converted are reserved
+        # from the memory budget first, so reading waits while the budget is spent, and images above the spool
+        # threshold are spooled to a temporary file in chunks instead
+        renditions = set()
+        reserved = [0]
+        reserved_lock = threading.Lock()
+
+        def release(source, size):
+            BUDGET.release(size)
+            with reserved_lock:
+                reserved[0] -= size
+            if not isinstance(source, bytes):
+                os.remove(source)
+
+        def read_image(item):
+            name, target = item
+            size = media_zip.getinfo(name).file_size
+            with media_zip.open(name) as stream:
+                header = stream.peek(HEADER_SIZE)[:HEADER_SIZE]
+                if BUDGET.should_spool(size):
+                    source, digest, _ = spool_stream(stream, store.local_dir)
+                    size = 0
+                else:
+                    BUDGET.acquire(size, "image")
+                    with reserved_lock:
+                        reserved[0] += size
+                    source = stream.read()
+                    digest = hashlib.sha256(source).hexdigest()
+            rendition_name = normalizer.rendition_name(digest, detect_image_format(header), target)
+            if rendition_name in renditions:
+                release(source, size)
+                return None
+            renditions.add(rendition_name)
+            return source, target, digest, size
+
+        # Stage 3 when normalizing: convert images in parallel
+        def normalize_image(item):
+            source, target, digest, size = item
+            try:
+                return normalizer.normalize(source, target, digest)
+            finally:
+                release(source, size)
+
+        # Last stage: upload each image and delete a deck-local copy as soon as it is uploaded
+        def upload_image(entry):
+            try:
+                future = store.upload(uploader, entry)
+                return future.result() if future is not None else None
+            finally:
+                if media_store is None:
+                    os.remove(entry["path"])
+
+        def upload_rendition(rendition):
+            try:
+                return uploader.upload_file(rendition["path"], f"{store.prefix}/{rendition['name']}", skip_existing=True)
+            finally:
+                if media_store is None:
+                    os.remove(rendition["path"])
+
+        if normalizer is None:
+            stages = [(write_image, 1), (upload_image, max_workers)]
+        else:
+            stages = [(read_image, 1), (normalize_image, normalizer.max_workers), (upload_rendition, max_workers)]
+
+        # At most queue_depth images wait between stages, so temporary disk usage does not grow with the deck.
+        # The first stage reads images from its own handle on the package while slides are still being filtered.
+        with S3Uploader(bucket_name, max_workers=max_workers, aws_access_key_id=aws_access_key_id, aws_secret_access_key=aws_secret_access_key) as uploader, \
+                open_package(pptx_file) as zip_ref, open_package(pptx_file) as media_zip:
+            try:
+                results = run_pipeline(parse_slides(), stages, queue_depth)
+            finally:
+                # Images dropped from the queues when a stage fails are never converted; give their bytes back
+                BUDGET.release(reserved[0])
+        logger.info(f"Slide filter: {slide_filter.stats}")
+        if normalizer is not None:
+            logger.info(f"Image renditions: {len(results)}")
+        report_uploads(results)
+        store.save()
+        logger.info(f"Media store: {store.stats}")
+
+        if media_store is None:
+            if normalizer is not None:
+                shutil.rmtree(normalizer.cache_dir, ignore_errors=True)
+            os.rmdir(output_dir)
+
+        return text_content
+
+    except Exception as e:
+        logger.error(f"An error occurred during pipelined pptx to images conversion: {e}")
+        return []
+
+# Example usage:
+if __name__ == "__main__":
+    pptx_file = "jpictory.pptx"  # Path to the PowerPoint file
+    bucket_name = "ppt2video"  # Name of the S3 bucket
+    folder_name = "proj_pd"  # Name of the folder in the S3 bucket
+    aws_access_key_id=""
+    aws_secret_access_key=""
+    aws_session_token=""
+
+
+    text_content = convert_pptx_to_images(pptx_file, bucket_name, folder_name, aws_access_key_id, aws_secret_access_key)
+
+    # Print text content of each slide properly with new lines
+    for i, text in enumerate(text_content):
+        logger.info(f"Slide {i+1} Text Content:")
+        logger.info(text)
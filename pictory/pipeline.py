@@ -0,0 +1,96 @@
+import queue
+import logging
+import threading
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_DEPTH = 8
+
+_DONE = object()
+
+
+def run_pipeline(source: Iterable[Any], stages: List[Tuple[Callable[[Any], Optional[Any]], int]], queue_depth: int = DEFAULT_QUEUE_DEPTH) -> List[Any]:
+    """
+    Run a producer/consumer pipeline whose stages are connected by bounded queues.
+
+    The source is iterated in its own thread and every stage runs in its own worker threads,
+    so all stages are busy at the same time. Each queue holds at most `queue_depth` items, which
+    bounds how far a fast stage can run ahead of a slow one. A stage returning None drops the item.
+
+    If a stage raises, the remaining items are drained without being processed and the first
+    exception is re-raised once every thread has stopped.
+
+    Args:
+        source (Iterable[Any]): Produces the items fed to the first stage.
+        stages (List[Tuple[Callable[[Any], Optional[Any]], int]]): (function, worker count) pairs, in order.
+        queue_depth (int): The maximum number of items waiting between two stages.
+
+    Returns:
+        List[Any]: The non-None results of the last stage, in completion order.
+    """
+    queues = [queue.Queue(maxsize=queue_depth) for _ in stages]
+    remaining = [workers for _, workers in stages]
+    lock = threading.Lock()
+    failed = threading.Event()
+    errors = []
+    results = []
+
+    def fail(e):
+        with lock:
+            errors.append(e)
+        failed.set()
+
+    def produce():
+        try:
+            for item in source:
+                if failed.is_set():
+                    break
+                queues[0].put(item)
+        except Exception as e:
+            fail(e)
+        finally:
+            for _ in range(stages[0][1]):
+                queues[0].put(_DONE)
+
+    def work(index):
+        func = stages[index][0]
+        while True:
+            item = queues[index].get()
+            if item is _DONE:
+                break
+            if failed.is_set():
+                continue
+            try:
+                result = func(item)
+            except Exception as e:
+                fail(e)
+                continue
+            if result is None:
+                continue
+            if index + 1 < len(stages):
+                queues[index + 1].put(result)
+            else:
+                with lock:
+                    results.append(result)
+
+        with lock:
+            remaining[index] -= 1
+            last = remaining[index] == 0
+        if last and index + 1 < len(stages):
+            for _ in range(stages[index + 1][1]):
+                queues[index + 1].put(_DONE)
+
+    threads = [threading.Thread(target=produce, name="pipeline-source", daemon=True)]
+    for index, (func, workers) in enumerate(stages):
+        for n in range(workers):
+            threads.append(threading.Thread(target=work, args=(index,), name=f"pipeline-{func.__name__}-{n}", daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    return results
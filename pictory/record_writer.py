@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, Optional, Set, Union
+
+from .instrumentation import count, span
+from .media_stream import open_package
+from .records import SlideRecord
+from .selective import ExtractionRequest, iter_selected
+from .slide_xml import iter_slide_text_boxes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# File extension -> output format
+FORMATS = {
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".msgpack": "msgpack",
+    ".mpk": "msgpack",
+}
+
+
+class RecordWriter(ABC):
+    """
+    Append records to a stream one at a time, flushing after each so readers can follow the file
+    while it is written. '-' writes to standard output, which is never closed. Subclasses implement
+    `_encode` for their format and set `binary` when it produces bytes.
+
+    Args:
+        path (str): The output file, or '-' for standard output.
+        append (bool): Whether to append to an existing file instead of truncating it.
+    """
+    binary = False
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.records_written = 0
+        if path == "-":
+            self._file = sys.stdout.buffer if self.binary else sys.stdout
+            self._owned = False
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._file = open(path, ("a" if append else "w") + ("b" if self.binary else ""))
+            self._owned = True
+
+    @abstractmethod
+    def _encode(self, record: Dict[str, Any]) -> Union[str, bytes]:
+        """Serialize one record in the writer's format."""
+
+    def write(self, record: Dict[str, Any]):
+        """
+        Append one record and flush it.
+
+        Args:
+            record (Dict[str, Any]): A JSON-ready dictionary; other values are written as strings.
+        """
+        self._file.write(self._encode(record))
+        self._file.flush()
+        self.records_written += 1
+        count("records_written")
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class NdjsonWriter(RecordWriter):
+    """Write one JSON document per line (newline-delimited JSON)."""
+
+    def _encode(self, record: Dict[str, Any]) -> str:
+        return json.dumps(record, default=str, separators=(",", ":")) + "\n"
+
+
+class MsgpackWriter(RecordWriter):
+    """Write concatenated MessagePack maps; needs the optional `msgpack` package."""
+    binary = True
+
+    def __init__(self, path: str, append: bool = False):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise ImportError("msgpack output needs the msgpack package: pip install 'pictory[msgpack]'") from e
+        self._packer = msgpack.Packer(default=str, use_bin_type=True)
+        super().__init__(path, append)
+
+    def _encode(self, record: Dict[str, Any]) -> bytes:
+        return self._packer.pack(record)
+
+
+WRITERS = {
+    "ndjson": NdjsonWriter,
+    "msgpack": MsgpackWriter,
+}
+
+
+def output_format(path: str, default: str = "ndjson") -> str:
+    """
+    Pick the output format from a file extension.
+
+    Args:
+        path (str): The output file.
+        default (str): The format used when the extension is not a key of `FORMATS`.
+
+    Returns:
+        str: A key of `WRITERS`.
+    """
+    return FORMATS.get(os.path.splitext(path)[1].lower(), default)
+
+
+def open_writer(path: str, fmt: Optional[str] = None, append: bool = False) -> RecordWriter:
+    """
+    Open a record writer.
+
+    Args:
+        path (str): The output file, or '-' for standard output.
+        fmt (Optional[str]): A key of `WRITERS`, or None to pick it from the extension.
+        append (bool): Whether to append to an existing file.
+
+    Returns:
+        RecordWriter: The writer.
+
+    Raises:
+        ValueError: If the format is unknown.
+        ImportError: If the format's optional dependency is not installed.
+    """
+    fmt = fmt or output_format(path)
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown output format '{fmt}', expected one of {sorted(WRITERS)}")
+    return WRITERS[fmt](path, append)
+
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Read the records of a file one at a time, including one that is still being written.
+
+    Args:
+        path (str): The file written by a `RecordWriter`.
+        fmt (Optional[str]): A key of `WRITERS`, or None to pick it from the extension.
+
+    Yields:
+        Dict[str, Any]: The records, in write order. A partly written last record is not yielded.
+    """
+    fmt = fmt or output_format(path)
+    if fmt == "msgpack":
+        import msgpack
+
+        with open(path, "rb") as f:
+            yield from msgpack.Unpacker(f, raw=False)
+        return
+    with open(path) as f:
+        for line in f:
+            if line.endswith("\n"):
+                yield json.loads(line)
+
+
+def write_deck(pptx_file: str, writer: RecordWriter, output_dir: Optional[str] = None, slide_nums: Optional[Set[int]] = None,
+               text_only: bool = False, nested: bool = False, request: Optional[ExtractionRequest] = None) -> int:
+    """
+    Stream the slide records of a deck to a writer as each slide is extracted.
+
+    Records are `SlideRecord.to_json_dict` output. Only the slide being written is held in memory, so
+    memory stays flat however long the deck is.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        writer (RecordWriter): The writer receiving one record per slide.
+        output_dir (Optional[str]): The directory to save the referenced media files, or None to skip writing.
+        slide_nums (Optional[Set[int]]): The slide numbers to write, or None for every slide.
+        text_only (bool): Whether to read only the slide XML, without python-pptx or media.
+        nested (bool): With `text_only`, whether to include group shapes and table cells.
+        request (Optional[ExtractionRequest]): The slides, text and media to write, read by `selective.iter_selected`;
+            takes the place of `slide_nums`, `text_only` and `nested`.
+
+    Returns:
+        int: The number of records written.
+    """
+    written = 0
+    with span("records.write_deck", deck=pptx_file) as fields:
+        if request is not None:
+            with open_package(pptx_file) as zip_ref:
+                for record in iter_selected(zip_ref, request, output_dir):
+                    writer.write(record.to_json_dict())
+                    written += 1
+        elif text_only:
+            with open_package(pptx_file) as zip_ref:
+                for slide_num, text_boxes in iter_slide_text_boxes(zip_ref, slide_nums, nested):
+                    writer.write(SlideRecord(slide_num, text_boxes, []).to_json_dict())
+                    written += 1
+        else:
+            # python-pptx is only imported when slides have to be parsed
+            from .extraction_engine import iter_records
+
+            for record in iter_records(pptx_file, output_dir, slide_nums):
+                writer.write(record.to_json_dict())
+                written += 1
+        fields["records"] = written
+    return written
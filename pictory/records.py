@@ -0,0 +1,140 @@
+import json
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Union
+
+# The video frame width and height in pixels that layouts and image renditions are sized for by default
+FRAME_SIZE = (1920, 1080)
+
+
+@dataclass
+class Box:
+    """A shape's position and size in EMU; any field is None when the shape does not define it."""
+    __slots__ = ("left", "top", "width", "height")
+    left: Optional[int]
+    top: Optional[int]
+    width: Optional[int]
+    height: Optional[int]
+
+    def to_dict(self) -> Dict[str, Optional[int]]:
+        return {"left": self.left, "top": self.top, "width": self.width, "height": self.height}
+
+
+@dataclass
+class TextBox:
+    """The text of one shape and where it sits; duplicate texts stay separate records."""
+    __slots__ = ("text", "box")
+    text: str
+    box: Box
+
+
+@dataclass
+class MediaRef:
+    """A media part placed by one shape; 'path' and 'key' are None until it is written or uploaded."""
+    __slots__ = ("partname", "kind", "box", "path", "key")
+    partname: str
+    kind: str
+    box: Box
+    path: Optional[str]
+    key: Optional[str]
+
+    @property
+    def position(self) -> Dict[str, Optional[int]]:
+        return self.box.to_dict()
+
+    def to_dict(self) -> Dict[str, Union[str, None, Dict[str, Optional[int]]]]:
+        return {"partname": self.partname, "kind": self.kind, "path": self.path, "key": self.key, "position": self.position}
+
+
+@dataclass
+class SlideRecord:
+    """The paired text and media of one slide."""
+    __slots__ = ("slide_num", "texts", "media")
+    slide_num: int
+    texts: List[TextBox]
+    media: List[MediaRef]
+
+    @property
+    def text(self) -> List[str]:
+        return [text_box.text for text_box in self.texts]
+
+    @property
+    def text_coordinates(self) -> Dict[str, Dict[str, Optional[int]]]:
+        """The legacy text-keyed coordinates; when texts repeat, the last shape wins."""
+        return {text_box.text: text_box.box.to_dict() for text_box in self.texts}
+
+    def to_dict(self) -> Dict[str, Union[List[str], Dict[str, Dict[str, Optional[int]]], List[Dict[str, Union[str, None, Dict[str, Optional[int]]]]]]]:
+        """
+        Convert to the nested-dict paired data returned by `extract_slide_text_and_media`.
+
+        Returns:
+            Dict[str, Union[...]]: A dictionary with 'text', 'text_coordinates' and 'media_info' keys.
+        """
+        return {
+            "text": self.text,
+            "text_coordinates": self.text_coordinates,
+            "media_info": [{"path": media.path, "position": media.position} for media in self.media]
+        }
+
+    def to_json_dict(self) -> Dict[str, Union[int, List[Dict[str, Union[str, None, Dict[str, Optional[int]]]]]]]:
+        """
+        Convert to a JSON-ready dictionary that keeps every text box, including duplicates.
+
+        Returns:
+            Dict[str, Union[...]]: A dictionary with 'slide_num', 'texts' (each with 'text' and 'position')
+                and 'media' keys.
+        """
+        return {
+            "slide_num": self.slide_num,
+            "texts": [{"text": text_box.text, "position": text_box.box.to_dict()} for text_box in self.texts],
+            "media": [media.to_dict() for media in self.media]
+        }
+
+
+def paired_data_from_records(records: Iterable[SlideRecord]) -> Dict[int, Dict]:
+    """
+    Adapt slide records to the nested-dict paired data existing consumers expect.
+
+    Args:
+        records (Iterable[SlideRecord]): The slide records.
+
+    Returns:
+        Dict[int, Dict]: A dictionary mapping slide numbers to `SlideRecord.to_dict` output.
+    """
+    return {record.slide_num: record.to_dict() for record in records}
+
+
+def deck_from_records(records: Iterable[SlideRecord]) -> Dict[int, Dict]:
+    """
+    Adapt slide records to the `extraction_engine.extract_deck` dictionary form.
+
+    Args:
+        records (Iterable[SlideRecord]): The slide records.
+
+    Returns:
+        Dict[int, Dict]: A dictionary mapping slide numbers to dictionaries with 'text', 'text_coordinates' and
+            'media' keys. Each media entry has 'partname', 'kind' and 'position' keys, plus 'path' when media was written.
+    """
+    deck = {}
+    for record in records:
+        media = []
+        for ref in record.media:
+            entry = {"partname": ref.partname, "kind": ref.kind, "position": ref.position}
+            if ref.path is not None:
+                entry["path"] = ref.path
+            media.append(entry)
+        deck[record.slide_num] = {"text": record.text, "text_coordinates": record.text_coordinates, "media": media}
+    return deck
+
+
+def records_to_json(records: Iterable[SlideRecord], **kwargs) -> str:
+    """
+    Serialize slide records to a JSON list of `SlideRecord.to_json_dict` output.
+
+    Args:
+        records (Iterable[SlideRecord]): The slide records.
+        **kwargs: Passed to `json.dumps`.
+
+    Returns:
+        str: The JSON document.
+    """
+    return json.dumps([record.to_json_dict() for record in records], **kwargs)
@@ -0,0 +1,255 @@
+import os
+import time
+import random
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .instrumentation import count, span
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 8
+DEFAULT_MULTIPART_THRESHOLD = 16 * 1024 * 1024
+DEFAULT_MULTIPART_CHUNKSIZE = 16 * 1024 * 1024
+
+# Error codes of a HEAD request for a missing object
+_MISSING_CODES = ("404", "NoSuchKey", "NotFound")
+
+# Clients kept by `enable_client_reuse`, keyed by their arguments; None while reuse is off
+_clients = None
+_clients_lock = threading.Lock()
+
+
+def enable_client_reuse():
+    """
+    Make `make_s3_client` keep every client it creates and return it again for the same arguments.
+
+    Meant for long-running worker processes: creating a client loads the S3 service model and opens a
+    new connection pool, which a warm worker should pay for once rather than once per deck.
+    """
+    global _clients
+    with _clients_lock:
+        if _clients is None:
+            _clients = {}
+
+
+def make_s3_client(aws_access_key_id: Optional[str] = None, aws_secret_access_key: Optional[str] = None,
+                   aws_session_token: Optional[str] = None, max_pool_connections: int = DEFAULT_WORKERS,
+                   endpoint_url: Optional[str] = None):
+    """
+    Create one S3 client whose connection pool is sized for concurrent uploads.
+
+    boto3 clients are thread-safe, so a single client is shared by every upload thread.
+    Empty credentials fall back to the default boto3 credential chain.
+
+    Args:
+        aws_access_key_id (Optional[str]): The AWS access key id.
+        aws_secret_access_key (Optional[str]): The AWS secret access key.
+        aws_session_token (Optional[str]): The AWS session token.
+        max_pool_connections (int): The number of pooled HTTP connections.
+        endpoint_url (Optional[str]): A custom endpoint, e.g. a local S3 stand-in.
+
+    Returns:
+        The boto3 S3 client.
+    """
+    # boto3 takes longer to import than the rest of the package; only pay for it when uploading
+    import boto3
+    from botocore.config import Config
+
+    key = (aws_access_key_id or None, aws_secret_access_key or None, aws_session_token or None, max_pool_connections, endpoint_url)
+    with _clients_lock:
+        if _clients is not None and key in _clients:
+            return _clients[key]
+        client = boto3.client(
+            's3',
+            aws_access_key_id=key[0],
+            aws_secret_access_key=key[1],
+            aws_session_token=key[2],
+            endpoint_url=endpoint_url,
+            config=Config(max_pool_connections=max_pool_connections)
+        )
+        if _clients is not None:
+            _clients[key] = client
+        return client
+
+
+class S3Uploader:
+    """
+    Upload files to an S3 bucket from a bounded thread pool sharing one pooled client.
+
+    Each upload is retried with exponential backoff and reported as a result dictionary with
+    'path', 'key', 'ok', 'skipped', 'attempts', 'bytes', 'seconds' and 'error' keys instead of
+    being logged and dropped; 'skipped' marks uploads left out because the object was already
+    present. Files larger than the multipart threshold are uploaded in parts.
+
+    Args:
+        bucket_name (str): The name of the S3 bucket.
+        s3: The S3 client to share, or None to create one with `make_s3_client`.
+        max_workers (int): The maximum number of files uploaded at once.
+        multipart_threshold (int): The file size in bytes from which multipart upload is used.
+        multipart_chunksize (int): The part size in bytes for multipart uploads.
+        multipart_concurrency (int): The number of parts of one file uploaded at once.
+        max_attempts (int): The number of attempts per file before reporting a failure.
+        backoff (float): The delay in seconds before the first retry; doubled on every further retry.
+        **client_kwargs: Passed to `make_s3_client` when no client is given.
+    """
+
+    def __init__(self, bucket_name: str, s3=None, max_workers: int = DEFAULT_WORKERS,
+                 multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+                 multipart_chunksize: int = DEFAULT_MULTIPART_CHUNKSIZE, multipart_concurrency: int = 4,
+                 max_attempts: int = 3, backoff: float = 0.5, **client_kwargs):
+        self.bucket_name = bucket_name
+        from boto3.s3.transfer import TransferConfig
+
+        self.s3 = s3 if s3 is not None else make_s3_client(max_pool_connections=max_workers * multipart_concurrency, **client_kwargs)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=multipart_concurrency
+        )
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-upload")
+        self._lock = threading.Lock()
+        # Only uploads still running are kept, so a long-lived uploader does not accumulate results
+        self._pending = set()
+
+    def exists(self, key: str) -> bool:
+        """
+        Check with a HEAD request whether an object is already present in the bucket.
+
+        Args:
+            key (str): The S3 key to check.
+
+        Returns:
+            bool: True if the object exists, False if S3 answers that it does not.
+
+        Raises:
+            Exception: The client's error when the check itself failed, e.g. denied access or a network error.
+        """
+        with span("s3.head", key=key):
+            try:
+                self.s3.head_object(Bucket=self.bucket_name, Key=key)
+                return True
+            except Exception as e:
+                # botocore's ClientError carries the S3 error code; anything else is not an answer
+                if getattr(e, "response", {}).get("Error", {}).get("Code") in _MISSING_CODES:
+                    return False
+                raise
+
+    def upload_file(self, path: str, key: str, skip_existing: bool = False) -> Dict[str, Union[str, bool, int, float, None]]:
+        """
+        Upload one file in the calling thread, retrying with exponential backoff.
+
+        Args:
+            path (str): The path of the local file.
+            key (str): The S3 key to upload to.
+            skip_existing (bool): Whether to skip the upload when the key is already present in the bucket.
+
+        Returns:
+            Dict[str, Union[str, bool, int, float, None]]: The upload result.
+        """
+        start = time.perf_counter()
+        present = False
+        if skip_existing:
+            try:
+                present = self.exists(key)
+            except Exception as e:
+                count("head_failures", key=key)
+                logger.warning(f"Could not check whether s3://{self.bucket_name}/{key} exists, uploading it: {e}")
+        if present:
+            count("uploads_skipped", key=key)
+            return {"path": path, "key": key, "ok": True, "skipped": True, "attempts": 0, "bytes": 0,
+                    "seconds": time.perf_counter() - start, "error": None}
+
+        error = None
+        attempt = 0
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                with span("s3.upload", key=key, attempt=attempt):
+                    self.s3.upload_file(path, self.bucket_name, key, Config=self.transfer_config)
+                error = None
+                break
+            except Exception as e:
+                error = str(e)
+                if attempt < self.max_attempts:
+                    count("upload_retries", key=key)
+                    delay = self.backoff * (2 ** (attempt - 1))
+                    logger.warning(f"Upload of {path} to s3://{self.bucket_name}/{key} failed (attempt {attempt}), retrying in {delay:.2f}s: {e}")
+                    time.sleep(delay * random.uniform(0.5, 1.5))
+
+        result = {
+            "path": path,
+            "key": key,
+            "ok": error is None,
+            "skipped": False,
+            "attempts": attempt,
+            "bytes": os.path.getsize(path) if error is None else 0,
+            "seconds": time.perf_counter() - start,
+            "error": error
+        }
+        if error is not None:
+            count("upload_failures", key=key)
+            logger.error(f"Failed to upload {path} to s3://{self.bucket_name}/{key} after {attempt} attempts: {error}")
+        else:
+            count("uploads", key=key)
+            count("bytes_uploaded", result["bytes"], key=key)
+        return result
+
+    def submit(self, path: str, key: str, skip_existing: bool = False) -> Future:
+        """
+        Queue one file for upload on the thread pool.
+
+        Args:
+            path (str): The path of the local file.
+            key (str): The S3 key to upload to.
+            skip_existing (bool): Whether to skip the upload when the key is already present in the bucket.
+
+        Returns:
+            Future: A future resolving to the upload result.
+        """
+        future = self._executor.submit(self.upload_file, path, key, skip_existing)
+        with self._lock:
+            self._pending.add(future)
+        # Runs at once if the upload already finished
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def upload_many(self, items: Iterable[Tuple[str, str]]) -> List[Dict[str, Union[str, bool, int, float, None]]]:
+        """
+        Upload (path, key) pairs concurrently and wait for all of them.
+
+        Args:
+            items (Iterable[Tuple[str, str]]): The local paths and S3 keys to upload.
+
+        Returns:
+            List[Dict[str, Union[str, bool, int, float, None]]]: The upload results, in input order.
+        """
+        futures = [self.submit(path, key) for path, key in items]
+        return [future.result() for future in futures]
+
+    def wait(self):
+        """
+        Wait for every upload submitted so far to finish.
+
+        Results are not kept by the uploader; use the futures returned by `submit` to read them.
+        """
+        with self._lock:
+            pending = list(self._pending)
+        wait_futures(pending)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
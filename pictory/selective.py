@@ -0,0 +1,157 @@
+import zipfile
+import logging
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Set, Tuple
+from lxml import etree
+
+from .instrumentation import count, span
+from .media_index import MEDIA_PREFIX, read_content_types, read_relationships, slide_media_references, slide_part_names
+from .media_stream import file_sink, open_package, stream_entry
+from .records import Box, MediaRef, SlideRecord
+from .slide_xml import element_text_boxes, slide_placeholder_boxes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExtractionRequest:
+    """
+    What to extract from a deck; the defaults ask for everything.
+
+    Attributes:
+        slides (Optional[Set[int]]): The slide numbers to extract, or None for every slide.
+        text (bool): Whether to extract the text boxes.
+        media (bool): Whether to extract the media.
+        media_types (Tuple[str, ...]): Content type prefixes of the media to keep, e.g. ('video/', 'image/png');
+            empty to keep every type.
+        max_media_size (Optional[int]): The largest media file to keep, in uncompressed bytes, or None for no limit.
+        nested (bool): Whether to include the text of shapes inside group shapes and table cells.
+    """
+    slides: Optional[Set[int]] = None
+    text: bool = True
+    media: bool = True
+    media_types: Tuple[str, ...] = ()
+    max_media_size: Optional[int] = None
+    nested: bool = False
+
+    def wants_media(self, content_type: Optional[str], size: int) -> bool:
+        """Whether a media file of this content type and uncompressed size is requested."""
+        if not self.media:
+            return False
+        if self.media_types and (content_type is None or not content_type.startswith(tuple(self.media_types))):
+            return False
+        return self.max_media_size is None or size <= self.max_media_size
+
+
+def slide_numbers(spec: str) -> Set[int]:
+    """
+    Parse a slide selection such as '1-5,8'.
+
+    Args:
+        spec (str): Comma-separated slide numbers and inclusive ranges.
+
+    Returns:
+        Set[int]: The selected slide numbers.
+
+    Raises:
+        ValueError: If a part is not a number or a range of numbers, a number is below 1, or a range is reversed.
+    """
+    slides = set()
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        first, _, last = part.partition("-")
+        first, last = int(first), int(last or first)
+        if first < 1:
+            raise ValueError(f"Slide numbers start at 1: '{part}'")
+        if last < first:
+            raise ValueError(f"Reversed slide range: '{part}'")
+        slides.update(range(first, last + 1))
+    return slides
+
+
+def _media_kind(content_type: Optional[str]) -> str:
+    if content_type is not None and content_type.startswith(("video/", "audio/")):
+        return content_type.split("/", 1)[0]
+    return "image"
+
+
+def iter_selected(zip_ref: zipfile.ZipFile, request: ExtractionRequest, output_dir: Optional[str] = None) -> Iterator[SlideRecord]:
+    """
+    Yield the slide records a request asks for, reading only the package entries it needs.
+
+    The presentation part and '[Content_Types].xml' are read once. Slides outside the request are
+    skipped before their XML is read, and media is selected by content type and size from the ZIP
+    directory, so only the requested media is ever decompressed, and only when `output_dir` is given.
+    The XML of a requested slide is read once for both its text and its media shapes, unless neither
+    is wanted. python-pptx is not used: text positions follow the same placeholder inheritance as
+    `slide_xml`, and media positions are read from each shape's own transform.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+        request (ExtractionRequest): What to extract.
+        output_dir (Optional[str]): The directory to write the requested media to, each file once, before the
+            first record referencing it is yielded; None to leave every media payload unread.
+
+    Yields:
+        SlideRecord: The requested slides in order, with empty `texts` or `media` where not requested.
+    """
+    content_types = read_content_types(zip_ref) if request.media else {}
+    sink = file_sink(output_dir) if output_dir is not None else None
+    layouts = {}
+    written = {}
+    skipped = set()
+    for slide_num, slide_part in enumerate(slide_part_names(zip_ref), start=1):
+        if request.slides is not None and slide_num not in request.slides:
+            continue
+        with span("slide.select", slide_num=slide_num):
+            relationships = read_relationships(zip_ref, slide_part)
+            media_rels = {}
+            for r_id, rel in relationships.items():
+                if not request.media or rel["external"] or not rel["target"].startswith(MEDIA_PREFIX):
+                    continue
+                try:
+                    size = zip_ref.getinfo(rel["target"]).file_size
+                except KeyError:
+                    continue
+                if request.wants_media(content_types.get(rel["target"]), size):
+                    media_rels[r_id] = rel["target"]
+                elif rel["target"] not in skipped:
+                    skipped.add(rel["target"])
+                    count("media_skipped")
+                    count("media_bytes_skipped", size)
+
+            texts = []
+            media = []
+            if request.text or media_rels:
+                root = etree.fromstring(zip_ref.read(slide_part))
+                if request.text:
+                    texts = list(element_text_boxes(root, slide_placeholder_boxes(zip_ref, relationships, layouts), request.nested))
+                for target, reference in slide_media_references(root, media_rels, slide_num):
+                    # Like the python-pptx engine, only media placed by a shape is reported
+                    if reference["shape_id"] is None:
+                        continue
+                    position = reference["position"]
+                    ref = MediaRef("/" + target, _media_kind(content_types.get(target)),
+                                   Box(**position) if position is not None else Box(None, None, None, None), None, None)
+                    if sink is not None:
+                        if target not in written:
+                            written[target] = stream_entry(zip_ref, zip_ref.getinfo(target), sink)
+                        ref.path = written[target]
+                    media.append(ref)
+        yield SlideRecord(slide_num, texts, media)
+
+
+def extract_selected(pptx_file: str, request: ExtractionRequest, output_dir: Optional[str] = None) -> List[SlideRecord]:
+    """
+    Extract the slide records a request asks for; this materializes `iter_selected`.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        request (ExtractionRequest): What to extract.
+        output_dir (Optional[str]): The directory to write the requested media to, or None to skip writing.
+
+    Returns:
+        List[SlideRecord]: The requested slides, in slide order.
+    """
+    with open_package(pptx_file) as zip_ref:
+        return list(iter_selected(zip_ref, request, output_dir))
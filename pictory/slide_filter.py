@@ -0,0 +1,206 @@
+import re
+import logging
+import zipfile
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+from lxml import etree
+
+from .instrumentation import count, span
+from .media_index import MEDIA_PREFIX, NSMAP, read_content_types, read_relationships, shape_position, slide_part_names
+from .records import Box
+from .slide_xml import element_text_boxes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+# The image of every top-level picture shape python-pptx reports as MSO_SHAPE_TYPE.PICTURE,
+# i.e. leaving out placeholder pictures and movie poster frames
+_PICTURE_XPATH = "p:cSld/p:spTree/p:pic[not(p:nvPicPr/p:nvPr/p:ph)][not(p:nvPicPr/p:nvPr/a:videoFile)]"
+
+
+@dataclass
+class MediaInfo:
+    """A media part referenced by a slide, as listed in the ZIP directory."""
+    __slots__ = ("name", "content_type", "size")
+    name: str
+    content_type: Optional[str]
+    size: int
+
+
+@dataclass
+class SlideInfo:
+    """
+    Cheap metadata of one slide, read from its XML, its relationships and the ZIP directory.
+
+    No media is decompressed to build it. 'texts' are the stripped texts of the top-level shapes,
+    'media' every media part the slide references, 'pictures' the ZIP member names of the images
+    of its picture shapes in shape order, and 'picture_boxes' the positions of those shapes.
+    """
+    __slots__ = ("slide_num", "part_name", "hidden", "texts", "media", "pictures", "picture_boxes")
+    slide_num: int
+    part_name: str
+    hidden: bool
+    texts: List[str]
+    media: List[MediaInfo]
+    pictures: List[str]
+    picture_boxes: List[Box]
+
+    @property
+    def word_count(self) -> int:
+        return sum(len(_WORD.findall(text)) for text in self.texts)
+
+
+def iter_slide_infos(zip_ref: zipfile.ZipFile) -> Iterator[SlideInfo]:
+    """
+    Yield the metadata of every slide of an open package, in presentation order.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+
+    Yields:
+        SlideInfo: The slide's metadata.
+    """
+    content_types = read_content_types(zip_ref)
+    for slide_num, slide_part in enumerate(slide_part_names(zip_ref), start=1):
+        with span("slide.metadata", slide_num=slide_num):
+            root = etree.fromstring(zip_ref.read(slide_part))
+            relationships = read_relationships(zip_ref, slide_part)
+
+            media = []
+            for rel in relationships.values():
+                if rel["external"] or not rel["target"].startswith(MEDIA_PREFIX):
+                    continue
+                try:
+                    size = zip_ref.getinfo(rel["target"]).file_size
+                except KeyError:
+                    continue
+                if all(media_info.name != rel["target"] for media_info in media):
+                    media.append(MediaInfo(rel["target"], content_types.get(rel["target"]), size))
+
+            pictures = []
+            picture_boxes = []
+            for pic in root.xpath(_PICTURE_XPATH, namespaces=NSMAP):
+                blip = pic.find("p:blipFill/a:blip", NSMAP)
+                rel = relationships.get(blip.get("{%s}embed" % NSMAP["r"])) if blip is not None else None
+                if rel is not None and not rel["external"]:
+                    position = shape_position(pic)
+                    pictures.append(rel["target"])
+                    picture_boxes.append(Box(**position) if position is not None else Box(None, None, None, None))
+
+            info = SlideInfo(
+                slide_num,
+                slide_part,
+                root.get("show") in ("0", "false"),
+                [text_box.text for text_box in element_text_boxes(root, nested=False)],
+                media,
+                pictures,
+                picture_boxes
+            )
+        yield info
+
+
+def min_words(count: int = 2) -> Callable[[SlideInfo], bool]:
+    """Keep slides whose text has at least `count` words."""
+    def predicate(info: SlideInfo) -> bool:
+        return info.word_count >= count
+    predicate.__name__ = f"min_words({count})"
+    return predicate
+
+
+def slide_range(first: Optional[int] = None, last: Optional[int] = None) -> Callable[[SlideInfo], bool]:
+    """Keep slides numbered from `first` to `last`, both inclusive; None leaves that end open."""
+    def predicate(info: SlideInfo) -> bool:
+        return (first is None or info.slide_num >= first) and (last is None or info.slide_num <= last)
+    predicate.__name__ = f"slide_range({first}, {last})"
+    return predicate
+
+
+def not_hidden() -> Callable[[SlideInfo], bool]:
+    """Keep slides that are not hidden in the slide show."""
+    def predicate(info: SlideInfo) -> bool:
+        return not info.hidden
+    predicate.__name__ = "not_hidden()"
+    return predicate
+
+
+def has_media_type(*content_types: str) -> Callable[[SlideInfo], bool]:
+    """Keep slides referencing media whose content type starts with one of `content_types`, e.g. 'image/'."""
+    def predicate(info: SlideInfo) -> bool:
+        return any(media.content_type is not None and media.content_type.startswith(content_types) for media in info.media)
+    predicate.__name__ = f"has_media_type({', '.join(map(repr, content_types))})"
+    return predicate
+
+
+def no_media_type(*content_types: str) -> Callable[[SlideInfo], bool]:
+    """Keep slides referencing no media whose content type starts with one of `content_types`, e.g. 'video/'."""
+    def predicate(info: SlideInfo) -> bool:
+        return not any(media.content_type is not None and media.content_type.startswith(content_types) for media in info.media)
+    predicate.__name__ = f"no_media_type({', '.join(map(repr, content_types))})"
+    return predicate
+
+
+class SlideFilter:
+    """
+    Decide from slide metadata alone which slides go on to media extraction.
+
+    Predicates are evaluated in order and the first one rejecting a slide is recorded, so cheap
+    predicates should come first. The media of rejected slides is never decompressed, written or
+    uploaded by the caller.
+
+    Counters in `stats`: 'slides_seen', 'slides_kept', 'slides_skipped', 'skipped_by' (rejections per
+    predicate name), and 'media_skipped' / 'bytes_skipped' for the media parts referenced only by
+    skipped slides.
+
+    Args:
+        predicates (Optional[Iterable[Callable[[SlideInfo], bool]]]): Functions returning True for
+            slides to keep; None keeps every slide.
+    """
+
+    def __init__(self, predicates: Optional[Iterable[Callable[[SlideInfo], bool]]] = None):
+        self.predicates = list(predicates) if predicates is not None else []
+        self.slides_seen = 0
+        self.skipped_by = {}
+        self._kept_media = set()
+        self._skipped_media = {}
+
+    def accepts(self, info: SlideInfo) -> bool:
+        self.slides_seen += 1
+        for predicate in self.predicates:
+            if not predicate(info):
+                name = getattr(predicate, "__name__", repr(predicate))
+                self.skipped_by[name] = self.skipped_by.get(name, 0) + 1
+                for media in info.media:
+                    self._skipped_media[media.name] = media.size
+                count("slides_skipped", slide_num=info.slide_num, predicate=name)
+                return False
+        self._kept_media.update(media.name for media in info.media)
+        count("slides_kept", slide_num=info.slide_num)
+        return True
+
+    def filter(self, infos: Iterable[SlideInfo]) -> Iterator[SlideInfo]:
+        """
+        Yield the slides every predicate accepts, updating the counters as slides are consumed.
+
+        Args:
+            infos (Iterable[SlideInfo]): The slide metadata, e.g. from `iter_slide_infos`.
+
+        Yields:
+            SlideInfo: The kept slides, in input order.
+        """
+        for info in infos:
+            if self.accepts(info):
+                yield info
+
+    @property
+    def stats(self) -> Dict[str, Union[int, Dict[str, int]]]:
+        skipped_media = {name: size for name, size in self._skipped_media.items() if name not in self._kept_media}
+        slides_skipped = sum(self.skipped_by.values())
+        return {
+            "slides_seen": self.slides_seen,
+            "slides_kept": self.slides_seen - slides_skipped,
+            "slides_skipped": slides_skipped,
+            "skipped_by": dict(self.skipped_by),
+            "media_skipped": len(skipped_media),
+            "bytes_skipped": sum(skipped_media.values())
+        }
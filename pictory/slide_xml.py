@@ -0,0 +1,328 @@
+import logging
+import zipfile
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from lxml import etree
+
+from .instrumentation import span
+from .media_index import NSMAP, read_relationships, slide_part_names
+from .records import Box, TextBox
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_A = "{%s}" % NSMAP["a"]
+_P = "{%s}" % NSMAP["p"]
+_SHAPE_TREE = _P + "spTree"
+_GROUP = _P + "grpSp"
+_GROUP_PROPERTIES = _P + "grpSpPr"
+_SHAPE = _P + "sp"
+_FRAME = _P + "graphicFrame"
+# Elements iterparse reports; pictures and connectors are listed only so they can be cleared
+_TAGS = (_GROUP, _GROUP_PROPERTIES, _SHAPE, _FRAME, _P + "pic", _P + "cxnSp")
+_CONTAINERS = (_SHAPE_TREE, _GROUP)
+_LAYOUT_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout"
+_MASTER_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideMaster"
+
+# The master placeholder type a layout placeholder inherits its geometry from, as in python-pptx
+_BASE_PLACEHOLDER_TYPE = {
+    "body": "body", "chart": "body", "clipArt": "body", "ctrTitle": "title", "dgm": "body", "dt": "dt",
+    "ftr": "ftr", "media": "body", "obj": "body", "pic": "body", "sldNum": "sldNum", "subTitle": "body",
+    "tbl": "body", "title": "title",
+}
+
+# (scale_x, scale_y, offset_x, offset_y) mapping a group's child coordinates to slide coordinates
+_IDENTITY = (1.0, 1.0, 0.0, 0.0)
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+def _own_box(shape) -> Box:
+    xfrm = shape.find("p:spPr/a:xfrm", NSMAP)
+    if xfrm is None:
+        xfrm = shape.find("p:xfrm", NSMAP)
+    off = xfrm.find("a:off", NSMAP) if xfrm is not None else None
+    ext = xfrm.find("a:ext", NSMAP) if xfrm is not None else None
+    return Box(
+        _int(off.get("x")) if off is not None else None,
+        _int(off.get("y")) if off is not None else None,
+        _int(ext.get("cx")) if ext is not None else None,
+        _int(ext.get("cy")) if ext is not None else None
+    )
+
+
+def _inherit(box: Box, base: Optional[Box]) -> Box:
+    if base is None:
+        return box
+    return Box(
+        box.left if box.left is not None else base.left,
+        box.top if box.top is not None else base.top,
+        box.width if box.width is not None else base.width,
+        box.height if box.height is not None else base.height
+    )
+
+
+def _transform(transform: Tuple[float, float, float, float], box: Box) -> Box:
+    if transform == _IDENTITY:
+        return box
+    scale_x, scale_y, offset_x, offset_y = transform
+    return Box(
+        round(box.left * scale_x + offset_x) if box.left is not None else None,
+        round(box.top * scale_y + offset_y) if box.top is not None else None,
+        round(box.width * scale_x) if box.width is not None else None,
+        round(box.height * scale_y) if box.height is not None else None
+    )
+
+
+def _group_transform(parent: Tuple[float, float, float, float], group_properties) -> Tuple[float, float, float, float]:
+    xfrm = group_properties.find("a:xfrm", NSMAP)
+    if xfrm is None:
+        return parent
+    off, ext = xfrm.find("a:off", NSMAP), xfrm.find("a:ext", NSMAP)
+    ch_off, ch_ext = xfrm.find("a:chOff", NSMAP), xfrm.find("a:chExt", NSMAP)
+    if off is None or ext is None or ch_off is None or ch_ext is None:
+        return parent
+    ch_cx, ch_cy = int(ch_ext.get("cx")), int(ch_ext.get("cy"))
+    scale_x = int(ext.get("cx")) / ch_cx if ch_cx else 1.0
+    scale_y = int(ext.get("cy")) / ch_cy if ch_cy else 1.0
+    # Child space -> group frame, then group frame -> whatever the parent group maps it to
+    local = (scale_x, scale_y, int(off.get("x")) - int(ch_off.get("x")) * scale_x, int(off.get("y")) - int(ch_off.get("y")) * scale_y)
+    parent_scale_x, parent_scale_y, parent_x, parent_y = parent
+    return (
+        local[0] * parent_scale_x,
+        local[1] * parent_scale_y,
+        local[2] * parent_scale_x + parent_x,
+        local[3] * parent_scale_y + parent_y
+    )
+
+
+def _paragraph_text(paragraph) -> str:
+    # Same rules as python-pptx: runs and fields contribute their a:t text, a:br a vertical tab
+    parts = []
+    for child in paragraph:
+        if child.tag == _A + "r" or child.tag == _A + "fld":
+            t = child.find("a:t", NSMAP)
+            if t is not None and t.text:
+                parts.append(t.text)
+        elif child.tag == _A + "br":
+            parts.append("\v")
+    return "".join(parts)
+
+
+def _body_text(tx_body) -> str:
+    return "\n".join(_paragraph_text(paragraph) for paragraph in tx_body.iterfind("a:p", NSMAP)).strip()
+
+
+def _table_text_boxes(frame, frame_box: Box) -> Iterator[TextBox]:
+    table = frame.find("a:graphic/a:graphicData/a:tbl", NSMAP)
+    if table is None or frame_box.left is None or frame_box.top is None:
+        return
+    columns = [int(column.get("w", 0)) for column in table.iterfind("a:tblGrid/a:gridCol", NSMAP)]
+    rows = table.findall("a:tr", NSMAP)
+    heights = [int(row.get("h", 0)) for row in rows]
+    top = frame_box.top
+    for row_num, row in enumerate(rows):
+        left = frame_box.left
+        col_num = 0
+        for cell in row.iterfind("a:tc", NSMAP):
+            col_span = int(cell.get("gridSpan", 1))
+            row_span = int(cell.get("rowSpan", 1))
+            width = sum(columns[col_num:col_num + col_span])
+            # Cells covered by a merge carry no text of their own
+            if cell.get("hMerge") not in ("1", "true") and cell.get("vMerge") not in ("1", "true"):
+                tx_body = cell.find("a:txBody", NSMAP)
+                text = _body_text(tx_body) if tx_body is not None else ""
+                if text:
+                    yield TextBox(text, Box(left, top, width, sum(heights[row_num:row_num + row_span])))
+            left += columns[col_num] if col_num < len(columns) else 0
+            col_num += 1
+        top += heights[row_num]
+
+
+def _text_boxes(events: Iterable[Tuple[str, etree._Element]], placeholder_boxes: Optional[Dict[int, Box]],
+                nested: bool, clear: bool) -> Iterator[TextBox]:
+    # One entry per open p:grpSp: its transform, or None when the group is not part of the shape tree
+    # python-pptx sees (e.g. it sits in an mc:AlternateContent block)
+    groups = []
+    for event, element in events:
+        tag = element.tag
+        if event == "start":
+            if tag == _GROUP:
+                parent_tag = element.getparent().tag
+                valid = parent_tag == _SHAPE_TREE or (parent_tag == _GROUP and groups and groups[-1] is not None)
+                groups.append((groups[-1] if groups else _IDENTITY) if valid else None)
+            continue
+
+        if tag == _GROUP_PROPERTIES:
+            if element.getparent().tag == _GROUP and groups[-1] is not None:
+                groups[-1] = _group_transform(groups[-2] if len(groups) > 1 else _IDENTITY, element)
+            continue
+        if tag == _GROUP:
+            groups.pop()
+        elif element.getparent().tag in _CONTAINERS:
+            in_group = element.getparent().tag == _GROUP
+            transform = groups[-1] if in_group else _IDENTITY
+            if transform is not None and (nested or not in_group):
+                if tag == _SHAPE:
+                    tx_body = element.find("p:txBody", NSMAP)
+                    text = _body_text(tx_body) if tx_body is not None else ""
+                    if text:
+                        box = _own_box(element)
+                        ph = element.find("p:nvSpPr/p:nvPr/p:ph", NSMAP)
+                        if ph is not None and placeholder_boxes is not None:
+                            box = _inherit(box, placeholder_boxes.get(int(ph.get("idx", 0))))
+                        yield TextBox(text, _transform(transform, box))
+                elif tag == _FRAME and nested:
+                    for text_box in _table_text_boxes(element, _own_box(element)):
+                        yield TextBox(text_box.text, _transform(transform, text_box.box))
+
+        if clear and tag != _GROUP_PROPERTIES:
+            # Drop finished shapes so memory stays flat however many shapes the slide has
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+
+def parse_text_boxes(stream: BinaryIO, placeholder_boxes: Optional[Dict[int, Box]] = None, nested: bool = True) -> Iterator[TextBox]:
+    """
+    Stream the text boxes of one slide straight from its XML with lxml iterparse.
+
+    No python-pptx shape proxies are built: each shape's text runs and transform are read
+    from its element as soon as the element is complete, and finished shapes are freed.
+
+    Args:
+        stream (BinaryIO): The slide XML, e.g. an open 'ppt/slides/slideN.xml' ZIP entry.
+        placeholder_boxes (Optional[Dict[int, Box]]): The inherited geometry of the slide layout's
+            placeholders by idx, used for placeholders that do not position themselves.
+        nested (bool): Whether to include shapes inside group shapes and table cells. When False,
+            only the top-level shapes python-pptx iterates in `slide.shapes` are read.
+
+    Yields:
+        TextBox: The non-empty, stripped text of each shape in document order, with its position
+            in slide coordinates.
+    """
+    events = etree.iterparse(stream, events=("start", "end"), tag=_TAGS, remove_blank_text=True)
+    yield from _text_boxes(events, placeholder_boxes, nested, clear=True)
+
+
+def element_text_boxes(element, placeholder_boxes: Optional[Dict[int, Box]] = None, nested: bool = True) -> Iterator[TextBox]:
+    """
+    Walk the text boxes of an already parsed slide element, e.g. `slide._element` of a python-pptx slide.
+
+    Args:
+        element: The lxml element of the slide (p:sld).
+        placeholder_boxes (Optional[Dict[int, Box]]): As for `parse_text_boxes`.
+        nested (bool): As for `parse_text_boxes`.
+
+    Yields:
+        TextBox: The non-empty, stripped text of each shape, with its position.
+    """
+    events = etree.iterwalk(element, events=("start", "end"), tag=_TAGS)
+    yield from _text_boxes(events, placeholder_boxes, nested, clear=False)
+
+
+def _placeholders(zip_ref: zipfile.ZipFile, part_name: str) -> Iterator[Tuple[str, int, Box]]:
+    root = etree.fromstring(zip_ref.read(part_name))
+    for shape in root.iterfind("p:cSld/p:spTree/*", NSMAP):
+        ph = shape.find("*/p:nvPr/p:ph", NSMAP)
+        if ph is not None:
+            yield ph.get("type", "obj"), int(ph.get("idx", 0)), _own_box(shape)
+
+
+def layout_placeholder_boxes(zip_ref: zipfile.ZipFile, layout_part: str, cache: Optional[Dict[str, Dict]] = None) -> Dict[int, Box]:
+    """
+    Resolve the geometry slide placeholders inherit from a slide layout.
+
+    A layout placeholder positions itself or inherits from the slide master placeholder of its base
+    type, following the same rules as python-pptx.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+        layout_part (str): The ZIP member name of the slide layout.
+        cache (Optional[Dict[str, Dict]]): Resolved layouts and masters, shared across slides.
+
+    Returns:
+        Dict[int, Box]: The geometry of each layout placeholder by idx.
+    """
+    cache = cache if cache is not None else {}
+    if layout_part in cache:
+        return cache[layout_part]
+
+    master = {}
+    for rel in read_relationships(zip_ref, layout_part).values():
+        if rel["type"] == _MASTER_REL_TYPE and not rel["external"]:
+            if rel["target"] not in cache:
+                master_boxes = {}
+                for ph_type, _, box in _placeholders(zip_ref, rel["target"]):
+                    master_boxes.setdefault(ph_type, box)
+                cache[rel["target"]] = master_boxes
+            master = cache[rel["target"]]
+            break
+
+    boxes = {}
+    for ph_type, idx, box in _placeholders(zip_ref, layout_part):
+        if idx not in boxes:
+            boxes[idx] = _inherit(box, master.get(_BASE_PLACEHOLDER_TYPE.get(ph_type)))
+    cache[layout_part] = boxes
+    return boxes
+
+
+def slide_placeholder_boxes(zip_ref: zipfile.ZipFile, relationships: Dict[str, Dict[str, Union[str, bool]]],
+                            cache: Optional[Dict[str, Dict]] = None) -> Dict[int, Box]:
+    """
+    Resolve the inherited placeholder geometry of a slide from its slide layout.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+        relationships (Dict[str, Dict[str, Union[str, bool]]]): The slide's relationships, from `read_relationships`.
+        cache (Optional[Dict[str, Dict]]): Resolved layouts and masters shared across the slides of a deck.
+
+    Returns:
+        Dict[int, Box]: As for `layout_placeholder_boxes`; empty if the slide has no layout.
+    """
+    for rel in relationships.values():
+        if rel["type"] == _LAYOUT_REL_TYPE and not rel["external"]:
+            return layout_placeholder_boxes(zip_ref, rel["target"], cache)
+    return {}
+
+
+def iter_slide_text_boxes(zip_ref: zipfile.ZipFile, slide_nums: Optional[Set[int]] = None, nested: bool = True) -> Iterator[Tuple[int, List[TextBox]]]:
+    """
+    Yield the text boxes of every slide of an open package, streaming each slide's XML.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open PowerPoint package.
+        slide_nums (Optional[Set[int]]): The slide numbers to read, or None for every slide.
+        nested (bool): Whether to include shapes inside group shapes and table cells.
+
+    Yields:
+        Tuple[int, List[TextBox]]: The slide number and its text boxes, in slide order.
+    """
+    cache = {}
+    for slide_num, slide_part in enumerate(slide_part_names(zip_ref), start=1):
+        if slide_nums is not None and slide_num not in slide_nums:
+            continue
+        placeholder_boxes = slide_placeholder_boxes(zip_ref, read_relationships(zip_ref, slide_part), cache)
+        with span("slide.text", slide_num=slide_num), zip_ref.open(slide_part) as stream:
+            text_boxes = list(parse_text_boxes(stream, placeholder_boxes, nested))
+        yield slide_num, text_boxes
+
+
+def extract_text_boxes(pptx_file: str, slide_nums: Optional[Set[int]] = None, nested: bool = True) -> Dict[int, List[TextBox]]:
+    """
+    Extract the text boxes of a PowerPoint presentation without the python-pptx object model.
+
+    With `nested=False` the result matches reading `shape.text_frame.text.strip()` and the shape
+    position of every shape in `slide.shapes` with python-pptx.
+
+    Args:
+        pptx_file (str): The path to the PowerPoint presentation file.
+        slide_nums (Optional[Set[int]]): The slide numbers to read, or None for every slide.
+        nested (bool): Whether to include shapes inside group shapes and table cells.
+
+    Returns:
+        Dict[int, List[TextBox]]: A dictionary mapping slide numbers to their text boxes.
+    """
+    with zipfile.ZipFile(pptx_file) as zip_ref:
+        return dict(iter_slide_text_boxes(zip_ref, slide_nums, nested))
@@ -0,0 +1,420 @@
+import os
+import re
+import json
+import time
+import uuid
+import queue
+import signal
+import logging
+import threading
+import importlib
+import multiprocessing
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+from . import instrumentation
+from . import memory_budget
+from .batch import MODES, process_deck
+from .instrumentation import METRICS, count, prometheus_text
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_TIMEOUT = 600.0
+DEFAULT_MAX_QUEUED = 100
+DEFAULT_POLL_INTERVAL = 1.0
+# Finished job records kept in memory for status requests
+MAX_FINISHED_JOBS = 1000
+# Loaded by every worker before its first job, besides the modules of `batch.MODES`; names starting with '.' are in this package
+PRELOAD_MODULES = (".extraction_engine", ".slide_xml", ".slide_filter", ".image_normalizer", ".layout", ".s3_uploader", "boto3.s3.transfer")
+
+_STOP = None
+# Job ids name result files and output directories, so they are restricted to a safe alphabet
+_JOB_ID = re.compile(r"[A-Za-z0-9_-]+")
+# Optional string fields of a job
+_STRING_FIELDS = ("id", "mode", "bucket_name", "folder_name", "output_dir")
+
+
+def _warm_up():
+    # Pay for imports, lxml/python-pptx initialisation and the S3 client once per worker instead of once per deck
+    instrumentation.METRICS.sinks = []
+    instrumentation.configure_from_env(serve=False)
+    for module_name in PRELOAD_MODULES + tuple(f".{module}" for module, _ in MODES.values()):
+        importlib.import_module(module_name, __package__)
+    from . import s3_uploader
+
+    s3_uploader.enable_client_reuse()
+    try:
+        # Matches the client `S3Uploader` asks for with its default sizes and the service's credentials
+        s3_uploader.make_s3_client(os.environ.get("AWS_ACCESS_KEY_ID", ""), os.environ.get("AWS_SECRET_ACCESS_KEY", ""),
+                                   max_pool_connections=s3_uploader.DEFAULT_WORKERS * 4)
+    except Exception as e:
+        logger.warning(f"Could not create the S3 client ahead of the first job: {e}")
+
+
+def _worker_main(conn, memory_limit: int):
+    # The service decides when workers stop; a Ctrl-C reaching the process group must not kill a running job
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _warm_up()
+    # Each worker has its own budget; together they stay within the configured one
+    memory_budget.BUDGET.configure(memory_limit)
+    while True:
+        job = conn.recv()
+        if job is _STOP:
+            break
+        conn.send(process_deck(job["deck"], job["output_dir"], job["mode"], job["options"]))
+
+
+class WorkerService:
+    """
+    Long-running extraction service with warm worker processes and a local job queue.
+
+    Each of the `workers` worker processes imports the extraction modules and creates its S3 client
+    once, then runs jobs one at a time through `batch.process_deck`, so a job pays neither interpreter
+    startup nor client creation. At most `workers` jobs run at once and at most `max_queued` wait.
+    The memory budget is divided among the workers, so together they stay within it.
+
+    Jobs come from a directory spool, an HTTP endpoint, or `submit`. A job is a JSON object with a
+    'deck' path and optionally 'mode' (a key of `batch.MODES`, 'extract' by default), 'bucket_name',
+    'folder_name', 'output_dir', 'timeout' (seconds) and 'id' (letters, digits, '_' and '-', not used by
+    another job; generated when missing). Credentials come from the service's
+    AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY environment, never from job files.
+
+    Spool: drop '<id>.json' into '<spool_dir>/incoming'. Jobs are claimed by renaming them into
+    'processing' only while a worker is free, so several services can share one spool, and jobs left
+    in 'processing' by a crashed service are requeued at start. Every finished job is written to
+    '<results_dir>/<id>.json' with its 'status' ('done', 'failed', 'timeout' or 'cancelled') and the
+    `process_deck` result.
+
+    A job exceeding its timeout is stopped by terminating its worker, which is replaced by a fresh one.
+    `shutdown` stops taking jobs, returns waiting spool jobs to 'incoming', cancels other waiting jobs
+    and lets running ones finish.
+
+    Args:
+        workers (Optional[int]): The number of worker processes, or None for one per CPU.
+        job_timeout (float): The default maximum run time of a job in seconds.
+        spool_dir (Optional[str]): The spool directory to take jobs from, or None.
+        results_dir (Optional[str]): Where finished job records are written; defaults to '<spool_dir>/results'
+            with a spool and to 'service_results' otherwise.
+        output_root (str): The directory holding the per-job output directories.
+        max_queued (int): The maximum number of jobs waiting for a worker.
+        poll_interval (float): The seconds between two scans of the spool.
+    """
+
+    def __init__(self, workers: Optional[int] = None, job_timeout: float = DEFAULT_JOB_TIMEOUT, spool_dir: Optional[str] = None,
+                 results_dir: Optional[str] = None, output_root: str = "service_output", max_queued: int = DEFAULT_MAX_QUEUED,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.workers = workers or os.cpu_count() or 1
+        self.job_timeout = job_timeout
+        self.spool_dir = spool_dir
+        self.results_dir = results_dir or (os.path.join(spool_dir, "results") if spool_dir is not None else "service_results")
+        self.output_root = os.path.abspath(output_root)
+        self.poll_interval = poll_interval
+        self.options = {"aws_access_key_id": os.environ.get("AWS_ACCESS_KEY_ID", ""), "aws_secret_access_key": os.environ.get("AWS_SECRET_ACCESS_KEY", "")}
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._server = None
+        self._context = multiprocessing.get_context("spawn")
+        os.makedirs(self.results_dir, exist_ok=True)
+        if spool_dir is not None:
+            for name in ("incoming", "processing"):
+                os.makedirs(os.path.join(spool_dir, name), exist_ok=True)
+
+    # Jobs
+
+    def submit(self, job: Dict[str, Union[str, float]], job_id: Optional[str] = None, block: bool = False) -> str:
+        """
+        Validate a job and queue it.
+
+        Args:
+            job (Dict[str, Union[str, float]]): The job, see the class description.
+            job_id (Optional[str]): The job id, or None to generate one.
+            block (bool): Whether to wait for room in the queue instead of raising `queue.Full`.
+
+        Returns:
+            str: The job id.
+
+        Raises:
+            ValueError: If the job is invalid, or its id is malformed or already used.
+            RuntimeError: If the service is shutting down.
+            queue.Full: If `max_queued` jobs are already waiting and `block` is False.
+        """
+        return self._enqueue(job, job_id, block, None)
+
+    def _enqueue(self, job: Dict[str, Union[str, float]], job_id: Optional[str], block: bool, spool_path: Optional[str]) -> str:
+        if self._stopping.is_set():
+            raise RuntimeError("The service is shutting down")
+        if not isinstance(job, dict) or not isinstance(job.get("deck"), str) or not job["deck"]:
+            raise ValueError("A job needs a 'deck' path")
+        for key in _STRING_FIELDS:
+            if job.get(key) is not None and not isinstance(job[key], str):
+                raise ValueError(f"'{key}' must be a string")
+        timeout = job.get("timeout")
+        if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not timeout > 0):
+            raise ValueError("'timeout' must be a positive number of seconds")
+        mode = job.get("mode") or "extract"
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {sorted(MODES)}")
+        job_id = job_id or job.get("id") or uuid.uuid4().hex
+        if not _JOB_ID.fullmatch(job_id):
+            raise ValueError(f"Invalid job id {job_id!r}: use letters, digits, '_' and '-'")
+        task = {
+            "id": job_id,
+            "deck": os.path.abspath(job["deck"]),
+            "mode": mode,
+            "output_dir": os.path.abspath(job.get("output_dir") or os.path.join(self.output_root, job_id)),
+            "timeout": float(timeout or self.job_timeout),
+            "options": dict(self.options, bucket_name=job.get("bucket_name", ""), folder_name=job.get("folder_name", "")),
+            # The spool file is removed when the job finishes, or returned to 'incoming' if it never starts
+            "spool_path": spool_path
+        }
+        with self._lock:
+            # An id names one job for good: its record and result file are never overwritten
+            if job_id in self._jobs or os.path.exists(os.path.join(self.results_dir, job_id + ".json")):
+                raise ValueError(f"Job id '{job_id}' is already used")
+            self._jobs[job_id] = {"id": job_id, "status": "queued", "job": dict(job), "queued_at": time.time()}
+        try:
+            self._queue.put(task, block=block)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+            raise
+        count("jobs_queued")
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            record = self._jobs.get(job_id)
+            return dict(record) if record is not None else None
+
+    def _finish(self, task: Dict, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        with self._lock:
+            record = self._jobs.setdefault(task["id"], {"id": task["id"], "job": {"deck": task["deck"], "mode": task["mode"]}})
+            record.update(status=status, finished_at=time.time(), result=result, error=error if error is not None else (result or {}).get("error"))
+            self._jobs.move_to_end(task["id"])
+            while len(self._jobs) > MAX_FINISHED_JOBS and next(iter(self._jobs.values()))["status"] not in ("queued", "running"):
+                self._jobs.popitem(last=False)
+            data = json.dumps(record, indent=2, default=str)
+        path = os.path.join(self.results_dir, task["id"] + ".json")
+        with open(path + ".tmp", "w") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        if task.get("spool_path") is not None and os.path.exists(task["spool_path"]):
+            os.remove(task["spool_path"])
+        count(f"jobs_{status}")
+        logger.info(f"Job {task['id']} {status}: {task['deck']}")
+
+    # Workers
+
+    def _start_worker(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker_main, args=(child_conn, memory_budget.worker_share(self.workers)), daemon=True, name="extraction-worker")
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def _run_slot(self):
+        process, conn = self._start_worker()
+        while True:
+            task = self._queue.get()
+            if task is _STOP:
+                break
+            with self._lock:
+                if task["id"] in self._jobs:
+                    self._jobs[task["id"]].update(status="running", started_at=time.time(), worker=process.pid)
+            start = time.perf_counter()
+            try:
+                conn.send({key: task[key] for key in ("deck", "mode", "output_dir", "options")})
+                finished = conn.poll(task["timeout"])
+                result = conn.recv() if finished else None
+            except (EOFError, OSError) as e:
+                # The worker died during the job
+                process.join()
+                self._finish(task, "failed", error=f"Worker exited with code {process.exitcode}: {e!r}")
+                process, conn = self._start_worker()
+                continue
+            finally:
+                METRICS.observe("service.job", time.perf_counter() - start, job=task["id"], mode=task["mode"])
+
+            if not finished:
+                # A running job cannot be interrupted inside the worker; replace the worker instead
+                process.terminate()
+                process.join()
+                conn.close()
+                self._finish(task, "timeout", error=f"Timed out after {task['timeout']:.0f}s")
+                process, conn = self._start_worker()
+                continue
+            self._finish(task, "done" if result["ok"] else "failed", result)
+
+        try:
+            conn.send(_STOP)
+        except OSError:
+            pass
+        process.join(timeout=10)
+        if process.is_alive():
+            process.terminate()
+
+    # Spool
+
+    def _requeue_abandoned(self):
+        processing = os.path.join(self.spool_dir, "processing")
+        for name in os.listdir(processing):
+            os.replace(os.path.join(processing, name), os.path.join(self.spool_dir, "incoming", name))
+            logger.info(f"Requeued abandoned spool job {name}")
+
+    def _scan_spool(self):
+        incoming = os.path.join(self.spool_dir, "incoming")
+        processing = os.path.join(self.spool_dir, "processing")
+        while not self._stopping.is_set():
+            names = sorted(name for name in os.listdir(incoming) if name.endswith(".json"))
+            for name in names:
+                # Only claim what a worker will start soon; the rest stays available to other services
+                if self._stopping.is_set() or self._queue.qsize() >= self.workers:
+                    break
+                # One bad job file must never stop the spool thread
+                try:
+                    self._claim(os.path.join(incoming, name), os.path.join(processing, name))
+                except Exception:
+                    logger.exception(f"Failed to take spool job {name}")
+            self._stopping.wait(self.poll_interval)
+
+    def _claim(self, path: str, claimed: str):
+        try:
+            os.replace(path, claimed)
+        except FileNotFoundError:
+            return  # claimed by another service
+        job_id = os.path.basename(claimed)[:-len(".json")]
+        try:
+            with open(claimed) as f:
+                job = json.load(f)
+            self._enqueue(job, job_id, True, claimed)
+        except (ValueError, RuntimeError) as e:
+            # A malformed or already used file name must not overwrite another job's record
+            if not _JOB_ID.fullmatch(job_id) or self.status(job_id) is not None or os.path.exists(os.path.join(self.results_dir, job_id + ".json")):
+                job_id = uuid.uuid4().hex
+            self._finish({"id": job_id, "deck": None, "mode": None, "spool_path": claimed}, "failed", error=f"Invalid job: {e}")
+
+    # HTTP
+
+    def serve_http(self, port: int, host: str = "127.0.0.1"):
+        """
+        Accept jobs over HTTP from a background thread.
+
+        POST /jobs with a JSON job returns 202 and the job 'id' (400 for an invalid job, 503 while the
+        queue is full or the service is shutting down); GET /jobs/<id> returns the job record; GET /health
+        returns the worker and queue counts; GET /metrics returns the service counters in Prometheus format.
+
+        Args:
+            port (int): The port to listen on; 0 picks a free one.
+            host (str): The interface to listen on; keep it local, the endpoint has no authentication.
+
+        Returns:
+            ThreadingHTTPServer: The running server.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, code, body, content_type="application/json"):
+                data = body.encode() if isinstance(body, str) else json.dumps(body, default=str).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/jobs":
+                    return self._reply(404, {"error": "Not found"})
+                try:
+                    job = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+                    self._reply(202, {"id": service.submit(job)})
+                except ValueError as e:
+                    self._reply(400, {"error": str(e)})
+                except queue.Full:
+                    self._reply(503, {"error": "Job queue is full"})
+                except RuntimeError as e:
+                    self._reply(503, {"error": str(e)})
+                except Exception as e:
+                    logger.exception("Failed to submit a job")
+                    self._reply(500, {"error": str(e)})
+
+            def do_GET(self):
+                path = self.path.split("?")[0].rstrip("/")
+                if path.startswith("/jobs/"):
+                    record = service.status(path[len("/jobs/"):])
+                    return self._reply(200, record) if record is not None else self._reply(404, {"error": "Unknown job"})
+                if path == "/health":
+                    return self._reply(200, service.health())
+                if path == "/metrics":
+                    return self._reply(200, prometheus_text(METRICS.snapshot()), "text/plain; version=0.0.4")
+                self._reply(404, {"error": "Not found"})
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        thread = threading.Thread(target=self._server.serve_forever, name="service-http", daemon=True)
+        thread.start()
+        logger.info(f"Accepting jobs on http://{host}:{self._server.server_address[1]}/jobs")
+        return self._server
+
+    def health(self) -> Dict[str, Union[int, bool]]:
+        with self._lock:
+            statuses = [record["status"] for record in self._jobs.values()]
+        return {"workers": self.workers, "queued": statuses.count("queued"), "running": statuses.count("running"),
+                "stopping": self._stopping.is_set()}
+
+    # Lifecycle
+
+    def start(self):
+        """Start the worker processes and, with a spool, the spool scanner."""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run_slot, name=f"service-slot-{i}")
+            thread.start()
+            self._threads.append(thread)
+        if self.spool_dir is not None:
+            self._requeue_abandoned()
+            thread = threading.Thread(target=self._scan_spool, name="service-spool", daemon=True)
+            thread.start()
+        logger.info(f"Started {self.workers} workers")
+
+    def shutdown(self):
+        """Stop taking jobs, hand back or cancel waiting ones and wait for running ones to finish."""
+        self._stopping.set()
+        if self._server is not None:
+            self._server.shutdown()
+        while True:
+            try:
+                task = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            spool_path = task["spool_path"]
+            if spool_path is not None and os.path.exists(spool_path):
+                os.replace(spool_path, os.path.join(self.spool_dir, "incoming", os.path.basename(spool_path)))
+                with self._lock:
+                    self._jobs.pop(task["id"], None)
+            else:
+                self._finish(task, "cancelled", error="The service shut down before the job started")
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        logger.info("Service stopped")
+
+    def run_forever(self):
+        """Run until SIGINT or SIGTERM, then shut down gracefully."""
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda signum, frame: stop.set())
+        self.start()
+        while not stop.wait(1.0):
+            pass
+        logger.info("Shutting down: finishing running jobs")
+        self.shutdown()
@@ -0,0 +1,45 @@
+import asyncio
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from deck_generator import generate_deck
+from pictory.async_api import extract_slide_text_and_media_async
+from pictory.memory_budget import BUDGET
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="bkt")
+        yield "bkt"
+
+
+def test_cancel_releases_memory_budget(tmp_path, bucket):
+    pptx_file = str(tmp_path / "deck.pptx")
+    generate_deck(pptx_file, slides=300, shapes=3, images=1)
+
+    async def run():
+        task = asyncio.ensure_future(extract_slide_text_and_media_async(pptx_file, str(tmp_path / "out"), bucket, "key", "secret"))
+        # Cancel once python-pptx holds the package, i.e. while its reservation is in flight
+        while BUDGET.in_flight == 0:
+            assert not task.done()
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return BUDGET.in_flight
+
+    assert asyncio.run(run()) == 0
+
+
+def test_extracts_every_slide(tmp_path, bucket):
+    pptx_file = str(tmp_path / "deck.pptx")
+    generate_deck(pptx_file, slides=4, shapes=2, images=1)
+
+    paired = asyncio.run(extract_slide_text_and_media_async(pptx_file, str(tmp_path / "out"), bucket, "key", "secret"))
+    assert sorted(paired) == [1, 2, 3, 4]
+    assert all(info["upload"] is None or info["upload"]["ok"] for slide in paired.values() for info in slide["media_info"])
+    assert BUDGET.in_flight == 0
@@ -0,0 +1,22 @@
+import os
+
+from deck_generator import generate_deck
+from pictory.batch import load_decks, run_batch
+
+
+def test_relative_decks_on_one_worker(tmp_path, monkeypatch):
+    # One worker processes every deck, so nothing a deck does may change how the next one's paths resolve
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("decks")
+    for name in ("d1", "d2", "d3"):
+        generate_deck(os.path.join("decks", f"{name}.pptx"), slides=2, shapes=2, images=1)
+
+    decks = load_decks("decks")
+    assert all(os.path.isabs(deck) for deck in decks)
+
+    report = run_batch(decks, "out", "extract", max_workers=1)
+    assert report["summary"]["succeeded"] == 3, [result["error"] for result in report["decks"]]
+    assert os.getcwd() == str(tmp_path)
+    for result in report["decks"]:
+        assert result["output_dir"].startswith(str(tmp_path / "out"))
+        assert result["memory"] is not None
@@ -0,0 +1,58 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from deck_generator import generate_deck
+from pictory import full_1_2
+from pictory.manifest import DeckManifest
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="bkt")
+        yield client
+
+
+@pytest.fixture
+def deck(tmp_path):
+    path = str(tmp_path / "deck.pptx")
+    generate_deck(path, slides=3, shapes=2, images=1)
+    return path
+
+
+def test_uploads_and_pairs(tmp_path, s3, deck):
+    paired = full_1_2.extract_slide_text_and_media(deck, str(tmp_path / "out"), "bkt", "key", "secret", manifest_path=str(tmp_path / "manifest.json"))
+    assert sorted(paired) == [1, 2, 3]
+    keys = {info["key"] for slide in paired.values() for info in slide["media_info"]}
+    assert keys == {item["Key"] for item in s3.list_objects_v2(Bucket="bkt")["Contents"]}
+
+
+def test_uploader_errors_return_empty(tmp_path, deck, monkeypatch):
+    def no_client(*args, **kwargs):
+        raise RuntimeError("no credentials")
+
+    monkeypatch.setattr(full_1_2, "S3Uploader", no_client)
+    assert full_1_2.extract_slide_text_and_media(deck, str(tmp_path / "out"), "bkt", "key", "secret") == {}
+
+
+def test_manifest_errors_return_empty(tmp_path, s3, deck, monkeypatch):
+    def read_only(self):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(DeckManifest, "save", read_only)
+    assert full_1_2.extract_slide_text_and_media(deck, str(tmp_path / "out"), "bkt", "key", "secret", manifest_path=str(tmp_path / "manifest.json")) == {}
+
+
+def test_failed_uploads_are_retried(tmp_path, s3, deck):
+    manifest_path = str(tmp_path / "manifest.json")
+    first = full_1_2.extract_slide_text_and_media(deck, str(tmp_path / "out"), "later", "key", "secret", manifest_path=manifest_path)
+    assert not any(info["upload"]["ok"] for slide in first.values() for info in slide["media_info"])
+
+    s3.create_bucket(Bucket="later")
+    second = full_1_2.extract_slide_text_and_media(deck, str(tmp_path / "out"), "later", "key", "secret", manifest_path=manifest_path)
+    assert all(info["upload"] is None or info["upload"]["ok"] for slide in second.values() for info in slide["media_info"])
+    keys = {info["key"] for slide in second.values() for info in slide["media_info"]}
+    assert keys == {item["Key"] for item in s3.list_objects_v2(Bucket="later")["Contents"]}
@@ -0,0 +1,54 @@
+import io
+import os
+
+from PIL import Image
+
+from pictory import image_normalizer
+from pictory.image_normalizer import ImageNormalizer
+
+
+def _png(size):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 10, 10)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_resizes_and_caches(tmp_path):
+    with ImageNormalizer(str(tmp_path)) as normalizer:
+        first = normalizer.normalize(_png((800, 600)), (400, 400))
+        second = normalizer.normalize(_png((800, 600)), (400, 400))
+    assert first["converted"] and not first["cached"]
+    assert (first["width"], first["height"]) == (400, 300)
+    assert second["cached"] and second["name"] == first["name"]
+
+
+def test_undecodable_image_is_kept_once(tmp_path, monkeypatch):
+    # A PNG signature followed by garbage: recognised by its header, rejected by Pillow
+    broken = b"\x89PNG\r\n\x1a\n" + os.urandom(200)
+    with ImageNormalizer(str(tmp_path)) as normalizer:
+        kept = normalizer.normalize(broken, (100, 100))
+        assert not kept["converted"] and kept["name"].endswith(".png") and "_" not in kept["name"]
+
+        # Later runs, at any target size, reuse the kept copy instead of decoding and copying it again
+        def render(*args):
+            raise AssertionError("decoded again")
+
+        monkeypatch.setattr(normalizer, "_render", render)
+        for target in ((100, 100), (50, 20)):
+            again = normalizer.normalize(broken, target)
+            assert again["cached"] and not again["converted"] and again["path"] == kept["path"]
+    assert sorted(os.listdir(tmp_path)) == [kept["name"]]
+
+
+def test_decodable_full_size_rendition_is_not_reused_for_a_target(tmp_path):
+    with ImageNormalizer(str(tmp_path)) as normalizer:
+        full = normalizer.normalize(_png((300, 300)))
+        sized = normalizer.normalize(_png((300, 300)), (100, 100))
+    assert full["name"] != sized["name"]
+    assert (sized["width"], sized["height"]) == (100, 100) and not sized["cached"]
+
+
+def test_detects_formats():
+    assert image_normalizer.detect_image_format(_png((1, 1))) == "png"
+    assert image_normalizer.image_extension(b"GIF89a....") == ".gif"
+    assert image_normalizer.image_extension(b"nothing", ".bin") == ".bin"
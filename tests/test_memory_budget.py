@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from deck_generator import generate_deck
+from pictory import batch, memory_budget
+from pictory.memory_budget import MemoryBudget, configure_from_env, parse_size, worker_share
+
+
+@pytest.mark.parametrize("value, size", [("1048576", 1048576), ("512M", 512 * 2 ** 20), ("1.5g", 3 * 2 ** 29), ("2GiB", 2 * 2 ** 30)])
+def test_parse_size(value, size):
+    assert parse_size(value) == size
+
+
+def test_parse_size_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_malformed_env_keeps_defaults(monkeypatch):
+    monkeypatch.setenv("MEMORY_BUDGET", "lots")
+    monkeypatch.setenv("MEMORY_SPOOL_THRESHOLD", "32M")
+    budget = MemoryBudget()
+    configure_from_env(budget)
+    assert budget.limit == memory_budget.DEFAULT_MEMORY_BUDGET
+    assert budget.spool_threshold == 32 * 2 ** 20
+
+
+def test_acquire_waits_for_release():
+    budget = MemoryBudget(limit=100)
+    budget.acquire(80)
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (budget.acquire(50), acquired.set()))
+    thread.start()
+    assert not acquired.wait(0.2)
+    budget.release(80)
+    assert acquired.wait(5)
+    thread.join()
+    assert budget.in_flight == 50 and budget.waits == 1
+
+
+def test_oversize_acquire_runs_alone():
+    budget = MemoryBudget(limit=100)
+    assert budget.acquire(500) == 500
+    assert budget.peak == 500
+
+
+def test_worker_share():
+    budget = MemoryBudget(limit=1000)
+    assert worker_share(4, budget) == 250
+    assert worker_share(0, budget) == 1000
+    assert worker_share(5000, budget) == 1
+
+
+def test_run_batch_divides_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_budget.BUDGET, "limit", 64 * 2 ** 20)
+    decks = []
+    for i in range(2):
+        deck = str(tmp_path / f"deck{i}.pptx")
+        generate_deck(deck, slides=1, shapes=1, images=0, seed=i)
+        decks.append(deck)
+    report = batch.run_batch(decks, str(tmp_path / "out"), max_workers=2)
+    assert report["summary"]["succeeded"] == 2
+    for result in report["decks"]:
+        assert result["memory"]["budget_limit"] == 32 * 2 ** 20
@@ -0,0 +1,41 @@
+import io
+import random
+
+from lxml import etree
+from pptx import Presentation
+from pptx.oxml.ns import qn
+from pptx.util import Inches
+
+from deck_generator import noise_png
+from pictory import part1_v2
+from pictory.media_index import build_media_index
+from pictory.media_stream import open_package
+
+
+def _deck_with_background(path):
+    # One picture shape, plus a different image used only as the slide background
+    rng = random.Random(0)
+    presentation = Presentation()
+    slide = presentation.slides.add_slide(presentation.slide_layouts[6])
+    slide.shapes.add_picture(io.BytesIO(noise_png(8, rng)), Inches(1), Inches(1))
+    _, r_id = slide.part.get_or_add_image_part(io.BytesIO(noise_png(12, rng)))
+    c_sld = slide._element.find(qn("p:cSld"))
+    c_sld.insert(0, etree.fromstring(
+        '<p:bg xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+        ' xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+        ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<p:bgPr><a:blipFill><a:blip r:embed="{r_id}"/><a:stretch><a:fillRect/></a:stretch></a:blipFill>'
+        '<a:effectLst/></p:bgPr></p:bg>'))
+    presentation.save(path)
+
+
+def test_background_media_is_left_out(tmp_path):
+    deck = str(tmp_path / "deck.pptx")
+    _deck_with_background(deck)
+    with open_package(deck) as zip_ref:
+        assert len(build_media_index(zip_ref)) == 2
+        assert len(build_media_index(zip_ref, positioned=True)) == 1
+
+    media_paths, media_positions = part1_v2.extract_media_from_pptx(deck, str(tmp_path / "out"))
+    assert len(media_paths[1]) == 1
+    assert media_positions[1][0]["left"] == Inches(1)
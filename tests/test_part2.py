@@ -0,0 +1,74 @@
+import os
+import re
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from deck_generator import generate_deck
+from pictory import part2
+from pictory.image_normalizer import ImageNormalizer
+from pictory.records import FRAME_SIZE
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="bkt")
+        yield client
+
+
+@pytest.fixture
+def deck(tmp_path):
+    path = str(tmp_path / "deck.pptx")
+    generate_deck(path, slides=3, shapes=2, images=2)
+    return path
+
+
+def _keys(s3):
+    return sorted(item["Key"] for item in s3.list_objects_v2(Bucket="bkt").get("Contents", []))
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_uploads_originals_by_default(tmp_path, s3, deck, pipelined):
+    temp_dir = str(tmp_path / "temp")
+    assert part2.convert_pptx_to_images(deck, "bkt", "f", "key", "secret", pipelined=pipelined, temp_dir=temp_dir)
+    keys = _keys(s3)
+    assert keys and all(re.fullmatch(r"f/[0-9a-f]{64}\.\w+", key) for key in keys)
+    assert not os.path.exists(temp_dir)
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_uploads_renditions_when_asked(tmp_path, s3, deck, pipelined):
+    temp_dir = str(tmp_path / "temp")
+    assert part2.convert_pptx_to_images(deck, "bkt", "f", "key", "secret", pipelined=pipelined, frame_size=FRAME_SIZE, temp_dir=temp_dir)
+    keys = _keys(s3)
+    assert keys and all(re.fullmatch(r"f/[0-9a-f]{64}_\d+x\d+\.\w+", key) for key in keys)
+    assert not os.path.exists(temp_dir)
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_cleanup_tolerates_leftover_renditions(tmp_path, s3, deck, pipelined, monkeypatch):
+    normalize = ImageNormalizer.normalize
+
+    def leave_file_behind(self, *args, **kwargs):
+        # Like a conversion that failed after creating its temporary file
+        open(os.path.join(self.cache_dir, "leftover.part"), "wb").close()
+        return normalize(self, *args, **kwargs)
+
+    monkeypatch.setattr(ImageNormalizer, "normalize", leave_file_behind)
+    temp_dir = str(tmp_path / "temp")
+    assert part2.convert_pptx_to_images(deck, "bkt", "f", "key", "secret", pipelined=pipelined, frame_size=FRAME_SIZE, temp_dir=temp_dir)
+    assert not os.path.exists(temp_dir)
+
+
+@pytest.mark.parametrize("frame_size", [None, FRAME_SIZE])
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_reports_each_failed_upload(tmp_path, s3, deck, pipelined, frame_size, caplog):
+    caplog.set_level("INFO", logger="pictory.part2")
+    assert part2.convert_pptx_to_images(deck, "missing", "f", "key", "secret", pipelined=pipelined, frame_size=frame_size, temp_dir=str(tmp_path / "temp"))
+    failures = [record for record in caplog.records if record.name == "pictory.part2" and record.getMessage().startswith("Failed to upload image")]
+    summary = [record.getMessage() for record in caplog.records if record.name == "pictory.part2" and record.getMessage().startswith("Image uploads:")]
+    assert failures and summary == [f"Image uploads: 0 succeeded, {len(failures)} failed"]
@@ -0,0 +1,35 @@
+import pytest
+
+from pictory.record_writer import NdjsonWriter, RecordWriter, open_writer, read_records
+
+
+def test_record_writer_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        RecordWriter(str(tmp_path / "out.ndjson"))
+
+
+def test_ndjson_round_trip(tmp_path):
+    path = str(tmp_path / "out" / "records.ndjson")
+    records = [{"slide_number": 1, "text": ["a"]}, {"slide_number": 2, "text": []}]
+    with open_writer(path) as writer:
+        assert isinstance(writer, NdjsonWriter)
+        for record in records:
+            writer.write(record)
+        assert writer.records_written == 2
+    assert list(read_records(path)) == records
+
+
+def test_append_and_partial_last_record(tmp_path):
+    path = str(tmp_path / "records.jsonl")
+    with open_writer(path) as writer:
+        writer.write({"n": 1})
+    with open_writer(path, append=True) as writer:
+        writer.write({"n": 2})
+    with open(path, "a") as f:
+        f.write('{"n": 3')
+    assert list(read_records(path)) == [{"n": 1}, {"n": 2}]
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        open_writer(str(tmp_path / "out.ndjson"), "xml")
@@ -0,0 +1,131 @@
+import os
+import time
+import threading
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from pictory.s3_uploader import S3Uploader
+
+
+class FakeS3:
+    """In-memory stand-in for the client calls S3Uploader makes, failing the first uploads of chosen keys."""
+
+    def __init__(self, failures=None, head_error=None, latency=0.0):
+        self.objects = {}
+        self.attempts = {}
+        self.failures = dict(failures or {})
+        self.head_error = head_error
+        self.latency = latency
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def head_object(self, Bucket, Key):
+        if self.head_error is not None:
+            raise self.head_error
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        return {}
+
+    def upload_file(self, path, bucket_name, key, Config=None):
+        with self._lock:
+            self.attempts[key] = self.attempts.get(key, 0) + 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            fail = self.failures.get(key, 0) >= self.attempts[key]
+        try:
+            time.sleep(self.latency)
+            if fail:
+                raise ConnectionError(f"upload of {key} failed")
+            with open(path, "rb") as f:
+                self.objects[(bucket_name, key)] = f.read()
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"file{i}.bin"
+        path.write_bytes(os.urandom(100 + i))
+        paths.append(str(path))
+    return paths
+
+
+def test_uploads_to_keys(files):
+    s3 = FakeS3()
+    with S3Uploader("bkt", s3=s3) as uploader:
+        results = uploader.upload_many((path, f"f/{os.path.basename(path)}") for path in files)
+    assert [result["key"] for result in results] == [f"f/{os.path.basename(path)}" for path in files]
+    assert all(result["ok"] and result["attempts"] == 1 and not result["skipped"] for result in results)
+    assert [result["bytes"] for result in results] == [os.path.getsize(path) for path in files]
+    assert {key for _, key in s3.objects} == {result["key"] for result in results}
+
+
+def test_retries_then_succeeds(files):
+    s3 = FakeS3(failures={"k": 2})
+    with S3Uploader("bkt", s3=s3, max_attempts=3, backoff=0) as uploader:
+        result = uploader.upload_file(files[0], "k")
+    assert result["ok"] and result["attempts"] == 3 and result["error"] is None
+    assert s3.attempts["k"] == 3
+
+
+def test_reports_failure_after_last_attempt(files):
+    s3 = FakeS3(failures={"k": 5})
+    with S3Uploader("bkt", s3=s3, max_attempts=2, backoff=0) as uploader:
+        result = uploader.submit(files[0], "k").result()
+    assert not result["ok"] and result["attempts"] == 2 and result["bytes"] == 0
+    assert "upload of k failed" in result["error"]
+    assert ("bkt", "k") not in s3.objects
+
+
+def test_caps_concurrent_uploads(files):
+    s3 = FakeS3(latency=0.05)
+    with S3Uploader("bkt", s3=s3, max_workers=2) as uploader:
+        uploader.upload_many((path, os.path.basename(path)) for path in files)
+    assert s3.max_running == 2
+
+
+def test_skips_existing_objects(files):
+    s3 = FakeS3()
+    with S3Uploader("bkt", s3=s3) as uploader:
+        first = uploader.upload_file(files[0], "k", skip_existing=True)
+        second = uploader.upload_file(files[0], "k", skip_existing=True)
+    assert first["ok"] and not first["skipped"]
+    assert second["ok"] and second["skipped"] and second["attempts"] == 0
+    assert s3.attempts["k"] == 1
+
+
+def test_failed_existence_check_is_not_taken_as_missing(files):
+    denied = ClientError({"Error": {"Code": "403", "Message": "Forbidden"}}, "HeadObject")
+    with S3Uploader("bkt", s3=FakeS3(head_error=denied)) as uploader:
+        with pytest.raises(ClientError):
+            uploader.exists("k")
+        # Uploading is still attempted when the check itself fails
+        assert uploader.upload_file(files[0], "k", skip_existing=True)["ok"]
+
+
+def test_completed_uploads_are_not_retained(files):
+    with S3Uploader("bkt", s3=FakeS3()) as uploader:
+        futures = [uploader.submit(path, os.path.basename(path)) for path in files]
+        uploader.wait()
+        assert all(future.done() for future in futures)
+        assert not uploader._pending
+
+
+def test_against_moto(files, monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="bkt")
+        with S3Uploader("bkt", s3=s3) as uploader:
+            assert not uploader.exists("f/file0.bin")
+            assert uploader.upload_file(files[0], "f/file0.bin")["ok"]
+            assert uploader.exists("f/file0.bin")
+            assert uploader.upload_file(files[0], "f/file0.bin", skip_existing=True)["skipped"]
+        assert s3.get_object(Bucket="bkt", Key="f/file0.bin")["Body"].read() == open(files[0], "rb").read()
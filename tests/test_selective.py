@@ -0,0 +1,14 @@
+import pytest
+
+from pictory.selective import slide_numbers
+
+
+@pytest.mark.parametrize("spec, slides", [("1-5,8", {1, 2, 3, 4, 5, 8}), ("3", {3}), ("2-2, 7,", {2, 7}), ("", set())])
+def test_slide_numbers(spec, slides):
+    assert slide_numbers(spec) == slides
+
+
+@pytest.mark.parametrize("spec", ["5-1", "0", "0-3", "-1", "a", "1-b"])
+def test_slide_numbers_rejects(spec):
+    with pytest.raises(ValueError):
+        slide_numbers(spec)
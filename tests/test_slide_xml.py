@@ -0,0 +1,33 @@
+import pytest
+
+from bench_slide_xml import build_deck, pptx_nested_text, pptx_top_level
+from pictory.slide_xml import extract_text_boxes
+
+
+@pytest.fixture(scope="module")
+def deck(tmp_path_factory):
+    # Every slide layout, placeholders, text boxes, nested groups and a table with merged cells
+    path = str(tmp_path_factory.mktemp("slide_xml") / "deck.pptx")
+    build_deck(path, slides=12, shapes=4)
+    return path
+
+
+def test_top_level_matches_python_pptx(deck):
+    expected = pptx_top_level(deck)
+    actual = {slide_num: [(t.text, t.box.left, t.box.top, t.box.width, t.box.height) for t in text_boxes]
+              for slide_num, text_boxes in extract_text_boxes(deck, nested=False).items()}
+    assert actual == expected
+
+
+def test_nested_text_matches_python_pptx(deck):
+    expected = pptx_nested_text(deck)
+    actual = {slide_num: [t.text for t in text_boxes] for slide_num, text_boxes in extract_text_boxes(deck).items()}
+    assert actual == expected
+    # The deck really has grouped, nested and table text beyond the top-level shapes
+    assert all({"Nested", "r1c1"} <= set(texts) for texts in actual.values())
+
+
+def test_selected_slides(deck):
+    text_boxes = extract_text_boxes(deck, slide_nums={2, 5})
+    assert sorted(text_boxes) == [2, 5]
+    assert [t.text for t in text_boxes[5]] == pptx_nested_text(deck)[5]
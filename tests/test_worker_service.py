@@ -0,0 +1,86 @@
+import os
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from pictory.worker_service import WorkerService
+
+
+@pytest.fixture
+def service(tmp_path):
+    # No worker processes are started: jobs stay in the queue where the tests can see them
+    service = WorkerService(workers=1, spool_dir=str(tmp_path / "spool"), output_root=str(tmp_path / "out"), poll_interval=0.01)
+    yield service
+    service._stopping.set()
+    if service._server is not None:
+        service._server.shutdown()
+
+
+@pytest.mark.parametrize("job", [
+    None,
+    {"deck": ""},
+    {"deck": 3},
+    {"deck": "x", "timeout": []},
+    {"deck": "x", "timeout": -1},
+    {"deck": "x", "timeout": True},
+    {"deck": "x", "mode": ["extract"]},
+    {"deck": "x", "mode": "unknown"},
+    {"deck": "x", "bucket_name": {}},
+    {"deck": "x", "id": 7},
+    {"deck": "x", "id": "../x"},
+    {"deck": "x", "id": "a.b"},
+])
+def test_submit_rejects_invalid_jobs(service, job):
+    with pytest.raises(ValueError):
+        service.submit(job)
+    assert service._queue.qsize() == 0
+
+
+def test_submit_rejects_used_ids(service):
+    assert service.submit({"deck": "x", "id": "job-1"}) == "job-1"
+    with pytest.raises(ValueError):
+        service.submit({"deck": "y", "id": "job-1"})
+    assert service.status("job-1")["job"]["deck"] == "x"
+
+    with open(os.path.join(service.results_dir, "job-2.json"), "w") as f:
+        json.dump({"id": "job-2", "status": "done"}, f)
+    with pytest.raises(ValueError):
+        service.submit({"deck": "x", "id": "job-2"})
+
+
+def test_bad_spool_jobs_do_not_stop_the_scanner(service):
+    incoming = os.path.join(service.spool_dir, "incoming")
+    for name, content in (("a.json", '{"deck": "x", "timeout": []}'), ("b.json", "not json"), ("c.json", '{"deck": "x"}')):
+        with open(os.path.join(incoming, name), "w") as f:
+            f.write(content)
+    thread = threading.Thread(target=service._scan_spool, daemon=True)
+    thread.start()
+    task = service._queue.get(timeout=5)
+    assert task["id"] == "c"
+    assert thread.is_alive()
+
+    for job_id in ("a", "b"):
+        with open(os.path.join(service.results_dir, job_id + ".json")) as f:
+            assert json.load(f)["status"] == "failed"
+    assert os.listdir(incoming) == []
+
+
+def _post(port, body):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/jobs", data=body, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_http_rejects_invalid_jobs(service):
+    port = service.serve_http(0).server_address[1]
+    assert _post(port, b'{"deck": "x", "timeout": []}')[0] == 400
+    assert _post(port, b'{"deck": "x", "id": "../x"}')[0] == 400
+    assert _post(port, b"[1, 2]")[0] == 400
+    status, body = _post(port, b'{"deck": "x"}')
+    assert status == 202 and service.status(body["id"])["status"] == "queued"